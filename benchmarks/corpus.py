@@ -0,0 +1,149 @@
+"""Synthetic ticket corpus rendered from the real vendor logos in ``template_dir``."""
+import json
+import logging
+import os
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from processor.image_ops import RASTER_DPI
+from processor.page_ocr import PageOCR
+from processor.template_bank import TEMPLATE_EXTENSIONS
+from processor.vendor_matcher import normalize_text
+
+PAGE_SIZE_INCHES = (8.5, 11)
+FONT_CANDIDATES = ("DejaVuSans.ttf", "arial.ttf", "Arial.ttf", "LiberationSans-Regular.ttf")
+MATERIALS = ("Class 2 Fill", "Concrete", "Asphalt", "Select Fill", "Topsoil", "Mixed C&D")
+SITES = ("PHMS NPC", "Ntx Wm", "Skyline", "Nursery Rd", "Ledbetter Yard")
+
+
+@dataclass
+class CorpusPage:
+    image: Image.Image
+    vendor: str
+    company: Optional[str]
+    ticket: str
+    page_ocr: PageOCR
+
+
+def _font(size):
+    for name in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def vendor_logos(template_dir) -> Dict[str, List[Image.Image]]:
+    """``{vendor folder: [logo, ...]}`` for every vendor folder with at least one template."""
+    logos = {}
+    for folder in sorted(Path(template_dir).iterdir()):
+        if not folder.is_dir():
+            continue
+        images = []
+        for file in sorted(folder.iterdir()):
+            if file.suffix.lower() in TEMPLATE_EXTENSIONS:
+                with Image.open(file) as img:
+                    images.append(img.convert("RGB"))
+        if images:
+            logos[folder.name] = images
+    return logos
+
+
+def _company_for(vendor, ocr_config):
+    """Keyword-sheet company whose name or a keyword matches the vendor folder name."""
+    target = normalize_text(vendor)
+    for company, data in ocr_config.items():
+        names = [company] + list(data.get("keywords", []))
+        if any(normalize_text(name) == target for name in names):
+            return company
+    return None
+
+
+def render_page(logo, vendor, company, keyword, rng, dpi=RASTER_DPI):
+    width, height = int(PAGE_SIZE_INCHES[0] * dpi), int(PAGE_SIZE_INCHES[1] * dpi)
+    page = Image.new("RGB", (width, height), "white")
+    margin = dpi // 2
+    page.paste(logo, (margin + rng.randint(0, dpi // 2), margin + rng.randint(0, dpi // 4)))
+
+    ticket = f"A{rng.randint(100000, 999999)}"
+    text_lines = [
+        keyword,
+        f"TICKET NO: {ticket}",
+        f"DATE: 2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        f"MATERIAL: {rng.choice(MATERIALS)}",
+        f"SOURCE: {rng.choice(SITES)}",
+        f"TRUCK: {rng.randint(100, 9999)}   LOADS: {rng.randint(1, 12)}",
+    ]
+    draw = ImageDraw.Draw(page)
+    font = _font(dpi // 7)
+    y = margin + max(logo.height, dpi // 2) + dpi // 3
+    lines = []
+    for text in text_lines:
+        x0, y0, x1, y1 = draw.textbbox((margin, y), text, font=font)
+        draw.text((margin, y), text, fill="black", font=font)
+        lines.append({"text": text, "box": (x0, y0, x1, y1)})
+        y = y1 + dpi // 10
+
+    page_ocr = PageOCR(text="\n".join(text_lines), lines=lines, engine="ground_truth", confidence=1.0,
+                       size=page.size)
+    return CorpusPage(page, vendor, company, ticket, page_ocr)
+
+
+def generate_pages(template_dir, ocr_config, pages=20, seed=0, dpi=RASTER_DPI) -> List[CorpusPage]:
+    """Deterministically render ``pages`` synthetic tickets, cycling through the vendors."""
+    rng = random.Random(seed)
+    logos = vendor_logos(template_dir)
+    if not logos:
+        raise ValueError(f"No vendor templates found in {template_dir}")
+    vendors = sorted(logos)
+    corpus = []
+    for i in range(pages):
+        vendor = vendors[i % len(vendors)]
+        company = _company_for(vendor, ocr_config)
+        keywords = ocr_config.get(company, {}).get("keywords") if company else None
+        keyword = rng.choice(keywords) if keywords else vendor
+        corpus.append(render_page(rng.choice(logos[vendor]), vendor, company, keyword, rng, dpi=dpi))
+    return corpus
+
+
+def write_corpus(corpus, out_dir, pages_per_file=5, dpi=RASTER_DPI):
+    """Write the corpus as multi-page PDFs and TIFFs plus ``truth.json``.
+
+    Returns one ``{"stem", "pdf", "text_pdf", "tif", "pages"}`` entry per
+    file, where ``pages`` are the :class:`CorpusPage` objects the file
+    contains. ``text_pdf`` is the same scan with the ground-truth text
+    layer embedded, like a digitally generated ticket.
+    """
+    from processor.pdf_writer import SearchablePDFWriter
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+    truth = {}
+    for n, start in enumerate(range(0, len(corpus), pages_per_file), 1):
+        chunk = corpus[start:start + pages_per_file]
+        images = [page.image for page in chunk]
+        stem = f"24-105_2025-06-23_Synthetic_{n:03d}"
+        pdf_path = out_dir / f"{stem}.pdf"
+        tif_path = out_dir / f"{stem}.tif"
+        # TIFF first: Pillow leaves the PDF writer's encoder settings on appended frames
+        images[0].save(tif_path, save_all=True, append_images=images[1:], compression="tiff_lzw", dpi=(dpi, dpi))
+        images[0].save(pdf_path, save_all=True, append_images=images[1:], resolution=dpi)
+        text_path = out_dir / f"{stem}_text.pdf"
+        writer = SearchablePDFWriter(text_path, resolution=dpi)
+        for page in chunk:
+            writer.add_page(page.image, page.page_ocr)
+        writer.close()
+        files.append({"stem": stem, "pdf": pdf_path, "text_pdf": text_path, "tif": tif_path, "pages": chunk})
+        truth[stem] = [{"vendor": page.vendor, "company": page.company, "ticket": page.ticket} for page in chunk]
+
+    with open(out_dir / "truth.json", "w", encoding="utf-8") as f:
+        json.dump(truth, f, indent=2)
+    total = sum(os.path.getsize(f[kind]) for f in files for kind in ("pdf", "text_pdf", "tif"))
+    logging.info(f"🧪 Wrote {len(corpus)} synthetic pages to {out_dir} ({total / 1e6:.1f} MB)")
+    return files
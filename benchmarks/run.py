@@ -0,0 +1,317 @@
+"""Stage-level throughput benchmarks on a synthetic ticket corpus.
+
+    python -m benchmarks.run --pages 40 --out bench_<commit>.json
+    python -m benchmarks.run --compare bench_base.json bench_new.json
+"""
+import argparse
+import json
+import logging
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+STAGES = (
+    "extract_images_pdf",
+    "extract_images_tiff",
+    "text_layer",
+    "ocr_match_company",
+    "keyword_match",
+    "run_template_matching",
+    "extract_ticket_number",
+    "extract_ticket_number_ocr",
+    "export_grouped_output",
+    "write_log",
+)
+RESULT_VERSION = 1
+TEXT_LAYER_MIN_CHARS = 40
+REGRESSION_TOLERANCE = 0.10
+
+
+class StageTimer:
+    """Collects per-page latencies for each stage; multi-page calls are spread over their pages."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.correct = defaultdict(int)
+        self.checked = defaultdict(int)
+        self.skipped = {}
+
+    @contextmanager
+    def time(self, stage, pages=1):
+        start = time.perf_counter()
+        yield
+        per_page = (time.perf_counter() - start) / max(pages, 1)
+        self.samples[stage].extend([per_page] * max(pages, 1))
+
+    def check(self, stage, ok):
+        self.checked[stage] += 1
+        self.correct[stage] += bool(ok)
+
+    def skip(self, stage, reason):
+        self.skipped[stage] = reason
+        logging.info(f"⏭️ {stage}: skipped ({reason})")
+
+    def summary(self):
+        stages = {}
+        for stage in STAGES:
+            if stage in self.skipped:
+                stages[stage] = {"skipped": self.skipped[stage]}
+                continue
+            samples = self.samples.get(stage)
+            if not samples:
+                continue
+            ms = np.array(samples) * 1000
+            total = float(np.sum(samples))
+            stats = {
+                "pages": len(samples),
+                "total_s": round(total, 4),
+                "pages_per_sec": round(len(samples) / total, 2) if total else None,
+                "mean_ms": round(float(ms.mean()), 3),
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p90_ms": round(float(np.percentile(ms, 90)), 3),
+                "p99_ms": round(float(np.percentile(ms, 99)), 3),
+            }
+            if self.checked.get(stage):
+                stats["accuracy"] = round(self.correct[stage] / self.checked[stage], 4)
+            stages[stage] = stats
+        return stages
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _has_poppler(config):
+    poppler_path = config.get("poppler_path")
+    if poppler_path and any((Path(poppler_path) / exe).exists() for exe in ("pdftoppm", "pdftoppm.exe")):
+        return True
+    return shutil.which("pdftoppm") is not None
+
+
+def _tesseract_ready():
+    from utils import ocr_tesseract
+
+    try:
+        return bool(ocr_tesseract.load())
+    except Exception:
+        return False
+
+
+def _bench_extraction(timer, files, config):
+    from processor.image_ops import extract_images_from_file, extract_ticket_number_from_text, iter_images_from_file
+    from processor.text_layer import TextPage
+
+    if _has_poppler(config):
+        for f in files:
+            with timer.time("extract_images_pdf", pages=len(f["pages"])):
+                extract_images_from_file(f["pdf"], config.get("poppler_path"))
+    else:
+        timer.skip("extract_images_pdf", "poppler (pdftoppm) not found")
+
+    for f in files:
+        with timer.time("extract_images_tiff", pages=len(f["pages"])):
+            extract_images_from_file(f["tif"], config.get("poppler_path"))
+
+    # Digitally generated tickets: classified from the embedded text, nothing is rasterized
+    for f in files:
+        with timer.time("text_layer", pages=len(f["pages"])):
+            pages = list(iter_images_from_file(f["text_pdf"], config.get("poppler_path"),
+                                               text_layer_min_chars=TEXT_LAYER_MIN_CHARS))
+            tickets = [extract_ticket_number_from_text(page.page_ocr.text) if isinstance(page, TextPage) else None
+                       for page in pages]
+        for ticket, page in zip(tickets, f["pages"]):
+            timer.check("text_layer", ticket == page.ticket)
+
+
+def _bench_matching(timer, corpus, config, ocr_config):
+    from processor.hybrid_ocr import match_company_text, ocr_match_company
+    from processor.image_ops import extract_ticket_number, run_template_matching
+    from processor.template_bank import TemplateBank
+    from utils.ocr_wrapper import get_engine, is_engine_available
+
+    engine = config.get("ocr_engine")
+    if is_engine_available(engine):
+        get_engine(engine)  # model load is not part of the per-page cost
+        for page in corpus:
+            with timer.time("ocr_match_company"):
+                company, *_ = ocr_match_company(page.image, ocr_config, config)
+            if page.company:
+                timer.check("ocr_match_company", company == page.company)
+    else:
+        timer.skip("ocr_match_company", f"OCR engine '{engine}' not installed")
+
+    for page in corpus:
+        with timer.time("keyword_match"):
+            company, *_ = match_company_text(page.page_ocr.text, ocr_config, config)
+        if page.company:
+            timer.check("keyword_match", company == page.company)
+
+    bank = TemplateBank.load(config["template_dir"])
+    threshold = config.get("template_threshold", 0.85)
+    for page in corpus:
+        page_array = np.array(page.image)
+        with timer.time("run_template_matching"):
+            vendor, _ = run_template_matching(page_array, bank, threshold=threshold, preview=False)
+        timer.check("run_template_matching", vendor == page.vendor.lower())
+
+    for page in corpus:
+        with timer.time("extract_ticket_number"):
+            ticket = extract_ticket_number(page.image, text=page.page_ocr.text)
+        timer.check("extract_ticket_number", ticket == page.ticket)
+
+    if _tesseract_ready():
+        for page in corpus:
+            with timer.time("extract_ticket_number_ocr"):
+                ticket = extract_ticket_number(page.image)
+            timer.check("extract_ticket_number_ocr", ticket == page.ticket)
+    else:
+        timer.skip("extract_ticket_number_ocr", "Tesseract not installed")
+
+
+def _bench_output(timer, files, config, work_dir):
+    from processor.file_handler import export_grouped_output
+    from processor.filename_utils import parse_input_filename_fuzzy
+    from utils.run_log import RunLogStore
+
+    run_log = RunLogStore(Path(work_dir) / "logs")
+    for f in files:
+        pages_by_vendor = defaultdict(list)
+        ocr_by_vendor = defaultdict(list)
+        for page in f["pages"]:
+            pages_by_vendor[page.vendor].append(page.image)
+            ocr_by_vendor[page.vendor].append(page.page_ocr)
+        metadata = parse_input_filename_fuzzy(f["pdf"])
+        with timer.time("export_grouped_output", pages=len(f["pages"])):
+            export_grouped_output(pages_by_vendor, "pdf", metadata, f["pdf"], config, ocr_by_vendor=ocr_by_vendor)
+
+        rows = [
+            {"Filename": f["stem"].upper(), "Page": i + 1, "Vendor": page.vendor, "Ticket Number": page.ticket,
+             "Method": "OCR", "Rotated": False, "Grayscale": False}
+            for i, page in enumerate(f["pages"])
+        ]
+        with timer.time("write_log", pages=len(rows)):
+            run_log.append_trucking_rows("24-105", "2025-06-23", rows)
+            run_log.export_workbook("24-105", "2025-06-23")
+
+
+def run_benchmarks(config, pages=20, seed=0, repeat=1, pages_per_file=5, work_dir=None):
+    """Render the corpus, time every stage and return the machine-readable result."""
+    from benchmarks.corpus import generate_pages, write_corpus
+    from utils.loader import load_ocr_configs_from_excel
+
+    ocr_config = load_ocr_configs_from_excel(config["keyword_file"])
+    corpus = generate_pages(config["template_dir"], ocr_config, pages=pages, seed=seed)
+    timer = StageTimer()
+
+    with tempfile.TemporaryDirectory(prefix="ticket_bench_") as tmp:
+        work_dir = Path(work_dir or tmp)
+        files = write_corpus(corpus, work_dir / "corpus", pages_per_file=pages_per_file)
+        for _ in range(repeat):
+            _bench_extraction(timer, files, config)
+            _bench_matching(timer, corpus, config, ocr_config)
+            _bench_output(timer, files, config, work_dir)
+
+    return {
+        "version": RESULT_VERSION,
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pages": pages,
+            "repeat": repeat,
+            "seed": seed,
+            "ocr_engine": config.get("ocr_engine"),
+        },
+        "stages": timer.summary(),
+    }
+
+
+def compare_results(base, new, tolerance=REGRESSION_TOLERANCE):
+    """Per-stage throughput change from ``base`` to ``new``; a drop beyond ``tolerance`` is a regression."""
+    rows = []
+    for stage in STAGES:
+        b = base.get("stages", {}).get(stage, {})
+        n = new.get("stages", {}).get(stage, {})
+        if not b.get("pages_per_sec") or not n.get("pages_per_sec"):
+            continue
+        change = n["pages_per_sec"] / b["pages_per_sec"] - 1
+        rows.append({
+            "stage": stage,
+            "base_pages_per_sec": b["pages_per_sec"],
+            "new_pages_per_sec": n["pages_per_sec"],
+            "base_p90_ms": b["p90_ms"],
+            "new_p90_ms": n["p90_ms"],
+            "change": round(change, 4),
+            "regression": change < -tolerance,
+        })
+    return rows
+
+
+def _print_summary(result):
+    print(f"{'stage':<28}{'pages/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'acc':>8}")
+    for stage, stats in result["stages"].items():
+        if "skipped" in stats:
+            print(f"{stage:<28}  skipped: {stats['skipped']}")
+            continue
+        acc = f"{stats['accuracy']:.0%}" if "accuracy" in stats else ""
+        print(f"{stage:<28}{stats['pages_per_sec']:>10}{stats['p50_ms']:>10}{stats['p90_ms']:>10}"
+              f"{stats['p99_ms']:>10}{acc:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each ticket-sorting stage on a synthetic corpus")
+    parser.add_argument("--pages", type=int, default=20, help="Number of synthetic pages (default 20)")
+    parser.add_argument("--pages-per-file", type=int, default=5, help="Pages per generated PDF/TIFF")
+    parser.add_argument("--repeat", type=int, default=1, help="Run every stage this many times")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument("--out", help="Write the JSON result here (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Allowed pages/sec drop before --compare reports a regression (default 0.10)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if args.compare:
+        base, new = (json.loads(Path(p).read_text(encoding="utf-8")) for p in args.compare)
+        rows = compare_results(base, new, args.tolerance)
+        print(f"{'stage':<28}{'base/s':>10}{'new/s':>10}{'change':>10}")
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['stage']:<28}{row['base_pages_per_sec']:>10}{row['new_pages_per_sec']:>10}"
+                  f"{row['change']:>+10.1%}{flag}")
+        return 1 if any(row["regression"] for row in rows) else 0
+
+    import yaml
+
+    with open(REPO_ROOT / "configs.yaml", "r") as file:
+        config = yaml.safe_load(file)
+    config["template_dir"] = str(REPO_ROOT / config["template_dir"])
+    config["keyword_file"] = str(REPO_ROOT / config["keyword_file"])
+    result = run_benchmarks(config, pages=args.pages, seed=args.seed, repeat=args.repeat,
+                            pages_per_file=args.pages_per_file)
+    if args.out:
+        Path(args.out).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        _print_summary(result)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@ import os
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
 import logging
+import multiprocessing
 import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox
@@ -14,7 +15,7 @@ import yaml
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "configs.yaml")
 
 DEFAULT_CONFIG = """\
-cache_file: null
+cache_file: ./cache/ocr_cache.sqlite
 keyword_file: ocr_keywords.xlsx
 ocr_back_pages: false
 output_format: pdf
@@ -88,6 +89,12 @@ def launch_gui():
     root.geometry("600x600")
     root.configure(bg="#F5F5F5")
 
+    # ♨️ Optionally load the OCR models while the user picks files
+    startup_config = load_config()
+    if startup_config.get("ocr_warmup", False):
+        from processor.ocr_pool import warm_up_ocr
+        warm_up_ocr(startup_config)
+
     global selected_path, output_format, rename_original, rotate
     global two_page_scan, ocr_back_pages, grayscale, compare_mode
     global run_btn, status_label, progress
@@ -166,6 +173,7 @@ def launch_gui():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     try:
         launch_gui()
     except Exception:
@@ -1,7 +1,8 @@
 import argparse
 import logging
+import multiprocessing
+from pathlib import Path
 
-from processor.run import run_input
 from utils.loader import load_configs
 
 
@@ -12,18 +13,36 @@ def setup_logging():
 def main():
     setup_logging()
     parser = argparse.ArgumentParser(description="📄 Ticket Sorter with OCR & Template Matching")
-    parser.add_argument("--file", help="Path to the file or folder to process", required=True)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--file", help="Path to the file or folder to process")
+    target.add_argument("--export-logs", metavar="FOLDER",
+                        help="Rebuild the Excel trucking logs for a processed folder from its run log")
+    target.add_argument("--watch", nargs="+", metavar="FOLDER",
+                        help="Keep running and process new PDF/TIFF scans dropped into these folders")
     parser.add_argument("--compare", action="store_true", help="Run OCR engine comparison mode")
     args = parser.parse_args()
 
+    if args.export_logs:
+        from utils.run_log import export_ocr_text, export_workbooks
+        for path in export_workbooks(Path(args.export_logs) / "logs", force=True):
+            logging.info(f"📝 {path}")
+        export_ocr_text(Path(args.export_logs) / "logs")
+        return
+
     config = load_configs()
 
-    if args.compare:
+    # Heavy OCR/PDF modules are imported only once there is work to do
+    if args.watch:
+        from processor.watch import watch_folders
+        watch_folders(args.watch, config)
+    elif args.compare:
         from processor.run import run_comparison_mode
         run_comparison_mode(args.file, config)
     else:
+        from processor.run import run_input
         run_input(args.file, config)
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
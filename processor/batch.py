@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+MANIFEST_NAME = "batch_manifest.json"
+MANIFEST_VERSION = 1
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+class BatchManifest:
+    """Per-folder record of each input file's status, content hash and timings.
+
+    Stored as ``logs/batch_manifest.json`` next to the inputs and rewritten
+    atomically on every status change. A file is processed again unless its
+    last run finished (``done``) on identical content, so interrupted batches
+    resume where they stopped and edited inputs are picked up. Files without
+    an entry whose output folder already exists count as done.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries = self._read()
+
+    def _read(self):
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logging.warning(f"⚠️ Ignoring unreadable batch manifest {self.path}: {e}")
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": MANIFEST_VERSION, "files": self.entries}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
+
+    def get(self, file):
+        with self._lock:
+            entry = self.entries.get(Path(file).name)
+            return dict(entry) if entry else None
+
+    def input_hash(self, file):
+        """Content hash of ``file``, reusing the recorded one while size and mtime are unchanged."""
+        from utils.image_hash import hash_file
+
+        stat = os.stat(file)
+        entry = self.get(file)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["input_hash"]
+        return hash_file(file)
+
+    def pending_reason(self, file, input_hash):
+        """Why ``file`` must be (re)processed, or None if its last run is complete and current."""
+        entry = self.get(file)
+        if entry is None:
+            if not _has_legacy_output(file):
+                return "new"
+            # Processed before the manifest existed: record it as done instead of redoing (and re-journaling) it
+            logging.info(f"🔁 Recording earlier output of {Path(file).name} in the batch manifest")
+            stat = os.stat(file)
+            self.update(file, status="done", input_hash=input_hash, size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                        attempts=0, legacy=True)
+            return None
+        if entry.get("input_hash") != input_hash:
+            return "changed"
+        if entry.get("status") != "done":
+            return entry.get("status", "unknown")
+        return None
+
+    def update(self, file, **fields):
+        with self._lock:
+            entry = self.entries.setdefault(Path(file).name, {})
+            entry.update(fields)
+            self._write()
+
+    def mark_running(self, file, input_hash):
+        stat = os.stat(file)
+        attempts = (self.get(file) or {}).get("attempts", 0) + 1
+        self.update(file, status="running", input_hash=input_hash, size=stat.st_size,
+                    mtime_ns=stat.st_mtime_ns, started_at=time.time(), finished_at=None,
+                    duration=None, timings={}, error=None, attempts=attempts)
+
+
+def _has_legacy_output(file):
+    """True if ``file`` has a ``processed/<stem>/Vendor`` folder, the output of runs that predate the manifest."""
+    from processor.file_handler import get_dynamic_paths
+
+    out_dir, _, _ = get_dynamic_paths(file)
+    return out_dir.is_dir()
+
+
+def expand_inputs(filepath):
+    """Files named by ``filepath``: a file, a folder of PDFs, or several paths joined with ``;``."""
+    path = Path(filepath)
+    if ";" in str(filepath):
+        return [Path(p) for p in str(filepath).split(";") if p.strip()]
+    if path.is_dir():
+        return sorted([f for f in path.glob("*.pdf") if not f.name.startswith(".")])
+    return [path]
+
+
+def get_manifest(folder):
+    """Return the shared manifest for the inputs in ``folder``."""
+    path = (Path(folder) / "logs" / MANIFEST_NAME).resolve()
+    with _manifests_lock:
+        if path not in _manifests:
+            _manifests[path] = BatchManifest(path)
+        return _manifests[path]
+
+
+def _process_file(file, input_hash, config, process_file):
+    from utils.metrics import increment, metrics_context
+    from utils.run_log import RUN_LOG_NAME, get_run_log
+    from utils.timing import reset_timings, timing_totals
+
+    manifest = get_manifest(Path(file).parent)
+    log_dir = Path(file).parent / "logs"
+    if (log_dir / RUN_LOG_NAME).exists():
+        # Drop rows journaled by an earlier, interrupted or outdated run before writing new ones
+        get_run_log(log_dir).forget_file(Path(file).stem.upper())
+
+    manifest.mark_running(file, input_hash)
+    reset_timings()
+    start = time.perf_counter()
+    try:
+        with metrics_context(file=Path(file).name):
+            ocr_logs = process_file(file, config)
+    except Exception as e:
+        manifest.update(file, status="failed", error=str(e), finished_at=time.time(),
+                        duration=time.perf_counter() - start, timings=timing_totals())
+        increment("files_processed", status="failed")
+        raise
+    manifest.update(file, status="done", finished_at=time.time(),
+                    duration=time.perf_counter() - start, timings=timing_totals())
+    increment("files_processed", status="ok")
+    return ocr_logs
+
+
+def run_batch(paths, config, process_file):
+    """Run ``process_file(file, config)`` over ``paths``, several files at a time.
+
+    ``file_workers`` files are in flight at once; their pages share the OCR
+    worker pool (``num_workers``), so one file's rasterization and export
+    overlap with another file's OCR. Returns ``(results, ocr_logs)`` in input
+    order, where ``results`` holds ``(file name, "ok" | "skipped" | "failed")``.
+    """
+    total = len(paths)
+    file_workers = max(1, min(int(config.get("file_workers", 1)), total or 1))
+    if file_workers > 1 and config.get("num_workers", 4) <= 1:
+        # In-process OCR models are not thread-safe; concurrent files need the worker pool
+        logging.warning("⚠️ file_workers > 1 requires num_workers > 1; processing files one at a time.")
+        file_workers = 1
+    statuses = [None] * total
+    ocr_logs = [[] for _ in paths]
+
+    def run_one(idx, file, input_hash, reason):
+        logging.info(f"📄 {idx + 1}/{total} Processing ({reason}): {file.name}")
+        try:
+            ocr_logs[idx] = _process_file(file, input_hash, config, process_file)
+            statuses[idx] = "ok"
+        except Exception as e:
+            logging.error(f"❌ Failed: {file} → {e}")
+            statuses[idx] = "failed"
+
+    with ThreadPoolExecutor(max_workers=file_workers, thread_name_prefix="batch") as executor:
+        for idx, file in enumerate(paths):
+            manifest = get_manifest(file.parent)
+            try:
+                input_hash = manifest.input_hash(file)
+            except OSError as e:
+                logging.error(f"❌ Cannot read {file}: {e}")
+                statuses[idx] = "failed"
+                continue
+            reason = manifest.pending_reason(file, input_hash)
+            if reason is None:
+                logging.info(f"⏭️ {idx + 1}/{total} Skipping already processed: {file.name}")
+                statuses[idx] = "skipped"
+                continue
+            executor.submit(run_one, idx, file, input_hash, reason)
+
+    results = [(file.name, status) for file, status in zip(paths, statuses)]
+    return results, [row for rows in ocr_logs for row in rows]
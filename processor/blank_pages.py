@@ -0,0 +1,89 @@
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from utils.image_hash import hash_distance, perceptual_hash
+
+# Pages are judged on a ~75 DPI grayscale thumbnail; that is plenty to see ink
+ANALYSIS_REDUCE = 4
+INK_LEVEL = 160
+EDGE_MARGIN = 0.03
+BLANK_MAX_INK = 0.003
+BACK_HASH_DISTANCE = 12
+BACK_TEMPLATE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff")
+
+_back_hashes = {}
+_back_hashes_lock = threading.Lock()
+
+
+def ink_coverage(img, ink_level=INK_LEVEL, margin=EDGE_MARGIN):
+    """Fraction of dark pixels on the page, ignoring a thin border where scanner shadows sit."""
+    if isinstance(img, np.ndarray):
+        img = Image.fromarray(img)
+    reduce = max(1, min(ANALYSIS_REDUCE, img.width // 64, img.height // 64))
+    thumb = img.convert("L").reduce(reduce) if reduce > 1 else img.convert("L")
+    gray = np.asarray(thumb)
+    h, w = gray.shape
+    my, mx = int(h * margin), int(w * margin)
+    core = gray[my:h - my or None, mx:w - mx or None]
+    if not core.size:
+        return 0.0
+    return float(np.count_nonzero(core < ink_level)) / core.size
+
+
+def load_back_hashes(back_template_dir):
+    """Perceptual hashes of the known back-page images in ``back_template_dir`` (cached per process).
+
+    Relative paths are resolved against the project root, like ``template_dir``.
+    """
+    from utils.loader import _resolve_path
+
+    if not back_template_dir:
+        return []
+    back_template_dir = str(_resolve_path(back_template_dir))
+    if not os.path.isdir(back_template_dir):
+        return []
+    files = sorted(
+        os.path.join(root, f)
+        for root, _, names in os.walk(back_template_dir)
+        for f in names
+        if f.lower().endswith(BACK_TEMPLATE_EXTENSIONS)
+    )
+    signature = tuple((f, os.path.getmtime(f)) for f in files)
+    with _back_hashes_lock:
+        cached = _back_hashes.get(back_template_dir)
+        if cached and cached[0] == signature:
+            return cached[1]
+    hashes = []
+    for f in files:
+        try:
+            with Image.open(f) as img:
+                hashes.append((Path(f).stem, perceptual_hash(img)))
+        except Exception as e:
+            logging.warning(f"⚠️ Failed to load back-page template {f}: {e}")
+    with _back_hashes_lock:
+        _back_hashes[back_template_dir] = (signature, hashes)
+    logging.info(f"📄 Loaded {len(hashes)} back-page templates from {back_template_dir}")
+    return hashes
+
+
+def classify_back_page(img, config, back_hashes=None):
+    """Return ``"blank"``, ``"boilerplate:<template>"`` or None (the side has real content).
+
+    Both checks work on a small thumbnail and run before any OCR.
+    """
+    if ink_coverage(img) <= config.get("blank_ink_threshold", BLANK_MAX_INK):
+        return "blank"
+    if back_hashes is None:
+        back_hashes = load_back_hashes(config.get("back_template_dir"))
+    if back_hashes:
+        page_hash = perceptual_hash(img)
+        max_distance = config.get("back_hash_distance", BACK_HASH_DISTANCE)
+        for name, template_hash in back_hashes:
+            if hash_distance(page_hash, template_hash) <= max_distance:
+                return f"boilerplate:{name}"
+    return None
@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+
+# Every check a page can go through, roughly from cheapest to most expensive:
+#   template - match the vendor logo against the template bank (no OCR)
+#   roi      - OCR only the top ``ocr_crop_top_percent`` of the page (needs ``use_roi``)
+#   full     - OCR the whole page
+#   rotate   - detect the page orientation and OCR it again if it was not upright
+CASCADE_STAGES = ("template", "roi", "full", "rotate")
+DEFAULT_CASCADE = ("roi", "full", "template", "rotate")
+MIN_CONFIDENCE = 0.80
+
+
+def cascade_stages(config):
+    """The ``ocr_cascade`` stages in the order they should run."""
+    stages = tuple(dict.fromkeys(s.lower() for s in config.get("ocr_cascade") or DEFAULT_CASCADE))
+    unknown = [s for s in stages if s not in CASCADE_STAGES]
+    if unknown:
+        raise ValueError(f"Unknown ocr_cascade stage(s): {', '.join(unknown)}. "
+                         f"Available: {', '.join(CASCADE_STAGES)}")
+    return stages
+
+
+@dataclass
+class PageDecision:
+    """Best vendor and ticket found for a page so far, with their 0-1 confidences."""
+
+    vendor: str = "Unknown"
+    matched: bool = False
+    keyword: str = ""
+    preview: str = ""
+    score: float = 0
+    method: str = ""
+    vendor_confidence: float = 0.0
+    ticket: str = ""
+    ticket_confidence: float = 0.0
+    layout_ticket: bool = False
+
+    def offer_vendor(self, vendor, confidence, method, keyword="", score=0, preview=None):
+        """Keep this vendor if it beats the current one."""
+        if self.matched and confidence <= self.vendor_confidence:
+            return False
+        if self.layout_ticket and vendor != self.vendor:
+            # Read from the previous vendor's layout; says nothing about this one's
+            self.ticket, self.ticket_confidence, self.layout_ticket = "", 0.0, False
+        self.vendor, self.matched, self.method = vendor, True, method
+        self.vendor_confidence, self.keyword, self.score = confidence, keyword, score
+        if preview is not None:
+            self.preview = preview
+        return True
+
+    def offer_ticket(self, ticket, confidence):
+        if not ticket or self.layout_ticket or (self.ticket and confidence <= self.ticket_confidence):
+            return False
+        self.ticket, self.ticket_confidence = ticket, confidence
+        return True
+
+    def offer_layout_ticket(self, ticket, confidence):
+        """A ticket read from the vendor's layout boxes beats any found elsewhere on the page."""
+        if not ticket or (self.layout_ticket and confidence <= self.ticket_confidence):
+            return False
+        self.ticket, self.ticket_confidence, self.layout_ticket = ticket, confidence, True
+        return True
+
+    def confident(self, min_confidence=MIN_CONFIDENCE):
+        return (self.matched and self.vendor_confidence >= min_confidence
+                and bool(self.ticket) and self.ticket_confidence >= min_confidence)
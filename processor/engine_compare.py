@@ -0,0 +1,217 @@
+import logging
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from processor.batch import expand_inputs
+from processor.hybrid_ocr import match_company_text
+from processor.image_ops import apply_grayscale, extract_ticket_number_from_text, iter_images_from_file
+from processor.vendor_matcher import normalize_text
+from utils.loader import load_ocr_configs_from_excel
+from utils.ocr_wrapper import get_engine, is_engine_available, read_text, registered_engines, resolve_engine_name
+
+
+def _rss_mb():
+    """Current resident memory in MB (psutil), else the peak RSS (Unix ``resource``), else None."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+
+def load_ground_truth(path):
+    """``{(FILE STEM, page): {"vendor", "ticket"}}`` from an Excel/CSV sheet.
+
+    The sheet uses the trucking-log columns (``Filename``, ``Page``, ``Vendor``,
+    ``Ticket Number``), so a hand-checked trucking log works as ground truth.
+    """
+    import pandas as pd
+
+    path = Path(path)
+    df = pd.read_csv(path, dtype=str) if path.suffix.lower() == ".csv" else pd.read_excel(path, dtype=str)
+    df = df.fillna("")
+    truth = {}
+    for row in df.to_dict("records"):
+        key = (Path(str(row["Filename"])).stem.upper(), int(float(row["Page"])))
+        truth[key] = {"vendor": str(row.get("Vendor", "")).strip(), "ticket": str(row.get("Ticket Number", "")).strip()}
+    return truth
+
+
+def comparison_engines(config):
+    """Engines to compare (``compare_engines`` or every registered one) that are installed here."""
+    requested = [resolve_engine_name(e) for e in config.get("compare_engines") or registered_engines()]
+    engines = [e for e in dict.fromkeys(requested) if is_engine_available(e)]
+    for engine in set(requested) - set(engines):
+        logging.warning(f"⚠️ Skipping OCR engine '{engine}': not installed")
+    return engines
+
+
+def _load_pages(paths, config):
+    pages = []
+    for path in paths:
+        for i, page in enumerate(iter_images_from_file(path, config.get("poppler_path"))):
+            if config.get("preprocess", {}).get("grayscale", False):
+                page = apply_grayscale(page)
+            pages.append((path, i + 1, page))
+    return pages
+
+
+def _score(value, expected):
+    if not expected:
+        return None
+    return normalize_text(str(value or "")) == normalize_text(expected)
+
+
+def compare_engines(pages, engines, config, ocr_config, truth=None):
+    """Run every engine over every page; return ``(page_rows, summary_rows)``.
+
+    Engines run one after another over all pages, so the model load and the
+    memory each engine adds are measured on their own.
+    """
+    truth = truth or {}
+    # Built and called with the pipeline's own options, so the numbers match production
+    engine_params = config.get("ocr_engine_params") or {}
+    page_rows = []
+    summary_rows = []
+    for engine in engines:
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        try:
+            get_engine(engine, **engine_params)
+        except Exception as e:
+            logging.error(f"❌ Could not load OCR engine '{engine}': {e}")
+            continue
+        load_s = time.perf_counter() - start
+        rss_loaded = rss_peak = _rss_mb()
+        logging.info(f"🔬 {engine}: loaded in {load_s:.1f}s, comparing {len(pages)} pages")
+
+        latencies = []
+        rows = []
+        for path, page_no, page in pages:
+            start = time.perf_counter()
+            try:
+                result = read_text(image=page, engine=engine, **engine_params)
+                error = ""
+            except Exception as e:
+                result, error = {}, str(e)
+            latency = time.perf_counter() - start
+            latencies.append(latency)
+            rss = _rss_mb()
+            if rss is not None:
+                rss_peak = max(rss_peak or rss, rss)
+
+            text = result.get("text", "")
+            vendor, *_ = match_company_text(text, ocr_config, config)
+            ticket = extract_ticket_number_from_text(text) or ""
+            expected = truth.get((Path(path).stem.upper(), page_no), {})
+            rows.append({
+                "Filename": Path(path).name,
+                "Page": page_no,
+                "Engine": engine,
+                "Latency (s)": round(latency, 4),
+                "Confidence": result.get("confidence"),
+                "Vendor": vendor,
+                "Expected Vendor": expected.get("vendor", ""),
+                "Vendor OK": _score(vendor, expected.get("vendor")),
+                "Ticket Number": ticket,
+                "Expected Ticket": expected.get("ticket", ""),
+                "Ticket OK": _score(ticket, expected.get("ticket")),
+                "Error": error,
+                "Text": text.replace("\n", " ")[:1000],
+            })
+        page_rows.extend(rows)
+        summary_rows.append(_summarize(engine, rows, latencies, load_s, rss_before, rss_loaded, rss_peak))
+    return page_rows, summary_rows
+
+
+def _accuracy(rows, column):
+    scored = [r[column] for r in rows if r[column] is not None]
+    return round(sum(scored) / len(scored), 4) if scored else None
+
+
+def _summarize(engine, rows, latencies, load_s, rss_before, rss_loaded, rss_peak):
+    lat = np.array(latencies) if latencies else np.zeros(1)
+    confidences = [r["Confidence"] for r in rows if r["Confidence"] is not None and not r["Error"]]
+    total = float(np.sum(latencies))
+    return {
+        "Engine": engine,
+        "Pages": len(rows),
+        "Errors": sum(1 for r in rows if r["Error"]),
+        "Load (s)": round(load_s, 3),
+        "Pages/sec": round(len(rows) / total, 3) if total else None,
+        "Mean latency (s)": round(float(lat.mean()), 4),
+        "p50 latency (s)": round(float(np.percentile(lat, 50)), 4),
+        "p90 latency (s)": round(float(np.percentile(lat, 90)), 4),
+        "Mean confidence": round(float(np.mean(confidences)), 4) if confidences else None,
+        "Vendor accuracy": _accuracy(rows, "Vendor OK"),
+        "Ticket accuracy": _accuracy(rows, "Ticket OK"),
+        "Model memory (MB)": round(rss_loaded - rss_before, 1) if rss_before is not None else None,
+        "Peak memory (MB)": round(rss_peak, 1) if rss_peak is not None else None,
+    }
+
+
+def plot_engine_summary(summary_rows, out_path):
+    """One chart per run: throughput next to vendor/ticket accuracy for each engine."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    engines = [r["Engine"] for r in summary_rows]
+    fig, (ax_speed, ax_acc) = plt.subplots(1, 2, figsize=(10, 0.6 * len(engines) + 2))
+    ax_speed.barh(engines, [r["Pages/sec"] or 0 for r in summary_rows], color="steelblue")
+    ax_speed.set_title("Throughput (pages/sec)")
+
+    y = np.arange(len(engines))
+    ax_acc.barh(y - 0.2, [r["Vendor accuracy"] or 0 for r in summary_rows], height=0.4, label="Vendor")
+    ax_acc.barh(y + 0.2, [r["Ticket accuracy"] or 0 for r in summary_rows], height=0.4, label="Ticket")
+    ax_acc.set_yticks(y, engines)
+    ax_acc.set_xlim(0, 1)
+    ax_acc.set_title("Accuracy vs. ground truth")
+    ax_acc.legend(loc="lower right")
+    fig.tight_layout()
+    fig.savefig(out_path)
+    plt.close(fig)
+    logging.info(f"📊 Engine comparison chart saved to: {out_path}")
+
+
+def run_comparison_mode(filepath, config):
+    """Compare the installed OCR engines on ``filepath`` and write one report for the run."""
+    import pandas as pd
+
+    paths = expand_inputs(filepath)
+    engines = comparison_engines(config)
+    if not engines:
+        logging.error("❌ No OCR engines available to compare.")
+        return None
+
+    ocr_config = load_ocr_configs_from_excel(config["keyword_file"])
+    truth_file = config.get("ground_truth_file")
+    truth = load_ground_truth(truth_file) if truth_file else {}
+    if not truth:
+        logging.info("ℹ️ No ground_truth_file configured; accuracy columns are left empty.")
+
+    pages = _load_pages(paths, config)
+    page_rows, summary_rows = compare_engines(pages, engines, config, ocr_config, truth)
+
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_path = Path.cwd() / f"ocr_engine_comparison_{ts}.xlsx"
+    with pd.ExcelWriter(out_path) as writer:
+        pd.DataFrame(summary_rows).to_excel(writer, sheet_name="Summary", index=False)
+        pd.DataFrame(page_rows).to_excel(writer, sheet_name="Pages", index=False)
+    logging.info(f"📊 OCR comparison saved to {out_path}")
+    if summary_rows:
+        plot_engine_summary(summary_rows, out_path.with_suffix(".png"))
+    return out_path
@@ -1,15 +1,12 @@
-import io
 import logging
 import shutil
 from pathlib import Path
 
-import pandas as pd
-import pytesseract
-from PyPDF2 import PdfMerger
-
 from processor.filename_utils import format_output_filename, format_output_filename_camel, parse_input_filename_fuzzy, \
     format_output_filename_lower, format_output_filename_snake
 
+PDF_EXPORT_MODES = ("raster", "passthrough")
+
 
 def get_dynamic_paths(base_file, combined_name=None):
     source_dir = Path(base_file).parent
@@ -24,6 +21,8 @@ def get_dynamic_paths(base_file, combined_name=None):
 
 
 def write_excel_log(log_entries, base_name, log_dir):
+    import pandas as pd
+
     Path(log_dir).mkdir(parents=True, exist_ok=True)
     df = pd.DataFrame(log_entries)
     output_path = Path(log_dir) / f"{base_name}_log.xlsx"
@@ -31,22 +30,44 @@ def write_excel_log(log_entries, base_name, log_dir):
     logging.info(f"\U0001F4CA Log saved: {output_path}")
 
 
-def export_grouped_output(pages_by_vendor, output_format, file_metadata, filepath, config):
+def passthrough_export(filepath, config):
+    """True when PDF output copies the input PDF's own pages (``pdf_export_mode: passthrough``)."""
+    mode = config.get("pdf_export_mode", "raster")
+    if mode not in PDF_EXPORT_MODES:
+        raise ValueError(f"Unknown pdf_export_mode '{mode}'. Available: {', '.join(PDF_EXPORT_MODES)}")
+    return mode == "passthrough" and Path(filepath).suffix.lower() == ".pdf"
+
+
+def export_grouped_output(pages_by_vendor, output_format, file_metadata, filepath, config, ocr_by_vendor=None,
+                          source_pages_by_vendor=None):
     output_paths = []
     """
     Exports grouped image pages by vendor into either multi-page TIFFs or PDFs.
 
     Args:
-        pages_by_vendor (dict): A dictionary mapping vendor names to lists of PIL Image objects.
+        pages_by_vendor (dict): A dictionary mapping vendor names to lists of PIL Image objects or
+            :class:`~processor.page_store.PageHandle` s; pages are loaded one at a time while writing.
         (Any): Unused placeholder argument (was 'base_name').
         output_format (str): Format to output, either "tif" or "pdf".
         file_metadata (dict): Metadata used for naming output files.
         filepath (str or Path): Original file path used to determine output directories.
         configs (dict): YAML configuration dict, may include 'file_format' for naming style.
+        ocr_by_vendor (dict): Optional vendor -> list of PageOCR, parallel to pages_by_vendor.
+            PDF pages get an invisible text layer from these results; no OCR is run here.
+        source_pages_by_vendor (dict): Optional vendor -> list of ``(page index, rotation)`` in the input
+            file, parallel to pages_by_vendor. With ``pdf_export_mode: passthrough`` and a PDF input,
+            these pages are copied from the input PDF instead of being rebuilt from the images
+            (text layer only with ``pdf_text_overlay``).
 
     Returns:
         list of str: Paths to the individual vendor output files. Combined PDF path is not included.
     """
+    from PIL import TiffImagePlugin
+
+    from processor.image_ops import RASTER_DPI
+    from processor.page_store import as_image
+    from processor.pdf_writer import PassthroughPDFWriter, SearchablePDFWriter, SourcePDF, encode_page_image
+
     # Auto-parse metadata from filename if no metadata passed in
     if not file_metadata:
         file_metadata = parse_input_filename_fuzzy(filepath)
@@ -72,6 +93,21 @@ def export_grouped_output(pages_by_vendor, output_format, file_metadata, filepat
     Path(out_dir).mkdir(parents=True, exist_ok=True)
     Path(combined_dir).mkdir(parents=True, exist_ok=True)
 
+    ocr_by_vendor = ocr_by_vendor or {}
+    jpeg_quality = config.get("pdf_jpeg_quality", 90)
+    passthrough = output_format == "pdf" and source_pages_by_vendor is not None \
+        and passthrough_export(filepath, config)
+    text_overlay = config.get("pdf_text_overlay", False)
+    combined_writer = None
+    if output_format == "pdf":
+        # Vendor files and the combined file are written in the same pass, no merge step
+        combined_path = combined_dir / combined_name
+        if passthrough:
+            source_pdf = SourcePDF(filepath)
+            combined_writer = PassthroughPDFWriter(combined_path)
+        else:
+            combined_writer = SearchablePDFWriter(combined_path, resolution=RASTER_DPI)
+
     total_vendors = len(pages_by_vendor)
     for i, (vendor, imgs) in enumerate(pages_by_vendor.items(), start=1):
         percent = int((i / total_vendors) * 100)
@@ -84,32 +120,38 @@ def export_grouped_output(pages_by_vendor, output_format, file_metadata, filepat
         out_path = vendor_dir / out_name
 
         if output_format == "tif":
-            imgs[0].save(out_path, save_all=True, append_images=imgs[1:])
+            with TiffImagePlugin.AppendingTiffWriter(str(out_path), new=True) as tf:
+                for p in imgs:
+                    as_image(p).save(tf, format="TIFF")
+                    tf.newFrame()
+            output_paths.append(str(out_path))
+
+        elif passthrough:
+            vendor_ocr = ocr_by_vendor.get(vendor, []) if text_overlay else []
+            writer = PassthroughPDFWriter(out_path)
+            for idx, (index, rotation) in enumerate(source_pages_by_vendor[vendor]):
+                pdf_page = source_pdf.page(index, rotation, vendor_ocr[idx] if idx < len(vendor_ocr) else None)
+                writer.add_page(pdf_page)
+                combined_writer.add_page(pdf_page)
+            writer.close()
             output_paths.append(str(out_path))
 
         elif output_format == "pdf":
-            merger = PdfMerger()
-            for p in imgs:
-                pdf_bytes = pytesseract.image_to_pdf_or_hocr(p, extension='pdf')
-                merger.append(io.BytesIO(pdf_bytes))
-            buffer = io.BytesIO()
-            merger.write(buffer)
-            merger.close()
-            buffer.seek(0)
-            with open(out_path, "wb") as f:
-                f.write(buffer.read())
+            vendor_ocr = ocr_by_vendor.get(vendor, [])
+            writer = SearchablePDFWriter(out_path, resolution=RASTER_DPI)
+            for idx, p in enumerate(imgs):
+                page_ocr = vendor_ocr[idx] if idx < len(vendor_ocr) else None
+                p = as_image(p)
+                encoded = encode_page_image(p, jpeg_quality)
+                writer.add_page(p, page_ocr, encoded=encoded)
+                combined_writer.add_page(p, page_ocr, encoded=encoded)
+            writer.close()
             output_paths.append(str(out_path))
 
         logging.info(f"\U0001F4C4 Saved {vendor} group to: {out_path}")
 
-    if output_format == "pdf":
-        combined_path = combined_dir / combined_name
-        merger = PdfMerger()
-        for pdf_path in output_paths:
-            merger.append(Path(pdf_path))
-        with open(combined_path, "wb") as f:
-            merger.write(f)
-        merger.close()
+    if combined_writer is not None:
+        combined_writer.close()
         logging.info(f"\U0001F4CE Combined PDF saved: {combined_path}")
 
     return output_paths
@@ -1,28 +1,37 @@
 # PATCHED: processor/hybrid_ocr.py
 # ✅ PaddleOCR only mode
 
-import hashlib
-import io
 import logging
-import re
+import time
 from collections import defaultdict, Counter
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
 from numpy.typing import NDArray
-import pandas as pd
 from PIL import Image
-from rapidfuzz.fuzz import partial_ratio
-from typing import List, Dict
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
-from processor.file_handler import export_grouped_output
+from processor.blank_pages import classify_back_page, load_back_hashes
+from processor.cascade import MIN_CONFIDENCE, PageDecision, cascade_stages
+from processor.file_handler import export_grouped_output, passthrough_export
 from processor.filename_utils import parse_input_filename, format_output_filename_camel
-from processor.image_ops import correct_image_orientation, apply_grayscale, extract_ticket_number, \
-    run_template_matching
-from utils.loader import load_ocr_configs_from_excel, load_templates
-from utils.ocr_wrapper import read_text
+from processor.image_ops import RASTER_CHUNK_SIZE, RASTER_DPI, TEMPLATE_DPI, apply_grayscale, apply_rotation, \
+    classify_dpi, detect_rotation, extract_ticket_number, run_template_matching
+from processor.layouts import load_layouts, vendor_key
+from processor.ocr_pool import get_ocr_pool, run_batch_task, run_page_task
+from processor.page_ocr import PageOCR, ocr_page, ocr_pages
+from processor.page_store import PageRender, PageStore, as_image, open_renders
+from processor.pdf_writer import PassthroughPDFWriter, SearchablePDFWriter, SourcePDF, encode_page_image
+from processor.template_bank import load_template_bank
+from processor.text_layer import TextPage
+from processor.vendor_matcher import get_keyword_index, normalize_text
+from utils.loader import load_ocr_configs_from_excel
+from utils.image_hash import image_digest
+from utils.ocr_cache import OCRCache, get_ocr_cache
+from utils.run_log import get_run_log
+from utils.ocr_wrapper import read_text, recognize_text
+from utils.metrics import get_metrics, increment, metrics_context, observe, stage_timer
 from utils.timing import track_time
 
 OCR_THRESHOLD = 80
@@ -31,9 +40,7 @@ MAX_TEMPLATE_HEIGHT = 800
 
 
 def hash_image(img: Image.Image) -> str:
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    return hashlib.md5(buf.getvalue()).hexdigest()
+    return image_digest(img)
 
 
 def is_oversized_template(img: NDArray) -> bool:
@@ -65,183 +72,684 @@ def get_sequenced_file_path(base_path, filename):
 
 
 def process_single_page(args):
-    i, page, filepath, config, templates, ocr_config, expected_vendor, ocr_cache = args
-    row_log = {"page": i + 1, "filename": str(filepath), "expected": expected_vendor}
-
-    try:
-        raw_result = read_text(image=page.convert("L"))
-        raw_ocr_text = raw_result.get("text", "")
-    except Exception as e:
-        raw_ocr_text = f"[OCR Failed: {e}]"
-
-    w, h = page.size
-    use_roi = config.get("use_roi", True)
-    if use_roi:
-        crop_percent = config.get("ocr_crop_top_percent", 25) / 100
-        roi = page.crop((0, 0, w, int(h * crop_percent)))
-    else:
-        roi = page
-
-    if config.get("preprocess", {}).get("downscale", True):
-        roi = roi.resize((roi.width // 2, roi.height // 2), Image.LANCZOS)
-
-    roi_hash = hash_image(roi)
-    if roi_hash in ocr_cache:
-        comp, matched, kw, preview, ocr_score = ocr_cache[roi_hash]
+    i, filepath = args[0], args[2]
+    with metrics_context(file=Path(filepath).name, page=i + 1), stage_timer("page"):
+        result = _process_single_page(args)
+    increment("pages_processed")
+    if not result[0]["matched"]:
+        increment("unmatched_pages")
+    return result
+
+
+def _prepare_page(i, page, config, ocr_cache, disk_cache):
+    """Hash, cache lookup, rotation and grayscale: everything that happens to a page before its first check."""
+    preprocess = config["preprocess"]
+    engine = config.get("ocr_engine")
+
+    # 🔁 Cache is keyed by the scanned page itself, so a hit also skips orientation detection
+    with stage_timer("hash"):
+        page_hash = hash_image(page)
+    cache_key = OCRCache.make_key(page_hash, engine, {"preprocess": preprocess,
+                                                      "engine": config.get("ocr_engine_params", {})})
+    cached = _cached_page_ocr(cache_key, ocr_cache, disk_cache)
+    if cached:
         logging.info(f"🔁 OCR cache hit on page {i + 1}")
+        rotation = cached["rotation"]
+    elif preprocess.get("rotate", True) and "rotate" not in cascade_stages(config):
+        with stage_timer("rotation"):
+            rotation = detect_rotation(page)
     else:
-        comp, matched, kw, preview, ocr_score = ocr_match_company(roi, ocr_config, config, log_row=row_log)
-        ocr_cache[roi_hash] = (comp, matched, kw, preview, ocr_score)
-
-    method = "OCR (ROI)"
-    was_rotated = was_grayscaled = False
-    if config["preprocess"].get("rotate", True):
-        page = correct_image_orientation(page)
-        was_rotated = True
-    if config["preprocess"].get("grayscale", True):
+        # Left to the cascade's "rotate" stage, which only runs for pages that stay uncertain
+        rotation = None
+
+    if rotation:
+        page = apply_rotation(page, rotation)
+    if preprocess.get("grayscale", True):
         page = apply_grayscale(page)
-        was_grayscaled = True
-
-    if not matched:
-        full_comp, full_matched, full_kw, full_preview, full_score = ocr_match_company(page, ocr_config, config,
-                                                                                       log_row=row_log)
-        if full_matched:
-            comp = full_comp
-            matched = True
-            kw = full_kw
-            preview = full_preview
-            ocr_score = full_score
-            method = "OCR (full page)"
-
-    if not matched and config.get("use_template_fallback", False):
+    return {
+        "page": page,
+        "page_hash": page_hash,
+        "cache_key": cache_key,
+        "cached": cached,
+        "rotation": rotation,
+        "grayscale": preprocess.get("grayscale", True),
+        "ocr": None,
+    }
+
+
+def _first_ocr_scope(prepared, templates, config):
+    """``"roi"``/``"full"`` if the first cascade stage that applies to this page is an OCR pass, else None."""
+    for stage in cascade_stages(config):
+        if stage == "template" and templates and config.get("use_template_fallback", False):
+            return None
+        if stage == "roi" and _roi_box(prepared["page"], config)[3] < prepared["page"].height:
+            return "roi"
+        if stage == "full":
+            return "full"
+    return None
+
+
+def process_page_batch(batch):
+    """Process several pages, running their first OCR pass as one batched engine call.
+
+    Only the first pass is batched; escalations (``ocr_cascade``) run per page.
+    """
+    config = batch[0][3]
+    engine = config.get("ocr_engine")
+    engine_params = config.get("ocr_engine_params", {})
+    disk_cache = get_ocr_cache(config)
+
+    prepared, todo = [], []
+    for i, page, filepath, _, templates, _, _, ocr_cache in batch:
+        if isinstance(page, TextPage):
+            prepared.append(None)
+            continue
+        with metrics_context(file=Path(filepath).name, page=i + 1):
+            prep = _prepare_page(i, page, config, ocr_cache, disk_cache)
+        prepared.append(prep)
+        scope = None if prep["cached"] else _first_ocr_scope(prep, templates, config)
+        if scope:
+            todo.append((i, filepath, prep, scope))
+
+    if todo:
+        images = [prep["page"].crop(_roi_box(prep["page"], config)) if scope == "roi" else prep["page"]
+                  for _, _, prep, scope in todo]
+        start = time.perf_counter()
+        results = ocr_pages(images, engine=engine, **engine_params)
+        share = (time.perf_counter() - start) / len(todo)
+        for (i, filepath, prep, scope), page_ocr in zip(todo, results):
+            page_ocr.size = tuple(prep["page"].size)
+            prep["ocr"] = (scope, page_ocr)
+            with metrics_context(file=Path(filepath).name, page=i + 1):
+                observe("ocr", share)
+                _count_ocr_pass(page_ocr, engine, scope)
+        increment("ocr_batches")
+
+    return [process_single_page(args + (prep,)) for args, prep in zip(batch, prepared)]
+
+
+def _process_single_page(args):
+    i, page, filepath, config, templates, ocr_config, expected_vendor, ocr_cache, *prepared = args
+    if isinstance(page, TextPage):
+        return _process_text_page(i, page, filepath, config, ocr_config, expected_vendor)
+    row_log = {"page": i + 1, "filename": str(filepath), "expected": expected_vendor}
+
+    engine = config.get("ocr_engine")
+    engine_params = config.get("ocr_engine_params", {})
+    stages = cascade_stages(config)
+    min_confidence = config.get("cascade_min_confidence", MIN_CONFIDENCE)
+    use_rotation = config["preprocess"].get("rotate", True)
+    layouts = load_layouts(config.get("template_dir"), rescan=False)
+
+    disk_cache = get_ocr_cache(config)
+    prep = prepared[0] if prepared else _prepare_page(i, page, config, ocr_cache, disk_cache)
+    page, page_hash, cache_key = prep["page"], prep["page_hash"], prep["cache_key"]
+    cached, rotation = prep["cached"], prep["rotation"]
+
+    roi_box = _roi_box(page, config)
+    ocr = {"roi": None, "full": None}
+    fresh = False
+    if cached and (cached["scope"] == "full" or cached.get("box") == list(roi_box)):
+        ocr[cached["scope"]] = cached["ocr"]
+    elif prep["ocr"]:
+        # OCRed ahead of time together with the rest of its batch
+        scope, ocr[scope] = prep["ocr"]
+        fresh = True
+
+    # ✅ Cheapest checks first; stop once vendor and ticket are both confident
+    decision = PageDecision()
+    read_layout = None
+    exit_stage = "exhausted"
+    for stage in stages:
+        if stage == "template":
+            if not templates or not config.get("use_template_fallback", False):
+                continue
+            if decision.matched and decision.vendor_confidence >= min_confidence:
+                continue
+            _match_template(decision, page, roi_box, templates, config, i)
+        elif stage == "roi":
+            if roi_box[3] >= page.height:
+                continue
+            if ocr["roi"] is None and ocr["full"] is None:
+                ocr["roi"] = _ocr_pass(page.crop(roi_box), engine, engine_params, "roi", size=page.size)
+                fresh = True
+            page_ocr = ocr["full"] or ocr["roi"]
+            _match_text(decision, page_ocr, roi_box, "OCR (ROI)", ocr_config, config, row_log)
+            _match_ticket(decision, page, page_ocr, i)
+        elif stage == "full":
+            if ocr["full"] is None:
+                ocr["full"] = _ocr_pass(page, engine, engine_params, "full")
+                fresh = True
+            _match_page(decision, page, ocr["full"], roi_box, ocr_config, config, row_log, i)
+        elif stage == "rotate":
+            if not use_rotation or rotation is not None:
+                continue
+            if ocr["full"] is not None and ocr["full"].orientation() is not None:
+                # The OCR pass already read the lines the right way up; the pixels are turned below
+                continue
+            with stage_timer("rotation"):
+                rotation = detect_rotation(page)
+            if not rotation:
+                continue
+            increment("pages_rotated", source="osd")
+            # Everything read so far came from a sideways page; start over on the upright one
+            page = apply_rotation(page, rotation)
+            roi_box = _roi_box(page, config)
+            ocr = {"roi": None, "full": _ocr_pass(page, engine, engine_params, "full")}
+            fresh = True
+            decision, read_layout = PageDecision(), None
+            _match_page(decision, page, ocr["full"], roi_box, ocr_config, config, row_log, i)
+        layout = layouts.get(vendor_key(decision.vendor)) if decision.matched else None
+        if layout is not None and layout is not read_layout:
+            # Vendor known: read its ticket boxes, often before any page OCR has run
+            read_layout = layout
+            _match_layout_ticket(decision, page, ocr["full"] or ocr["roi"], layout, engine, engine_params, i)
+        if decision.confident(min_confidence):
+            exit_stage = stage
+            break
+    increment("cascade_exits", stage=exit_stage)
+
+    if use_rotation and rotation is None and ocr["full"] is not None and ocr["full"].ok:
+        # Orientation for free from the full-page pass; pixels (and boxes) turn only when needed
+        rotation = ocr["full"].orientation()
+        if rotation:
+            page = apply_rotation(page, rotation)
+            ocr["full"] = ocr["full"].rotated(rotation)
+            increment("pages_rotated", source="ocr")
+
+    page_ocr = ocr["full"] if ocr["full"] is not None and ocr["full"].ok else ocr["roi"] or ocr["full"]
+    output = _output_page(filepath, i, config, rotation, prep["grayscale"])
+    if output is not None and page_ocr is not None and page_ocr.ok and decision.ticket_confidence < min_confidence:
+        # Small ticket digits are what the low classification DPI costs; re-read the candidate's line (or the
+        # vendor's layout boxes) at full DPI. Pages without a candidate are not rendered for it.
+        line = page_ocr.line_of(decision.ticket) if decision.ticket and not decision.layout_ticket else None
+        if line or read_layout is not None:
+            output = _render_full_dpi(output, "ticket")
+            if read_layout is not None:
+                _match_layout_ticket(decision, output, None, read_layout, engine, engine_params, i)
+            if line and not decision.layout_ticket:
+                _match_ticket_full_dpi(decision, output, page, line, engine, engine_params, i)
+    if page_ocr is not None and not page_ocr.ok and not decision.ticket:
+        # OCR failed; let the ticket extractor read the page itself
         try:
-            roi_np = np.array(roi)
-            if is_oversized_template(roi_np):
-                logging.warning(f"⚠️ Skipped oversized ROI template match on page {i + 1}")
-            else:
-                result = run_template_matching(roi_np, templates, config.get("template_threshold", 0.85), preview=False)
-                if result:
-                    template_vendor, score = result
-                    if score >= config.get("template_threshold", 0.85):
-                        comp = template_vendor.upper()
-                        matched = True
-                        method = f"Template ({score:.2f})"
+            with stage_timer("ticket"):
+                decision.offer_ticket(extract_ticket_number(page), 0.0)
         except Exception as e:
-            logging.error(f"⚠️ Template fallback failed on page {i + 1}: {e}")
+            logging.error(f"❌ Ticket extraction failed on page {i + 1}: {e}")
+    page_ocr = page_ocr or PageOCR(size=tuple(page.size))
+
+    if fresh and page_ocr.ok:
+        scope = "full" if page_ocr is ocr["full"] else "roi"
+        entry = {"rotation": rotation, "ocr": page_ocr, "scope": scope, "box": list(roi_box)}
+        ocr_cache[cache_key] = entry
+        if disk_cache is not None:
+            try:
+                disk_cache.put(cache_key, dict(entry, ocr=page_ocr.to_dict()))
+            except Exception as e:
+                logging.warning(f"⚠️ OCR cache write failed: {e}")
 
-    try:
-        ticket = extract_ticket_number(page)
-    except Exception as e:
-        logging.error(f"❌ Ticket extraction failed on page {i + 1}: {e}")
-        ticket = ""
+    ocr_text = page_ocr.text if page_ocr.ok else f"[OCR Failed: {page_ocr.error}]"
 
     return {
         "page": i,
         "page_image": page,
-        "vendor": comp,
-        "matched": matched,
-        "ticket": ticket,
-        "method": method,
-        "keyword": kw,
-        "rotated": was_rotated,
-        "grayscale": was_grayscaled,
-        "ocr_score": ocr_score,
+        "output_image": output,
+        "page_ocr": page_ocr,
+        "vendor": decision.vendor,
+        "matched": decision.matched,
+        "ticket": decision.ticket or "",
+        "method": decision.method,
+        "keyword": decision.keyword,
+        "rotated": bool(rotation),
+        "rotation": rotation or 0,
+        "grayscale": prep["grayscale"],
+        "ocr_score": decision.score,
+        "vendor_confidence": round(decision.vendor_confidence, 4),
+        "ticket_confidence": round(decision.ticket_confidence, 4),
         "expected_vendor": expected_vendor,
-        "preview": preview,
-        "ocr_text": raw_ocr_text.strip(),
-    }, roi_hash
+        "preview": decision.preview,
+        "ocr_text": ocr_text.strip(),
+    }, page_hash
 
 
-def ocr_match_company(pil_img, ocr_config, config, threshold=80, log_row=None):
+def _process_text_page(i, text_page, filepath, config, ocr_config, expected_vendor):
+    """Classify a page from its PDF text layer: no pixels, orientation check or OCR.
+
+    The page is only rendered (lazily, at full DPI) if the export needs pixels.
+    """
+    increment("text_layer_pages")
+    row_log = {"page": i + 1, "filename": str(filepath), "expected": expected_vendor}
+    page_ocr = text_page.page_ocr
+    grayscale = config["preprocess"].get("grayscale", True)
+
+    decision = PageDecision()
+    _match_text(decision, page_ocr, (0, 0) + tuple(page_ocr.size), "Text layer", ocr_config, config, row_log)
+    _match_ticket(decision, None, page_ocr, i)
+
+    return {
+        "page": i,
+        "page_image": None,
+        "output_image": PageRender(str(filepath), i, RASTER_DPI, 0, grayscale, config.get("poppler_path")),
+        "page_ocr": page_ocr,
+        "vendor": decision.vendor,
+        "matched": decision.matched,
+        "ticket": decision.ticket or "",
+        "method": decision.method,
+        "keyword": decision.keyword,
+        "rotated": False,
+        "rotation": 0,
+        "grayscale": grayscale,
+        "ocr_score": decision.score,
+        "vendor_confidence": round(decision.vendor_confidence, 4),
+        "ticket_confidence": round(decision.ticket_confidence, 4),
+        "expected_vendor": expected_vendor,
+        "preview": decision.preview,
+        "ocr_text": page_ocr.text,
+    }, None
+
+
+def _roi_box(page, config):
+    w, h = page.size
+    if not config.get("use_roi", True):
+        return 0, 0, w, h
+    return 0, 0, w, int(h * config.get("ocr_crop_top_percent", 25) / 100)
+
+
+def _ocr_pass(image, engine, engine_params, scope, size=None):
+    """OCR ``image``; ROI crops start at the page origin, so ``size`` is the full page's."""
+    with stage_timer("ocr"):
+        page_ocr = ocr_page(image, engine=engine, **engine_params)
+    if size is not None:
+        page_ocr.size = tuple(size)
+    _count_ocr_pass(page_ocr, engine, scope)
+    return page_ocr
+
+
+def _count_ocr_pass(page_ocr, engine, scope):
+    increment("ocr_passes", engine=engine or "default", scope=scope)
+    if not page_ocr.ok:
+        increment("ocr_failures", engine=engine or "default")
+
+
+def _match_text(decision, page_ocr, box, method, ocr_config, config, row_log):
+    """Offer the vendor matched in ``page_ocr``'s text inside ``box``, weighted by the OCR confidence."""
+    text = page_ocr.text_in(box)
+    with stage_timer("vendor_match"):
+        comp, matched, kw, preview, score = match_company_text(text, ocr_config, config, log_row=row_log)
+    if matched:
+        confidence = min(score / 100, page_ocr.confidence_of(kw))
+        decision.offer_vendor(comp, confidence, method, keyword=kw, score=score, preview=preview)
+    elif not decision.matched:
+        decision.method = decision.method or method
+        decision.preview = preview
+
+
+def _match_ticket(decision, page, page_ocr, i):
+    if not page_ocr.ok:
+        return
+    try:
+        with stage_timer("ticket"):
+            ticket = extract_ticket_number(page, text=page_ocr.text)
+    except Exception as e:
+        logging.error(f"❌ Ticket extraction failed on page {i + 1}: {e}")
+        return
+    if ticket:
+        decision.offer_ticket(ticket, page_ocr.confidence_of(ticket))
+
+
+def _match_ticket_full_dpi(decision, full, page, line, engine, engine_params, i):
+    """Read the ticket number again on ``full``, the full-DPI render of ``page``.
+
+    Only the candidate's ``line`` (from the low-DPI pass) is OCRed again.
+    """
+    sx, sy = full.width / page.width, full.height / page.height
+    x0, y0, x1, y1 = line["box"]
+    pad = (y1 - y0) * sy  # a line height all round, in case the low-DPI box clipped the digits
+    region = full.crop((max(0, int(x0 * sx - pad)), max(0, int(y0 * sy - pad)),
+                        min(full.width, int(x1 * sx + pad)), min(full.height, int(y1 * sy + pad))))
+    _match_ticket(decision, region, _ocr_pass(region, engine, engine_params, "ticket_line"), i)
+
+
+def _match_layout_ticket(decision, page, page_ocr, layout, engine, engine_params, i):
+    """Read the ticket number from ``layout``'s boxes on ``page``.
+
+    Lines an earlier OCR pass already found in a box are used as they are;
+    otherwise the box crops go through text recognition only.
+    """
+    boxes = layout.boxes_on(page.size)
+    if page_ocr is not None and page_ocr.ok and page_ocr.lines:
+        for box in boxes:
+            ticket = layout.find_ticket(page_ocr.text_in(box))
+            if ticket:
+                decision.offer_layout_ticket(ticket, page_ocr.confidence_of(ticket))
+                return
+    try:
+        with stage_timer("ticket"):
+            results = recognize_text([page.crop(box) for box in boxes], engine=engine, **engine_params)
+    except Exception as e:
+        logging.error(f"❌ Layout ticket recognition failed on page {i + 1}: {e}")
+        return
+    increment("ocr_passes", engine=engine or "default", scope="layout")
+    for result in results:
+        ticket = layout.find_ticket(result.get("text", ""))
+        if ticket:
+            decision.offer_layout_ticket(ticket, result.get("confidence", 0.0))
+            return
+
+
+def _output_page(filepath, i, config, rotation=None, grayscale=False):
+    """Full-DPI :class:`PageRender` of page ``i`` when pages are classified below it, else None."""
+    if classify_dpi(config) >= RASTER_DPI:
+        return None
+    return PageRender(str(filepath), i, RASTER_DPI, rotation or 0, grayscale, config.get("poppler_path"))
+
+
+def _render_full_dpi(output, reason):
+    with stage_timer("render"):
+        page = output.open()
+    increment("full_dpi_renders", reason=reason)
+    return page
+
+
+def _match_page(decision, page, page_ocr, roi_box, ocr_config, config, row_log, i):
+    """Vendor from the ROI text, then the whole page's text, plus the ticket number."""
+    w, h = page.size
+    _match_text(decision, page_ocr, roi_box, "OCR (ROI)", ocr_config, config, row_log)
+    if not decision.matched and roi_box[3] < h:
+        _match_text(decision, page_ocr, (0, 0, w, h), "OCR (full page)", ocr_config, config, row_log)
+    _match_ticket(decision, page, page_ocr, i)
+
+
+def _match_template(decision, page, roi_box, templates, config, i):
+    threshold = config.get("template_threshold", 0.85)
+    try:
+        roi = page.crop(roi_box)
+        factor = classify_dpi(config) / TEMPLATE_DPI
+        if config.get("preprocess", {}).get("downscale", True) and factor > 1:
+            # Bring the ROI to the templates' DPI (pages classified at low DPI may already be there)
+            roi = roi.resize((int(roi.width / factor), int(roi.height / factor)), Image.LANCZOS)
+        roi_np = np.array(roi)
+        if is_oversized_template(roi_np):
+            logging.warning(f"⚠️ Skipped oversized ROI template match on page {i + 1}")
+            return
+        increment("template_fallbacks")
+        with stage_timer("template_match"):
+            result = run_template_matching(roi_np, templates, threshold, preview=False)
+        if result:
+            template_vendor, score = result
+            if score >= threshold and decision.offer_vendor(template_vendor.upper(), score,
+                                                            f"Template ({score:.2f})"):
+                increment("template_matches")
+    except Exception as e:
+        logging.error(f"⚠️ Template fallback failed on page {i + 1}: {e}")
+
+
+def _cached_page_ocr(cache_key, ocr_cache, disk_cache):
+    """Return the cached ``{"rotation", "ocr", "scope", "box"}`` entry from memory or disk, or None."""
+    if cache_key in ocr_cache:
+        increment("ocr_cache_hits", level="memory")
+        return ocr_cache[cache_key]
+    if disk_cache is None:
+        increment("ocr_cache_misses")
+        return None
+    try:
+        entry = disk_cache.get(cache_key)
+    except Exception as e:
+        logging.warning(f"⚠️ OCR cache read failed: {e}")
+        return None
+    if entry is None:
+        increment("ocr_cache_misses")
+        return None
+    increment("ocr_cache_hits", level="disk")
+    # Entries written before the cascade always held a full-page OCR
+    cached = {"rotation": entry.get("rotation"), "ocr": PageOCR.from_dict(entry["ocr"]),
+              "scope": entry.get("scope", "full"), "box": entry.get("box")}
+    ocr_cache[cache_key] = cached
+    return cached
+
+
+def ocr_match_company(pil_img, ocr_config, config, threshold=OCR_THRESHOLD, log_row=None):
     try:
         max_w = config.get("ocr_resize_max_width", 1200)
         if pil_img.width > max_w:
             pil_img = pil_img.resize((max_w, int(pil_img.height * max_w / pil_img.width)))
 
-        raw_result = read_text(pil_img)
+        raw_result = read_text(pil_img, engine=config.get("ocr_engine"))
         ocr_text = raw_result.get("text", "")
-        ocr_text = re.sub(r"[^a-z0-9]+", "", ocr_text.lower())
-        if config.get("debug"):
-            logging.debug(f"OCR preview: {ocr_text[:200]}")
     except Exception as e:
         logging.error(f"OCR Exception: {e}")
         return "Unknown", False, "", "[OCR failed]", 0
 
-    def best_match(companies):
-        scored_matches = []
-        for company, data in companies:
-            for kw in data.get("keywords", []):
-                kw_clean = re.sub(r"[^a-z0-9]+", "", kw.lower())
-                if kw_clean in config.get("exclude_keywords", []) and company.lower() != kw_clean:
-                    continue
-                score = partial_ratio(kw_clean, ocr_text)
-                scored_matches.append((company, score, kw))
-
-        top_matches = sorted(scored_matches, key=lambda x: x[1], reverse=True)[:5]
-        if log_row is not None:
-            for idx, (comp, sc, term) in enumerate(top_matches):
-                log_row[f"match_{idx + 1}_company"] = comp
-                log_row[f"match_{idx + 1}_score"] = sc
-                log_row[f"match_{idx + 1}_kw"] = term
-        return max(top_matches, key=lambda x: x[1], default=("Unknown", 0, ""))
-
-    for group_name in ["trucking", "materials"]:
-        group = [(c, d) for c, d in ocr_config.items() if d.get("vendor_type", "").lower() == group_name]
-        comp, score, kw = best_match(group)
-        if comp != "Unknown" and score >= threshold:
-            return comp, True, kw, ocr_text[:300], score
-
-    others = [(c, d) for c, d in ocr_config.items() if
-              d.get("vendor_type", "").lower() not in ("trucking", "materials")]
-    comp, score, kw = best_match(others)
-    if comp != "Unknown" and score >= threshold:
+    return match_company_text(ocr_text, ocr_config, config, threshold=threshold, log_row=log_row)
+
+
+def match_company_text(ocr_text, ocr_config, config, threshold=OCR_THRESHOLD, log_row=None):
+    """Match already-recognized text against the vendor keyword sheet."""
+    ocr_text = normalize_text(ocr_text)
+    if config.get("debug"):
+        logging.debug(f"OCR preview: {ocr_text[:200]}")
+
+    index = get_keyword_index(ocr_config, config.get("exclude_keywords", []))
+    best = index.match(ocr_text, threshold, log_row=log_row)
+    if best:
+        comp, score, kw = best
         return comp, True, kw, ocr_text[:300], score
 
     return "Unknown", False, "", ocr_text[:300], 0
 
 
+def _batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _back_page_skip_reason(i, page, filepath, config, back_hashes):
+    """Why back page ``i`` needs no OCR (``"blank"``, ``"boilerplate:<name>"``, ``"not OCRed"``), or None."""
+    if not config.get("ocr_back_pages", False):
+        reason = "not OCRed"
+    else:
+        with metrics_context(file=Path(filepath).name, page=i + 1), stage_timer("back_check"):
+            reason = classify_back_page(page, config, back_hashes)
+    if reason:
+        increment("back_pages_skipped", kind=reason.split(":")[0])
+        logging.info(f"⏭️ Page {i + 1}: back page skipped ({reason})")
+    return reason
+
+
+def _spill(result, store, render=True):
+    """Move a processed page's image into the page store; everything after this handles references.
+
+    A page classified at low DPI is stored as its full-DPI render instead,
+    rendered here unless ticket extraction or :func:`_spill_all` already did.
+    Without ``render`` (passthrough PDF export needs no pixels) it is never
+    rendered.
+    """
+    res, page_hash = result
+    output = res.pop("output_image", None)
+    if isinstance(output, PageRender) and not render:
+        output = None
+    elif isinstance(output, PageRender):
+        output = _render_full_dpi(output, "export")
+    if output is not None:
+        res["page_image"] = output
+    res["page_image"] = store.put(res["page_image"])
+    return res, page_hash
+
+
+def _spill_all(results, store, render=True, chunk_size=RASTER_CHUNK_SIZE):
+    """:func:`_spill` each result, rendering the full-DPI pages ``chunk_size`` at a time (one Poppler call per run)."""
+    for chunk in _batched(results, chunk_size):
+        renders = [res for res, _ in chunk if isinstance(res.get("output_image"), PageRender)] if render else []
+        if renders:
+            with stage_timer("render"):
+                images = open_renders([res["output_image"] for res in renders])
+            increment("full_dpi_renders", len(renders), reason="export")
+            for res, image in zip(renders, images):
+                res["output_image"] = image
+        for result in chunk:
+            yield _spill(result, store, render)
+
+
+def _with_back_pages(results, skipped_backs, config):
+    """Merge skipped backs into ``results`` in page order, filing each back with its front's vendor.
+
+    OCRed backs only inherit the front's vendor when they did not match one themselves.
+    """
+    grayscale = config.get("preprocess", {}).get("grayscale", True)
+    for i, (page, reason) in skipped_backs.items():
+        results.append(({
+            "page": i,
+            "page_image": page,
+            "page_ocr": PageOCR(size=page.size),
+            "ticket": "",
+            "method": f"Back page ({reason.replace(':', ': ')})",
+            "keyword": "",
+            "rotated": False,
+            "rotation": 0,
+            "grayscale": grayscale,
+            "ocr_score": 0,
+            "expected_vendor": "",
+            "preview": "",
+            "ocr_text": "",
+        }, None))
+    results.sort(key=lambda r: r[0]["page"])
+
+    fronts = {}
+    for res, _ in results:
+        if res["page"] % 2 == 0:
+            fronts[res["page"]] = res
+            continue
+        if res["page"] not in skipped_backs and res.get("matched"):
+            # Matched on its own: a front out of step with the pairing (odd page count, single-sided sheet)
+            continue
+        front = fronts.get(res["page"] - 1)
+        if res["page"] not in skipped_backs:
+            res["method"] = f"Back page ({res['method']})"
+        res["vendor"] = front["vendor"] if front else res.get("vendor", "Unknown")
+        res["matched"] = front["matched"] if front else res.get("matched", False)
+    return results
+
+
 def process_pages(
-    pages: List[Image.Image],
+    pages: Iterable[Image.Image],
     filepath: str,
     config: Dict,
-    suffix: str = ""
+    suffix: str = "",
+    ocr_log: Optional[List[Tuple]] = None,
+    duplex: bool = False
 ) -> List[str]:
-    logging.info(f"🧠 Starting OCR processing for {len(pages)} pages...")
-    templates = load_templates(config["template_dir"]) if config.get("use_template_fallback", True) else {}
+    """OCR, sort and export the pages of one input file.
+
+    With ``duplex`` the pages alternate front/back. Back pages are checked for
+    ink and known boilerplate before OCR; blank and boilerplate backs (and all
+    backs unless ``ocr_back_pages`` is set) skip OCR, and every back is filed
+    with its front's vendor.
+
+    Pages are spilled to a :class:`PageStore` as soon as they are processed,
+    so grouping passes handles around and export reads one page at a time.
+    With ``classify_dpi`` below ``RASTER_DPI`` the pages passed in are the
+    low-DPI ones; each is rendered again at full DPI once, for its ticket
+    number if that is still uncertain and for export.
+    """
+    with PageStore(config.get("page_store_dir"), config.get("page_store_format", "raw")) as store:
+        return _process_pages(pages, filepath, config, store, ocr_log=ocr_log, duplex=duplex)
+
+
+def _process_pages(pages, filepath, config, store, ocr_log=None, duplex=False):
+    if hasattr(pages, "__len__"):
+        logging.info(f"🧠 Starting OCR processing for {len(pages)} pages...")
+    else:
+        logging.info("🧠 Starting OCR processing for streamed pages...")
     base_name = Path(filepath).stem.upper()
     file_metadata = parse_input_filename(filepath)
-    ocr_config = load_ocr_configs_from_excel(config["keyword_file"])
-    ocr_cache = {}
+    num_workers = config.get("num_workers", 4)
 
     pages_by_vendor = defaultdict(list)
+    ocr_by_vendor = defaultdict(list)
+    source_pages_by_vendor = defaultdict(list)
+    # Passthrough PDF export copies the input's pages, so pages are never rendered again for it
+    passthrough = config["output_format"].lower() == "pdf" and passthrough_export(filepath, config)
     log_entries = []
     match_stats = Counter()
     unmatched_pages = []
     expected_list = config.get("expected_vendors", [])
-    crop_pct = config.get("ocr_crop_top_percent", 25) / 100
     ocr_text_log = []
 
-    tasks = [
-        (
-            i,
-            page,
-            filepath,
-            config,
-            templates,
-            ocr_config,
-            expected_list[i] if i < len(expected_list) else "",
-            ocr_cache,
-        )
-        for i, page in enumerate(pages)
-    ]
+    skipped_backs = {}
+    back_hashes = load_back_hashes(config.get("back_template_dir")) if duplex else []
+
+    def pages_to_ocr():
+        for i, page in enumerate(pages):
+            if duplex and i % 2 and not isinstance(page, TextPage):
+                reason = _back_page_skip_reason(i, page, filepath, config, back_hashes)
+                if reason:
+                    grayscale = config.get("preprocess", {}).get("grayscale", True)
+                    output = _output_page(filepath, i, config, grayscale=grayscale)
+                    if output is not None and not passthrough:
+                        page = _render_full_dpi(output, "export")
+                    elif grayscale:
+                        page = apply_grayscale(page)
+                    skipped_backs[i] = (store.put(page), reason)
+                    continue
+            yield i, page
 
+    batch_size = max(1, int(config.get("ocr_batch_size", 1)))
     with track_time("ocr_processing"):
-        with ThreadPoolExecutor(max_workers=config.get("num_workers", 4)) as executor:
-            results = list(executor.map(process_single_page, tasks))
+        if num_workers > 1:
+            # Each worker process loads the OCR model, templates and keywords once
+            pool = get_ocr_pool(num_workers, config.get("ocr_engine"), config.get("ocr_engine_params"))
+            tasks = (
+                (i, page, filepath, config, expected_list[i] if i < len(expected_list) else "")
+                for i, page in pages_to_ocr()
+            )
+            if batch_size > 1:
+                batches = pool.imap(run_batch_task, _batched(tasks, batch_size), max_in_flight=num_workers + 1)
+                processed = (result for batch in batches for result in batch)
+            else:
+                processed = pool.imap(run_page_task, tasks)
+        else:
+            templates = load_template_bank(config["template_dir"], config.get("template_cache")) \
+                if config.get("use_template_fallback", True) else {}
+            load_layouts(config.get("template_dir"))
+            ocr_config = load_ocr_configs_from_excel(config["keyword_file"])
+            ocr_cache = {}
+            page_args = (
+                (
+                    i,
+                    page,
+                    filepath,
+                    config,
+                    templates,
+                    ocr_config,
+                    expected_list[i] if i < len(expected_list) else "",
+                    ocr_cache,
+                )
+                for i, page in pages_to_ocr()
+            )
+            if batch_size > 1:
+                processed = (result for batch in _batched(page_args, batch_size)
+                             for result in process_page_batch(batch))
+            else:
+                processed = (process_single_page(args) for args in page_args)
+        results = list(_spill_all(processed, store, not passthrough,
+                                  config.get("raster_chunk_size", RASTER_CHUNK_SIZE)))
+
+    if duplex:
+        results = _with_back_pages(results, skipped_backs, config)
 
     for (res, roi_hash) in results:
+        # Pages OCRed in worker processes bring their metrics back with the result
+        get_metrics().merge(res.pop("metrics", None))
         i, page, comp, matched = res["page"], res["page_image"], res["vendor"], res["matched"]
         pages_by_vendor[comp].append(page)
+        ocr_by_vendor[comp].append(res.get("page_ocr"))
+        source_pages_by_vendor[comp].append((i, res.get("rotation", 0)))
         log_entries.append({
             "Filename": base_name,
             "Page": i + 1,
@@ -258,56 +766,65 @@ def process_pages(
             "Vendor": comp,
             "OCR Text": res["ocr_text"]
         })
+        if ocr_log is not None:
+            ocr_log.append((Path(filepath).name, i + 1, comp, res["ocr_text"]))
         match_stats[comp] += 1
         if not matched:
             unmatched_pages.append(page)
 
-    from datetime import datetime
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    ocr_log_path = Path(filepath).parent / f"ocr_text_log_{ts}.csv"
-
+    log_dir = Path(filepath).parent / "logs"
+    run_log = get_run_log(log_dir)
     try:
-        pd.DataFrame(ocr_text_log).to_csv(ocr_log_path, index=False)
-        logging.info(f"📤 OCR text log saved: {ocr_log_path}")
+        run_log.append_ocr_text(ocr_text_log)
+        logging.info(f"📤 OCR text journaled: {run_log.path}")
     except Exception as e:
         logging.warning(f"⚠️ Failed to save OCR text log: {e}")
 
     with track_time("export_output"):
-        output_paths = export_grouped_output(pages_by_vendor, config["output_format"], file_metadata, filepath, config)
+        output_paths = export_grouped_output(pages_by_vendor, config["output_format"], file_metadata, filepath, config,
+                                             ocr_by_vendor=ocr_by_vendor,
+                                             source_pages_by_vendor=source_pages_by_vendor)
 
     if config["output_format"].lower() == "pdf":
         combined_name = format_output_filename_camel(
             vendor="",
-            page_count=len(pages),
+            page_count=len(results),
             meta=file_metadata,
             output_format="pdf"
         ).replace("__", "_").replace("._", ".")
         combined_path = get_sequenced_file_path(Path(filepath).parent, combined_name)
 
-        compressed_pages = []
         pdf_scale = config.get("pdf_resize_scale", 0.5)  # Default to 50% if not defined
         pdf_resolution = config.get("pdf_resolution", 150)  # Default to 150 DPI
 
-        for vendor, imgs in pages_by_vendor.items():
-            for p in imgs:
-                try:
-                    rgb = p.convert("RGB")
-                    if pdf_scale < 1.0:
-                        rgb = rgb.resize((int(rgb.width * pdf_scale), int(rgb.height * pdf_scale)), Image.LANCZOS)
-                    compressed_pages.append(rgb)
-                except Exception as e:
-                    logging.error(f"Failed to prepare image for PDF: {e}")
-
-        if compressed_pages:
+        if passthrough:
+            # The input's own pages in vendor order; nothing to decode, scale or re-encode
+            writer = PassthroughPDFWriter(combined_path)
+            try:
+                source_pdf = SourcePDF(filepath)
+                for vendor, refs in source_pages_by_vendor.items():
+                    for index, rotation in refs:
+                        writer.add_page(source_pdf.page(index, rotation))
+            except Exception as e:
+                logging.error(f"Failed to copy pages for PDF: {e}")
+        else:
+            # Streamed: one page is decoded, scaled and written at a time
+            writer = SearchablePDFWriter(combined_path, resolution=pdf_resolution)
+            for vendor, imgs in pages_by_vendor.items():
+                for p in imgs:
+                    try:
+                        rgb = as_image(p).convert("RGB")
+                        if pdf_scale < 1.0:
+                            rgb = rgb.resize((int(rgb.width * pdf_scale), int(rgb.height * pdf_scale)),
+                                             Image.LANCZOS)
+                        with track_time("save_combined_pdf"):
+                            writer.add_page(rgb, encoded=encode_page_image(rgb, config.get("pdf_jpeg_quality", 90)))
+                    except Exception as e:
+                        logging.error(f"Failed to prepare image for PDF: {e}")
+
+        if writer.page_count:
             try:
-                with track_time("save_combined_pdf"):
-                    compressed_pages[0].save(
-                        combined_path,
-                        save_all=True,
-                        append_images=compressed_pages[1:],
-                        format="PDF",
-                        resolution=pdf_resolution
-                    )
+                writer.close()
                 logging.info(f"📎 Compressed combined PDF saved: {combined_path}")
             except Exception as e:
                 logging.error(f"❌ Failed to save combined compressed PDF: {e}")
@@ -336,42 +853,15 @@ def process_pages(
         row.clear()
         row.update(reordered)
 
-    log_dir = Path(filepath).parent / "logs"
-    log_dir.mkdir(exist_ok=True)
-    log_file = log_dir / f"{job_id}_{job_date}_TruckingLog.xlsx"
-
-    if log_file.exists():
+    # 📝 Constant-cost append; the Excel workbook is built from the journal at batch end
+    with track_time("write_log"):
         try:
-            existing = pd.read_excel(log_file)
-            new = pd.DataFrame(log_entries)
-            combined = pd.concat([existing, new], ignore_index=True)
+            run_log.append_trucking_rows(job_id, job_date, log_entries)
+            logging.info(f"📝 Logged {len(log_entries)} rows for {job_id}_{job_date} to: {run_log.path}")
         except Exception as e:
-            logging.error(f"❌ Failed to load/append to existing log file: {e}")
-            combined = pd.DataFrame(log_entries)
-    else:
-        combined = pd.DataFrame(log_entries)
-
-    try:
-        combined.to_excel(log_file, index=False)
-        logging.info(f"📝 Log saved to: {log_file}")
-    except PermissionError:
-        logging.warning(f"🔒 Log file locked: {log_file}, saving backup copy...")
-        seq = 1
-        while True:
-            fallback_log_file = log_file.with_name(log_file.stem + f"_{seq}" + log_file.suffix)
-            if not fallback_log_file.exists():
-                try:
-                    combined.to_excel(fallback_log_file, index=False)
-                    logging.info(f"📝 Backup log saved to: {fallback_log_file}")
-                    break
-                except Exception as e:
-                    logging.error(f"❌ Failed to save fallback log: {e}")
-                    break
-            seq += 1
-    except Exception as e:
-        logging.error(f"❌ Failed to write Excel log: {e}")
+            logging.error(f"❌ Failed to write run log: {e}")
 
-    logging.info(f"✅ Processed {len(pages)} pages. Vendors matched: {dict(match_stats)}")
+    logging.info(f"✅ Processed {len(results)} pages. Vendors matched: {dict(match_stats)}")
     if unmatched_pages:
         logging.warning(f"⚠️ {len(unmatched_pages)} pages unmatched.")
 
@@ -3,58 +3,190 @@ import logging
 import re
 from pathlib import Path
 
-import pytesseract
 from PIL import Image
 
 
+RASTER_DPI = 300
+RASTER_CHUNK_SIZE = 8
+# Vendor templates are cut from pages at half the raster DPI
+TEMPLATE_DPI = RASTER_DPI // 2
+# Ticket numbers of vendors without a layout profile (processor.layouts)
+TICKET_PATTERN = r"(A[\s\-:]?\d{5,})"
+# Longest side of the thumbnail used for orientation detection (~140 DPI for a letter page)
+ROTATION_THUMBNAIL_SIDE = 1600
+
+
 def extract_images_from_file(filepath, poppler_path):
-    from pdf2image import convert_from_path
+    return list(iter_images_from_file(filepath, poppler_path))
+
+
+def classify_dpi(config):
+    """DPI pages are rasterized at for classification (``classify_dpi``); never above the full ``RASTER_DPI``."""
+    return min(int(config.get("classify_dpi") or RASTER_DPI), RASTER_DPI)
+
+
+def iter_images_from_file(filepath, poppler_path, chunk_size=RASTER_CHUNK_SIZE, dpi=RASTER_DPI,
+                          text_layer_min_chars=0):
+    """Yield the pages of a PDF/TIFF/image one at a time.
+
+    PDFs are rasterized ``chunk_size`` pages at a time through pdf2image's
+    ``first_page``/``last_page`` so memory stays bounded by the chunk rather
+    than the length of the document. Below ``RASTER_DPI``, scanned images are
+    reduced to roughly ``dpi`` as well.
+
+    With ``text_layer_min_chars``, PDF pages whose embedded text has at least
+    that many letters and digits are yielded as
+    :class:`~processor.text_layer.TextPage` s and never rasterized.
 
+    Extraction errors are logged and re-raised, even after some pages were
+    yielded.
+    """
     ext = Path(filepath).suffix.lower()
     logging.info(f"📄 Extracting images from: {filepath} (ext: {ext})")
 
     try:
         if ext in [".tif", ".tiff"]:
             img = Image.open(filepath)
-            pages = []
             while True:
-                pages.append(img.copy())
+                yield _at_dpi(img.copy(), dpi)
                 try:
                     img.seek(img.tell() + 1)
                 except EOFError:
                     break
-            return pages
 
         elif ext == ".pdf":
-            return convert_from_path(filepath, dpi=300, poppler_path=poppler_path)
+            from pdf2image import convert_from_path, pdfinfo_from_path
 
-        elif ext in [".png", ".jpg", ".jpeg"]:
-            return [Image.open(filepath)]
+            reader = None
+            if text_layer_min_chars:
+                from PyPDF2 import PdfReader
+
+                reader = PdfReader(str(filepath))
+                page_count = len(reader.pages)
+            else:
+                page_count = pdfinfo_from_path(filepath, poppler_path=poppler_path)["Pages"]
+            for first in range(1, page_count + 1, chunk_size):
+                last = min(first + chunk_size - 1, page_count)
+                text_pages = _text_pages(reader, first, last, dpi, text_layer_min_chars) if reader else {}
+                chunk = {}
+                for run_first, run_last in _runs(n for n in range(first, last + 1) if n not in text_pages):
+                    images = convert_from_path(filepath, dpi=dpi, poppler_path=poppler_path,
+                                               first_page=run_first, last_page=run_last)
+                    chunk.update(zip(range(run_first, run_last + 1), images))
+                for n in range(first, last + 1):
+                    yield text_pages[n] if n in text_pages else chunk.pop(n)
 
-        return []
+        elif ext in [".png", ".jpg", ".jpeg"]:
+            yield _at_dpi(Image.open(filepath), dpi)
 
     except Exception as e:
+        # A short page stream would be exported as if it were the whole file; let the batch mark it failed
         logging.error(f"❌ Failed to extract images: {e}")
-        return []
+        raise
+
+
+def _text_pages(reader, first, last, dpi, min_chars):
+    """``{page number: TextPage}`` for the pages ``first``..``last`` (1-based) with a usable text layer."""
+    from processor.text_layer import TextPage, read_text_layer
+
+    pages = {}
+    for n in range(first, last + 1):
+        page_ocr = read_text_layer(reader.pages[n - 1], dpi, min_chars)
+        if page_ocr is not None:
+            pages[n] = TextPage(page_ocr)
+    return pages
+
+
+def _runs(numbers):
+    """Consecutive runs in increasing ``numbers`` as ``(first, last)`` pairs."""
+    run = None
+    for n in numbers:
+        if run and n == run[1] + 1:
+            run[1] = n
+            continue
+        if run:
+            yield tuple(run)
+        run = [n, n]
+    if run:
+        yield tuple(run)
+
+
+def render_page(filepath, index, poppler_path, dpi=RASTER_DPI):
+    """Rasterize page ``index`` (0-based) of ``filepath`` on its own.
+
+    PDF pages are rendered at ``dpi``; TIFF frames and images come back at
+    the resolution they were scanned at.
+    """
+    return render_pages(filepath, [index], poppler_path, dpi)[0]
+
+
+def render_pages(filepath, indices, poppler_path, dpi=RASTER_DPI):
+    """Rasterize the pages ``indices`` (0-based) of ``filepath``, in the order given.
+
+    Consecutive PDF pages share one Poppler call, so re-rendering a chunk of
+    pages costs one process start instead of one per page.
+    """
+    rendered = {}
+    if Path(filepath).suffix.lower() == ".pdf":
+        from pdf2image import convert_from_path
+
+        for first, last in _runs(sorted(set(n + 1 for n in indices))):
+            images = convert_from_path(filepath, dpi=dpi, poppler_path=poppler_path, first_page=first, last_page=last)
+            rendered.update(zip(range(first - 1, last), images))
+    else:
+        with Image.open(filepath) as img:
+            for index in sorted(set(indices)):
+                img.seek(index)
+                rendered[index] = img.copy()
+    return [rendered[index] for index in indices]
+
+
+def reduce_image(pil_img, factor):
+    """Shrink by an integer ``factor`` (a box filter, much cheaper than a resize)."""
+    if factor < 2:
+        return pil_img
+    if pil_img.mode == "1":
+        pil_img = pil_img.convert("L")
+    elif pil_img.mode not in ("L", "RGB", "RGBA"):
+        pil_img = pil_img.convert("RGB")
+    return pil_img.reduce(factor)
+
+
+def _at_dpi(pil_img, dpi):
+    if dpi >= RASTER_DPI:
+        return pil_img
+    # Scans without DPI information are taken to be at the full raster DPI
+    scanned = float((pil_img.info.get("dpi") or (RASTER_DPI,))[0] or RASTER_DPI)
+    return reduce_image(pil_img, round(scanned / dpi))
 
 
 def correct_image_orientation(pil_img):
+    return apply_rotation(pil_img, detect_rotation(pil_img))
+
+
+def orientation_thumbnail(pil_img, max_side=ROTATION_THUMBNAIL_SIDE):
+    """Integer-factor reduction of the page; plenty of resolution for orientation, a fraction of the pixels."""
+    return reduce_image(pil_img, max(pil_img.size) // max_side)
+
+
+def detect_rotation(pil_img, max_side=ROTATION_THUMBNAIL_SIDE):
+    """Return the clockwise rotation (0, 90, 180 or 270) Tesseract OSD says the page needs.
+
+    OSD runs on a thumbnail of the page (see :func:`orientation_thumbnail`).
+    """
+    from utils import ocr_tesseract
+
     try:
-        osd = pytesseract.image_to_osd(pil_img)
-        rotation_match = re.search(r"Rotate: (\d+)", osd)
-        if rotation_match:
-            rotation = int(rotation_match.group(1))
-            if rotation == 90:
-                return pil_img.rotate(-90, expand=True)
-            elif rotation == 180:
-                return pil_img.rotate(180, expand=True)
-            elif rotation == 270:
-                return pil_img.rotate(-270, expand=True)
-    except pytesseract.TesseractError as e:
-        logging.error(f"Tesseract error during orientation detection: {e}")
+        return ocr_tesseract.detect_rotation(orientation_thumbnail(pil_img, max_side))
     except Exception as e:
         logging.error(f"Unexpected error in orientation correction: {e}")
 
+    return 0
+
+
+def apply_rotation(pil_img, rotation):
+    if rotation in (90, 180, 270):
+        return pil_img.rotate(-rotation, expand=True)
     return pil_img
 
 
@@ -62,104 +194,93 @@ def apply_grayscale(pil_img):
     return pil_img.convert("L")
 
 
-def extract_ticket_number(pil_img):
-    text = pytesseract.image_to_string(pil_img)
+def extract_ticket_number(pil_img, text=None):
+    """Find the ticket number on a page.
+
+    When ``text`` is given (the page's existing OCR result) it is searched
+    directly and no further OCR is run on ``pil_img``.
+    """
+    if text is None:
+        from utils.ocr_tesseract import image_to_string
+
+        text = image_to_string(pil_img)
+    return extract_ticket_number_from_text(text)
+
+
+def extract_ticket_number_from_text(text):
     text = text.replace("\n", " ").strip()
-    match = re.search(r"(A[\s\-:]?\d{5,})", text, re.IGNORECASE)
+    match = re.search(TICKET_PATTERN, text, re.IGNORECASE)
     if match:
         ticket_number = match.group(1).replace(" ", "").replace("-", "")
         return ticket_number
-    # """
-    # page_image: full page (RGB or grayscale) as np.array
-    # template_dict: {"VENDOR": [template_image1, template_image2, ...]}
-    # Returns: best matched vendor and score
-    # """
 
 
 def run_template_matching(page_image, template_dict, threshold=0.85, preview=True):
-    import cv2
-    import os
-    import shutil
+    """Match a page (or ROI) against vendor templates.
+
+    ``template_dict`` may be a :class:`~processor.template_bank.TemplateBank`
+    (preferred; pyramids are precomputed) or the legacy
+    ``{"VENDOR": [template_image, ...]}`` mapping.
+    Returns ``(vendor, score)``; vendor is ``"Unknown"`` below ``threshold``.
+    """
+    from processor.template_bank import TemplateBank
 
     if page_image is None or not hasattr(page_image, "shape"):
         raise ValueError("Invalid page image passed to run_template_matching")
 
-    if page_image.ndim == 3 and page_image.shape[2] == 3:
-        page_gray = cv2.cvtColor(page_image, cv2.COLOR_RGB2GRAY)
-    else:
-        page_gray = page_image
-
-    best_score = -1
-    best_vendor = "Unknown"
-    best_location = None
-    best_template = None
-
-    # Clear old match previews
-    preview_dir = "match_previews"
-    if os.path.exists(preview_dir):
-        shutil.rmtree(preview_dir)
-    os.makedirs(preview_dir, exist_ok=True)
-
-    for vendor, templates in template_dict.items():
-        for template in templates:
-            if template.ndim == 3 and template.shape[2] == 3:
-                temp_gray = cv2.cvtColor(template, cv2.COLOR_RGB2GRAY)
-            else:
-                temp_gray = template
-
-            # Skip template if it's larger than the page
-            if (
-                    temp_gray.shape[0] > page_gray.shape[0]
-                    or temp_gray.shape[1] > page_gray.shape[1]
-            ):
-                logging.warning(
-                    f"Skipped oversized template for vendor '{vendor}'"
-                )
-                continue
-
-            result = cv2.matchTemplate(page_gray, temp_gray, cv2.TM_CCOEFF_NORMED)
-            min_val, score, min_loc, max_loc = cv2.minMaxLoc(result)
-
-            logging.debug(f"Vendor: {vendor} | Score: {score:.3f}")
-
-            if score > best_score:
-                best_score = score
-                best_vendor = vendor
-                best_location = max_loc
-                best_template = temp_gray
+    bank = template_dict if isinstance(template_dict, TemplateBank) else TemplateBank.from_dict(template_dict)
+    best_vendor, best_score, best_location, best_template = bank.match(page_image)
 
     if best_score >= threshold:
-        try:
-            import matplotlib.pyplot as plt
-
-            h, w = best_template.shape[:2]
-            vis_img = page_gray.copy()
-            vis_img = cv2.cvtColor(vis_img, cv2.COLOR_GRAY2BGR)
-            cv2.rectangle(
-                vis_img,
-                best_location,
-                (best_location[0] + w, best_location[1] + h),
-                (0, 255, 0),
-                2,
-            )
-
-            save_path = os.path.join(
-                preview_dir, f"match_{best_vendor}_{round(best_score * 100)}.png"
-            )
-            if preview:
-                cv2.imwrite(save_path, vis_img)
-                logging.info(f"Match preview saved: {save_path}")
-
-                plt.figure(figsize=(10, 6))
-                plt.title(f"Matched: {best_vendor} ({best_score:.3f})")
-                plt.imshow(cv2.cvtColor(vis_img, cv2.COLOR_BGR2RGB))
-                plt.axis("off")
-                plt.show()
-
-        except Exception as e:
-            logging.warning(
-                f"Could not display/save match visualization: {e}"
-            )
+        if preview:
+            _save_match_preview(page_image, best_vendor, best_score, best_location, best_template)
         return best_vendor, round(best_score, 3)
     else:
         return "Unknown", round(best_score, 3)
+
+
+def _save_match_preview(page_image, best_vendor, best_score, best_location, best_template):
+    import cv2
+    import os
+    import shutil
+
+    try:
+        import matplotlib.pyplot as plt
+
+        # Clear old match previews
+        preview_dir = "match_previews"
+        if os.path.exists(preview_dir):
+            shutil.rmtree(preview_dir)
+        os.makedirs(preview_dir, exist_ok=True)
+
+        if page_image.ndim == 3 and page_image.shape[2] == 3:
+            page_gray = cv2.cvtColor(page_image, cv2.COLOR_RGB2GRAY)
+        else:
+            page_gray = page_image
+
+        h, w = best_template.shape[:2]
+        vis_img = cv2.cvtColor(page_gray.copy(), cv2.COLOR_GRAY2BGR)
+        cv2.rectangle(
+            vis_img,
+            best_location,
+            (best_location[0] + w, best_location[1] + h),
+            (0, 255, 0),
+            2,
+        )
+
+        save_path = os.path.join(
+            preview_dir, f"match_{best_vendor}_{round(best_score * 100)}.png"
+        )
+        cv2.imwrite(save_path, vis_img)
+        logging.info(f"Match preview saved: {save_path}")
+
+        plt.figure(figsize=(10, 6))
+        plt.title(f"Matched: {best_vendor} ({best_score:.3f})")
+        plt.imshow(cv2.cvtColor(vis_img, cv2.COLOR_BGR2RGB))
+        plt.axis("off")
+        plt.show()
+
+    except Exception as e:
+        logging.warning(
+            f"Could not display/save match visualization: {e}"
+        )
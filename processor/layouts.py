@@ -0,0 +1,100 @@
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Pattern, Tuple
+
+from processor.image_ops import TICKET_PATTERN
+
+LAYOUT_FILE = "layout.yaml"
+
+_layouts = {}
+_layouts_lock = threading.Lock()
+
+
+def vendor_key(vendor):
+    """Vendor names compared without case, spaces or punctuation (keyword sheet vs. template folder)."""
+    return re.sub(r"[^a-z0-9]", "", str(vendor).lower())
+
+
+@dataclass(frozen=True)
+class VendorLayout:
+    """Where a vendor prints its ticket number, read from ``template_dir/<Vendor>/layout.yaml``::
+
+        ticket_boxes:            # x0, y0, x1, y1 as fractions of the upright page
+          - [0.62, 0.04, 0.97, 0.11]
+        ticket_pattern: 'No\\.?\\s*(\\d{6})'   # group 1 (else the whole match); default TICKET_PATTERN
+
+    The boxes are read with text recognition only: no text detection, no
+    full-page OCR.
+    """
+
+    vendor: str
+    ticket_boxes: Tuple[Tuple[float, float, float, float], ...]
+    ticket_pattern: Pattern
+
+    def boxes_on(self, size):
+        """The ticket boxes in pixels on a page of ``size``."""
+        w, h = size
+        return [(int(x0 * w), int(y0 * h), int(x1 * w), int(y1 * h)) for x0, y0, x1, y1 in self.ticket_boxes]
+
+    def find_ticket(self, text):
+        match = self.ticket_pattern.search(text.replace("\n", " "))
+        if not match:
+            return None
+        ticket = match.group(1) if match.groups() else match.group(0)
+        return ticket.replace(" ", "").replace("-", "")
+
+    @classmethod
+    def from_dict(cls, vendor, data):
+        boxes = tuple(tuple(float(v) for v in box) for box in data.get("ticket_boxes") or ())
+        for box in boxes:
+            if len(box) != 4 or not (0 <= box[0] < box[2] <= 1 and 0 <= box[1] < box[3] <= 1):
+                raise ValueError(f"ticket box {list(box)} is not x0, y0, x1, y1 fractions of the page")
+        if not boxes:
+            raise ValueError("no ticket_boxes")
+        return cls(vendor, boxes, re.compile(data.get("ticket_pattern") or TICKET_PATTERN, re.IGNORECASE))
+
+
+def load_layouts(template_dir, rescan=True):
+    """``{vendor_key: VendorLayout}`` for the vendor folders in ``template_dir`` with a layout file.
+
+    Cached per process until a layout file changes; broken files are logged and skipped.
+    Without ``rescan`` the cached layouts are returned without looking at
+    ``template_dir`` again (callers rescan once per input file, like the template bank).
+    """
+    from utils.loader import _resolve_path
+
+    if not template_dir:
+        return {}
+    template_dir = _resolve_path(template_dir)
+    if not rescan:
+        with _layouts_lock:
+            if template_dir in _layouts:
+                return _layouts[template_dir][1]
+    if not os.path.isdir(template_dir):
+        return {}
+    files = sorted(Path(template_dir).glob(f"*/{LAYOUT_FILE}"))
+    signature = tuple((str(f), f.stat().st_mtime) for f in files)
+    with _layouts_lock:
+        cached = _layouts.get(template_dir)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    import yaml
+
+    layouts = {}
+    for f in files:
+        vendor = f.parent.name
+        try:
+            with open(f, encoding="utf-8") as fh:
+                layouts[vendor_key(vendor)] = VendorLayout.from_dict(vendor, yaml.safe_load(fh) or {})
+        except Exception as e:
+            logging.warning(f"⚠️ Ignoring layout for {vendor} ({f}): {e}")
+    with _layouts_lock:
+        _layouts[template_dir] = (signature, layouts)
+    if layouts:
+        logging.info(f"📐 Loaded ticket layouts for {len(layouts)} vendors from {template_dir}")
+    return layouts
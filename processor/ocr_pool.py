@@ -0,0 +1,227 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+WORKER_CACHE_SIZE = 256
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+_worker_file = None
+
+
+
+def _init_worker(engine, engine_params=None):
+    """Runs once in every worker process: load the OCR model a single time."""
+    os.environ["FLAGS_use_mkldnn"] = "0"
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    from utils.ocr_wrapper import warm_up
+
+    warm_up(engine, background=False, **(engine_params or {}))
+    logging.info(f"🧵 OCR worker {os.getpid()} ready")
+
+
+def _ping():
+    return os.getpid()
+
+
+def _templates_for(config, filepath):
+    """This worker's templates; ``template_dir`` is only checked for changes when a new input file starts."""
+    global _worker_file
+    from processor.layouts import load_layouts
+    from processor.template_bank import load_template_bank
+
+    rescan, _worker_file = filepath != _worker_file, filepath
+    load_layouts(config.get("template_dir"), rescan=rescan)
+    if not config.get("use_template_fallback", True):
+        return {}
+    return load_template_bank(config["template_dir"], config.get("template_cache"), rescan=rescan)
+
+
+class _LRUCache(OrderedDict):
+    """Small per-process OCR cache that evicts the least recently used pages."""
+
+    def __init__(self, maxsize):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        self.move_to_end(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+_worker_cache = _LRUCache(WORKER_CACHE_SIZE)
+
+def run_page_task(task):
+    """Worker entry point: process one page with this process's model, templates and keywords."""
+    from processor.hybrid_ocr import process_single_page
+    from utils.loader import load_ocr_configs_from_excel
+    from utils.metrics import capture_metrics
+
+    i, page, filepath, config, expected_vendor = task
+    ocr_config = load_ocr_configs_from_excel(config["keyword_file"])
+    with capture_metrics() as metrics:
+        res, page_hash = process_single_page(
+            (i, page, filepath, config, _templates_for(config, filepath), ocr_config, expected_vendor, _worker_cache)
+        )
+    res["metrics"] = metrics.snapshot()
+    return res, page_hash
+
+
+def run_batch_task(tasks):
+    """Worker entry point for ``ocr_batch_size`` > 1: several pages sharing one batched OCR call."""
+    from processor.hybrid_ocr import process_page_batch
+    from utils.loader import load_ocr_configs_from_excel
+    from utils.metrics import capture_metrics
+
+    _, _, filepath, config, _ = tasks[0]
+    ocr_config = load_ocr_configs_from_excel(config["keyword_file"])
+    templates = _templates_for(config, filepath)
+    with capture_metrics() as metrics:
+        results = process_page_batch([
+            (i, page, filepath, config, templates, ocr_config, expected_vendor, _worker_cache)
+            for i, page, filepath, config, expected_vendor in tasks
+        ])
+    # The whole batch's metrics travel with its first page
+    results[0][0]["metrics"] = metrics.snapshot()
+    return results
+
+
+class OCRWorkerPool:
+    """Process pool whose workers each load the OCR model once and are reused across files.
+
+    Several files may stream pages through one pool at once. A pool that is
+    replaced (broken, or the engine settings changed) is only shut down once
+    the last :meth:`imap` still using it has finished.
+    """
+
+    def __init__(self, num_workers, engine=None, engine_params=None):
+        self.num_workers = num_workers
+        self.engine = engine
+        self.broken = False
+        self._users = 0
+        self._retired = False
+        self._lock = threading.Lock()
+        # spawn: the OCR libraries are not fork-safe, and it matches the Windows default
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(engine, engine_params),
+        )
+
+    def warm_up(self):
+        """Start every worker (and so load its model) without waiting for the first file."""
+        for _ in range(self.num_workers):
+            self._executor.submit(_ping)
+
+    def _submit(self, fn, item):
+        try:
+            return self._executor.submit(fn, item)
+        except BrokenProcessPool as e:
+            # Reported by result() like any other task on the broken pool
+            future = Future()
+            future.set_exception(e)
+            return future
+
+    def imap(self, fn, items, max_in_flight=None):
+        """Yield ``fn(item)`` in input order while keeping at most ``max_in_flight`` items queued.
+
+        ``items`` may be a generator; it is consumed lazily so pages are streamed
+        to the workers as they become available. If a worker dies (and with it
+        the pool), the queued and remaining items run in this process instead
+        and the shared pool is replaced for later files.
+        """
+        max_in_flight = max_in_flight or self.num_workers * 2
+        items = iter(items)
+        pending = deque()
+        with self._lock:
+            self._users += 1
+        try:
+            for item in items:
+                pending.append((item, self._submit(fn, item)))
+                if len(pending) >= max_in_flight:
+                    yield pending[0][1].result()
+                    pending.popleft()
+            while pending:
+                yield pending[0][1].result()
+                pending.popleft()
+        except BrokenProcessPool as e:
+            self.broken = True
+            _discard_pool(self)
+            logging.error(f"❌ OCR worker pool stopped ({e}); processing the remaining pages in this process")
+            for item, _ in pending:
+                yield fn(item)
+            for item in items:
+                yield fn(item)
+        finally:
+            with self._lock:
+                self._users -= 1
+                idle = self._retired and not self._users
+            if idle:
+                self.shutdown(wait=False)
+
+    def retire(self):
+        """Shut down once no :meth:`imap` is using the pool any more (right away if none is)."""
+        with self._lock:
+            self._retired = True
+            idle = not self._users
+        if idle:
+            self.shutdown(wait=False)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _discard_pool(pool):
+    """Stop handing out ``pool`` if it is still the shared one; the next caller gets a new pool."""
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is pool:
+            _pool, _pool_key = None, None
+    pool.retire()
+
+
+def get_ocr_pool(num_workers, engine=None, engine_params=None):
+    """Return the shared worker pool, creating it (or rebuilding it) on first use."""
+    global _pool, _pool_key
+    key = (num_workers, engine, repr(sorted((engine_params or {}).items())))
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            if _pool is not None:
+                _pool.retire()
+            logging.info(f"🚀 Starting OCR worker pool with {num_workers} processes")
+            _pool = OCRWorkerPool(num_workers, engine, engine_params)
+            _pool_key = key
+        return _pool
+
+
+def warm_up_ocr(config):
+    """Load the configured OCR engine ahead of the first file, in the background."""
+    num_workers = config.get("num_workers", 4)
+    if num_workers > 1:
+        get_ocr_pool(num_workers, config.get("ocr_engine"), config.get("ocr_engine_params")).warm_up()
+    else:
+        from utils.ocr_wrapper import warm_up
+
+        warm_up(config.get("ocr_engine"), background=True, **config.get("ocr_engine_params", {}))
+
+
+@atexit.register
+def shutdown_ocr_pool():
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+        _pool_key = None
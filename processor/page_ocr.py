@@ -0,0 +1,161 @@
+import logging
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from utils.ocr_wrapper import read_text, read_text_batch
+
+
+@dataclass
+class PageOCR:
+    """OCR result for a single page, computed once and shared by every stage.
+
+    ``lines`` holds the recognized text lines with their bounding boxes in page
+    pixel coordinates as ``{"text": str, "box": (x0, y0, x1, y1), "confidence": float}`` so that
+    later stages (vendor matching on the ROI, ticket extraction, text logs and
+    the searchable-PDF layer) can work from the same result without running
+    OCR again.
+    """
+
+    text: str = ""
+    lines: List[Dict] = field(default_factory=list)
+    engine: str = ""
+    confidence: float = 0.0
+    size: Tuple[int, int] = (0, 0)
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+    def text_in(self, box: Tuple[int, int, int, int]) -> str:
+        """Return the text of the lines whose centre falls inside ``box``."""
+        if not self.lines:
+            return self.text
+        x0, y0, x1, y1 = box
+        selected = []
+        for line in self.lines:
+            lx0, ly0, lx1, ly1 = line["box"]
+            cx, cy = (lx0 + lx1) / 2, (ly0 + ly1) / 2
+            if x0 <= cx <= x1 and y0 <= cy <= y1:
+                selected.append(line["text"])
+        return "\n".join(selected)
+
+    def line_confidence(self, line: Dict) -> float:
+        return line.get("confidence", self.confidence)
+
+    def confidence_in(self, box: Tuple[int, int, int, int]) -> float:
+        """Mean confidence of the lines whose centre falls inside ``box`` (the page confidence if none)."""
+        x0, y0, x1, y1 = box
+        confidences = [
+            self.line_confidence(line) for line in self.lines
+            if x0 <= (line["box"][0] + line["box"][2]) / 2 <= x1 and y0 <= (line["box"][1] + line["box"][3]) / 2 <= y1
+        ]
+        return sum(confidences) / len(confidences) if confidences else self.confidence
+
+    def line_of(self, fragment: str) -> Optional[Dict]:
+        """The first line containing ``fragment`` (ignoring case, spaces and punctuation), or None."""
+        target = _squash(fragment)
+        if target:
+            for line in self.lines:
+                if target in _squash(line["text"]):
+                    return line
+        return None
+
+    def confidence_of(self, fragment: str) -> float:
+        """Confidence of the first line containing ``fragment`` (the page confidence if none does)."""
+        line = self.line_of(fragment)
+        return self.line_confidence(line) if line else self.confidence
+
+    def orientation(self, min_lines=3, min_share=0.6) -> Optional[int]:
+        """Clockwise rotation the page needs, read from the OCR pass itself, or None if it cannot tell.
+
+        Uses the line ``angle`` (0/180) PaddleOCR's angle classifier reports
+        plus the box shape: tall boxes mean the text runs vertically. A tall
+        box whose crop read upright was turned a quarter clockwise (needs
+        270); one the classifier flipped was turned counter-clockwise (needs 90).
+        """
+        votes = Counter()
+        for line in self.lines:
+            if line.get("angle") not in (0, 180):
+                continue
+            x0, y0, x1, y1 = line["box"]
+            vertical = (y1 - y0) > 1.5 * (x1 - x0)
+            votes[{(False, 0): 0, (False, 180): 180, (True, 0): 270, (True, 180): 90}[(vertical, line["angle"])]] += 1
+        total = sum(votes.values())
+        if total < min_lines:
+            return None
+        rotation, count = votes.most_common(1)[0]
+        return rotation if count >= min_share * total else None
+
+    def rotated(self, rotation: int) -> "PageOCR":
+        """This result with line boxes mapped onto the page rotated clockwise by ``rotation`` degrees."""
+        if rotation not in (90, 180, 270):
+            return self
+        w, h = self.size
+
+        def turn(box):
+            x0, y0, x1, y1 = box
+            if rotation == 90:
+                return h - y1, x0, h - y0, x1
+            if rotation == 180:
+                return w - x1, h - y1, w - x0, h - y0
+            return y0, w - x1, y1, w - x0
+
+        lines = []
+        for line in self.lines:
+            line = dict(line, box=turn(line["box"]))
+            if "angle" in line:
+                line["angle"] = 0  # upright on the rotated page
+            lines.append(line)
+        size = (h, w) if rotation in (90, 270) else (w, h)
+        return PageOCR(text=self.text, lines=lines, engine=self.engine, confidence=self.confidence, size=size,
+                       error=self.error)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PageOCR":
+        data = dict(data)
+        data["size"] = tuple(data.get("size", (0, 0)))
+        data["lines"] = [dict(line, box=tuple(line["box"])) for line in data.get("lines", [])]
+        return cls(**data)
+
+    @classmethod
+    def from_result(cls, result: Dict, size: Tuple[int, int]) -> "PageOCR":
+        lines = list(result.get("lines", []))
+        confidence = result.get("confidence")
+        if confidence is None and lines:
+            confidence = sum(line.get("confidence", 0.0) for line in lines) / len(lines)
+        return cls(
+            text=result.get("text", ""),
+            lines=lines,
+            engine=result.get("engine", ""),
+            confidence=confidence or 0.0,
+            size=tuple(size),
+        )
+
+
+def _squash(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def ocr_page(page, engine: Optional[str] = None, **engine_params) -> PageOCR:
+    """Run OCR once on the full page and wrap the result in a :class:`PageOCR`."""
+    try:
+        return PageOCR.from_result(read_text(image=page, engine=engine, **engine_params), page.size)
+    except Exception as e:
+        logging.warning(f"⚠️ OCR failed: {e}")
+        return PageOCR(size=tuple(page.size), error=str(e))
+
+
+def ocr_pages(images, engine: Optional[str] = None, **engine_params) -> List[PageOCR]:
+    """OCR several pages or crops with one batched engine call; one :class:`PageOCR` per image."""
+    try:
+        results = read_text_batch(images, engine=engine, **engine_params)
+    except Exception as e:
+        logging.warning(f"⚠️ Batched OCR failed ({e}); retrying page by page")
+        return [ocr_page(image, engine=engine, **engine_params) for image in images]
+    return [PageOCR.from_result(result, image.size) for result, image in zip(results, images)]
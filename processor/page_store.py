@@ -0,0 +1,129 @@
+import itertools
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+PAGE_STORE_FORMATS = ("raw", "png")
+# Modes numpy round-trips exactly; anything else (palette, CMYK, 16-bit) is kept as PNG
+RAW_MODES = ("1", "L", "RGB", "RGBA")
+
+
+@dataclass(frozen=True)
+class PageHandle:
+    """Reference to a page image kept on disk by a :class:`PageStore`.
+
+    Handles are small and picklable; the pixels are only read by :meth:`open`.
+    """
+
+    path: str
+    size: Tuple[int, int]
+    mode: str
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def open(self) -> Image.Image:
+        if self.path.endswith(".npy"):
+            # Read fully (not memory-mapped) so the file is never held open and can be deleted on Windows
+            return Image.fromarray(np.load(self.path))
+        with Image.open(self.path) as img:
+            img.load()
+            return img
+
+
+@dataclass(frozen=True)
+class PageRender:
+    """Recipe for a page rendered again from its source file, e.g. at full DPI for export.
+
+    The render is turned and converted the same way as the image the page was
+    classified on. Like :class:`PageHandle` it is small and picklable; nothing
+    is rendered until :meth:`open`.
+    """
+
+    source: str
+    index: int
+    dpi: int
+    rotation: int = 0
+    grayscale: bool = False
+    poppler_path: Optional[str] = None
+
+    def open(self) -> Image.Image:
+        return open_renders([self])[0]
+
+
+def open_renders(renders):
+    """Render several :class:`PageRender` s at once; pages of the same file and DPI share Poppler calls."""
+    from processor.image_ops import apply_grayscale, apply_rotation, render_pages
+
+    groups = {}
+    for n, render in enumerate(renders):
+        groups.setdefault((render.source, render.dpi, render.poppler_path), []).append(n)
+    images = [None] * len(renders)
+    for (source, dpi, poppler_path), members in groups.items():
+        pages = render_pages(source, [renders[n].index for n in members], poppler_path, dpi)
+        for n, img in zip(members, pages):
+            img = apply_rotation(img, renders[n].rotation)
+            images[n] = apply_grayscale(img) if renders[n].grayscale else img
+    return images
+
+
+def as_image(page):
+    """The PIL image for a page that may be a :class:`PageHandle` or :class:`PageRender`."""
+    return page.open() if isinstance(page, (PageHandle, PageRender)) else page
+
+
+class PageStore:
+    """Spills the pages of one input file to a temporary folder and hands out :class:`PageHandle` s.
+
+    ``raw`` pages are uncompressed ``.npy`` files (a page costs milliseconds to
+    write and read back); ``png`` trades much more CPU time for about half the
+    disk space. The folder is removed when the store is closed.
+    """
+
+    def __init__(self, directory=None, fmt="raw"):
+        if fmt not in PAGE_STORE_FORMATS:
+            raise ValueError(f"Unknown page_store_format '{fmt}'. Available: {', '.join(PAGE_STORE_FORMATS)}")
+        if directory:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+        self._tmp = tempfile.TemporaryDirectory(prefix="ticket_pages_", dir=directory)
+        self.directory = Path(self._tmp.name)
+        self.format = fmt
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def put(self, image) -> PageHandle:
+        """Write ``image`` to disk and return its handle (handles are returned unchanged)."""
+        if not isinstance(image, Image.Image):
+            return image
+        with self._lock:
+            n = next(self._ids)
+        if self.format == "raw" and image.mode in RAW_MODES:
+            path = self.directory / f"page_{n:05d}.npy"
+            np.save(path, np.asarray(image))
+        else:
+            path = self.directory / f"page_{n:05d}.png"
+            image.save(path, format="PNG", compress_level=1)
+        return PageHandle(str(path), tuple(image.size), image.mode)
+
+    def close(self):
+        try:
+            self._tmp.cleanup()
+        except OSError as e:
+            logging.warning(f"⚠️ Could not remove page store {self.directory}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,151 @@
+import io
+import logging
+
+DEFAULT_JPEG_QUALITY = 90
+TEXT_FONT = "Helvetica"
+
+
+def encode_page_image(image, jpeg_quality=DEFAULT_JPEG_QUALITY):
+    """Encode a page once so the same bytes can be embedded in several PDFs.
+
+    JPEG data is embedded by reportlab as-is (no re-encoding); bilevel pages
+    are stored as PNG to keep them sharp and small.
+    """
+    buf = io.BytesIO()
+    if image.mode == "1":
+        image.save(buf, format="PNG")
+    else:
+        if image.mode not in ("L", "RGB"):
+            image = image.convert("RGB")
+        image.save(buf, format="JPEG", quality=jpeg_quality)
+    buf.seek(0)
+    return buf
+
+
+class SearchablePDFWriter:
+    """Builds a searchable PDF page by page: the scan plus an invisible text layer.
+
+    The text layer is placed from an existing :class:`~processor.page_ocr.PageOCR`
+    (lines and boxes), so no OCR is run while exporting.
+    """
+
+    def __init__(self, path, resolution=300):
+        from reportlab import rl_config
+        from reportlab.pdfgen import canvas
+
+        # Page images are already JPEG/PNG; ASCII85 on top only adds a quarter to their size
+        rl_config.useA85 = 0
+        self.path = str(path)
+        self.resolution = resolution
+        self.page_count = 0
+        self._canvas = canvas.Canvas(self.path)
+
+    def add_page(self, image, page_ocr=None, encoded=None):
+        from reportlab.lib.utils import ImageReader
+
+        if encoded is None:
+            encoded = encode_page_image(image)
+        encoded.seek(0)
+
+        width_pt = image.width * 72.0 / self.resolution
+        height_pt = image.height * 72.0 / self.resolution
+        c = self._canvas
+        c.setPageSize((width_pt, height_pt))
+        c.drawImage(ImageReader(encoded), 0, 0, width=width_pt, height=height_pt)
+        if page_ocr is not None and page_ocr.lines:
+            _draw_text_layer(c, page_ocr, width_pt, height_pt)
+        c.showPage()
+        self.page_count += 1
+
+    def close(self):
+        self._canvas.save()
+        logging.debug(f"Wrote {self.page_count} pages to {self.path}")
+
+
+class SourcePDF:
+    """The pages of an input PDF, ready to be copied into :class:`PassthroughPDFWriter` s.
+
+    Pages keep the scanner's own image streams. They are only turned upright
+    and, if asked, given an invisible text layer; each page is prepared once
+    however many output files it goes into.
+    """
+
+    def __init__(self, path):
+        from PyPDF2 import PdfReader
+
+        self._reader = PdfReader(str(path))
+        self._pages = {}
+
+    def page(self, index, rotation=0, page_ocr=None):
+        """Page ``index`` (0-based) turned clockwise by ``rotation``, with ``page_ocr``'s text laid over it."""
+        if index not in self._pages:
+            page = self._reader.pages[index]
+            if rotation:
+                page.rotate(rotation)
+            if page_ocr is not None and page_ocr.lines:
+                if page.rotation % 360:
+                    # The OCR boxes are in upright page coordinates
+                    page.transfer_rotation_to_content()
+                page.merge_page(_text_layer_page(page_ocr, page.mediabox))
+            self._pages[index] = page
+        return self._pages[index]
+
+
+class PassthroughPDFWriter:
+    """Builds a PDF from :class:`SourcePDF` pages; nothing is rasterized or re-encoded."""
+
+    def __init__(self, path):
+        from PyPDF2 import PdfWriter
+
+        self.path = str(path)
+        self.page_count = 0
+        self._writer = PdfWriter()
+
+    def add_page(self, pdf_page):
+        self._writer.add_page(pdf_page)
+        self.page_count += 1
+
+    def close(self):
+        with open(self.path, "wb") as f:
+            self._writer.write(f)
+        logging.debug(f"Wrote {self.page_count} pages to {self.path}")
+
+
+def _text_layer_page(page_ocr, box):
+    """A PDF page holding only ``page_ocr``'s invisible text, placed over ``box`` (a page's mediabox)."""
+    from PyPDF2 import PdfReader
+    from reportlab.pdfgen import canvas
+
+    left, bottom = float(box.left), float(box.bottom)
+    width, height = float(box.width), float(box.height)
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=(left + width, bottom + height))
+    c.translate(left, bottom)
+    _draw_text_layer(c, page_ocr, width, height)
+    c.showPage()
+    c.save()
+    buf.seek(0)
+    return PdfReader(buf).pages[0]
+
+
+def _draw_text_layer(c, page_ocr, width_pt, height_pt):
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    ocr_w, ocr_h = page_ocr.size
+    if not ocr_w or not ocr_h:
+        return
+    sx, sy = width_pt / ocr_w, height_pt / ocr_h
+    text = c.beginText()
+    text.setTextRenderMode(3)  # invisible, but selectable and searchable
+    for line in page_ocr.lines:
+        content = line["text"].strip()
+        if not content:
+            continue
+        x0, y0, x1, y1 = line["box"]
+        font_size = max(1.0, (y1 - y0) * sy * 0.85)
+        natural_width = stringWidth(content, TEXT_FONT, font_size)
+        text.setFont(TEXT_FONT, font_size)
+        text.setHorizScale(100.0 * (x1 - x0) * sx / natural_width if natural_width else 100.0)
+        text.setTextOrigin(x0 * sx, height_pt - y1 * sy)
+        text.textOut(content)
+    c.drawText(text)
@@ -1,19 +1,17 @@
 # PATCHED: run.py
 import logging
 import os
+import time
 from datetime import datetime
 from pathlib import Path
-from tkinter import messagebox
-
-import pandas as pd
-from PyPDF2 import PdfReader, PdfWriter
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
 
+from processor.batch import expand_inputs, run_batch
+from processor.engine_compare import run_comparison_mode  # noqa: F401  (used by main.py and gui.py)
 from processor.file_handler import archive_original, get_dynamic_paths
 from processor.hybrid_ocr import process_pages
-from processor.image_ops import extract_images_from_file
-from utils.ocr_wrapper import read_text
+from processor.image_ops import classify_dpi, iter_images_from_file, RASTER_CHUNK_SIZE
+from utils.metrics import get_metrics, write_run_reports
+from utils.run_log import export_ocr_text, export_workbooks
 from utils.timing import track_time, report_timings, reset_timings
 
 # ✅ Disable MKLDNN to prevent inference crashes in some environments
@@ -21,36 +19,31 @@ os.environ["FLAGS_use_mkldnn"] = "0"
 
 
 def run_input(filepath, config):
-    path = Path(filepath)
+    paths = expand_inputs(filepath)
+    total = len(paths)
+    get_metrics().reset()
+    logging.info(f"🗂️ Batch processing {total} file(s), {config.get('file_workers', 1)} at a time...")
 
-    if ";" in str(filepath):
-        paths = [Path(p) for p in str(filepath).split(";") if p.strip()]
-    elif path.is_dir():
-        paths = sorted([f for f in path.glob("*.pdf") if not f.name.startswith(".")])
-    else:
-        paths = [path]
+    # The per-folder manifest decides what still needs processing (new, changed or unfinished files)
+    started = time.time()
+    results, ocr_text_log = run_batch(paths, config, _run_single)
 
-    results = []
-    ocr_text_log = []
-    total = len(paths)
-    logging.info(f"🗂️ Batch processing {total} file(s)...")
+    # 📝 Trucking-log workbooks and this batch's OCR text CSV are built once per batch from the append-only run log
+    with track_time("export_logs"):
+        for log_dir in sorted({Path(f).parent / "logs" for f in paths}):
+            export_workbooks(log_dir)
+            export_ocr_text(log_dir, since=started)
 
-    for idx, file in enumerate(paths, 1):
-        out_dir, _, _ = get_dynamic_paths(file)
-        if out_dir.exists():
-            logging.info(f"⏭️ {idx}/{total} Skipping already processed: {file.name}")
-            results.append((file.name, "skipped"))
-            continue
-        logging.info(f"📄 {idx}/{total} Processing: {file.name}")
-        try:
-            ocr_logs = _run_single(file, config)
-            ocr_text_log.extend(ocr_logs)
-            results.append((file.name, "ok"))
-        except Exception as e:
-            logging.error(f"❌ Failed: {file} → {e}")
-            results.append((file.name, "failed"))
+    if paths:
+        write_run_reports(config.get("metrics_dir") or Path(paths[0]).parent / "logs")
 
     if total > 1:
+        import pandas as pd
+        from PyPDF2 import PdfReader, PdfWriter
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+        from tkinter import messagebox
+
         ok = sum(1 for _, r in results if r == "ok")
         skipped = sum(1 for _, r in results if r == "skipped")
         failed = sum(1 for _, r in results if r == "failed")
@@ -115,34 +108,18 @@ def _run_single(filepath, config):
     out_dir, log_dir, combined_dir = get_dynamic_paths(filepath, combined_name)
     reset_timings()
 
-    with track_time("extract_images"):
-        pages = extract_images_from_file(filepath, config["poppler_path"])
-    logging.info(f"Extracted {len(pages)} pages from {filepath}")
-
+    # OCR text for the batch log is collected from process_pages, which OCRs each page once
     ocr_logs = []
 
-    with track_time("initial_ocr"):
-        for i, page in enumerate(pages):
-            try:
-                engine = config.get("ocr_engine", "tesseract")
-                text_result = read_text(image=page)
-                text = text_result.get("text", "")
-                conf = text_result.get("confidence")
-                ocr_logs.append((path.name, i + 1, engine, text.strip()))
-            except Exception as e:
-                logging.warning(f"⚠️ OCR failed on page {i + 1}: {e}")
-                ocr_logs.append((path.name, i + 1, engine, "[OCR Failed]"))
-
-    if config.get("two_page_scan", False):
-        fronts = pages[::2]
-        backs = pages[1::2]
-        with track_time("process_pages_front"):
-            process_pages(fronts, filepath, config, "")
-        with track_time("process_pages_back"):
-            process_pages(backs, filepath, config, "_back")
-    else:
-        with track_time("process_pages"):
-            process_pages(pages, filepath, config)
+    # Pages are rasterized in chunks, at the classification DPI, and consumed by process_pages as they arrive;
+    # PDF pages with a usable text layer arrive as their text instead
+    pages = iter_images_from_file(filepath, config["poppler_path"],
+                                  chunk_size=config.get("raster_chunk_size", RASTER_CHUNK_SIZE),
+                                  dpi=classify_dpi(config),
+                                  text_layer_min_chars=config.get("text_layer_min_chars", 0))
+    with track_time("process_pages"):
+        # Two-page scans alternate front/back; backs are filed with their front
+        process_pages(pages, filepath, config, ocr_log=ocr_logs, duplex=config.get("two_page_scan", False))
 
     if config.get("rename_original", False):
         with track_time("archive_original"):
@@ -155,69 +132,20 @@ def _run_single(filepath, config):
 
 def run_all_pdfs_in_dir(root_dir, config):
     root_path = Path(root_dir)
-    for file in root_path.rglob("*.pdf"):
+    # Outputs and archived originals live under the input folders; never feed them back in
+    files = sorted(
+        f for f in root_path.rglob("*.pdf")
+        if not {"processed", "Original Scans"} & set(f.relative_to(root_path).parts)
+    )
+    for file in files:
         out_dir, _, _ = get_dynamic_paths(file)
         if out_dir.exists():
             logging.info(f"🔁 Skipping already processed file: {file}")
             continue
-        run_input(file, config)
+        run_input(str(file), config)
 
 
 def run_processor_in_thread(filepath, config):
     import threading
     thread = threading.Thread(target=run_input, args=(filepath, config))
     thread.start()
-
-
-def run_comparison_mode(filepath, config):
-    from datetime import datetime
-
-    path = Path(filepath)
-    pages = extract_images_from_file(filepath, config["poppler_path"])
-    initialize_engines()
-
-    all_results = []
-
-    for i, page in enumerate(pages):
-        page_results = []
-        for engine in ("tesseract", "paddle", "easyocr"):
-            try:
-                res = read_text(image=page)
-                page_results.append({
-                    "Filename": path.name,
-                    "Page": i + 1,
-                    "Engine": engine,
-                    "Confidence": res.get("confidence"),
-                    "Text": res.get("text", "").replace("\n", " ")[:1000]
-                })
-            except Exception as e:
-                page_results.append({
-                    "Filename": path.name,
-                    "Page": i + 1,
-                    "Engine": engine,
-                    "Confidence": None,
-                    "Text": f"[ERROR: {e}]"
-                })
-        all_results.extend(page_results)
-        plot_engine_scores(all_results)
-
-    df = pd.DataFrame(all_results)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    out_path = Path.cwd() / f"ocr_engine_comparison_{ts}.xlsx"
-    df.to_excel(out_path, index=False)
-    logging.info(f"📊 OCR comparison saved to {out_path}")
-
-
-import matplotlib.pyplot as plt
-
-
-def plot_engine_scores(results):
-    df = pd.DataFrame(results)
-    engine_avg = df.groupby("Engine")["Confidence"].mean().sort_values()
-
-    engine_avg.plot(kind="barh", color="steelblue")
-    plt.title("Average OCR Confidence per Engine")
-    plt.xlabel("Confidence")
-    plt.tight_layout()
-    plt.savefig("ocr_confidence_scores.png")
-    logging.info("📊 Heatmap saved to: ocr_confidence_scores.png")
@@ -0,0 +1,225 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+PYRAMID_SCALES = (0.25, 0.5, 1.0)
+MIN_COARSE_SIDE = 16
+TOP_K = 3
+REFINE_MARGIN = 8
+TEMPLATE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff")
+BANK_VERSION = 1
+
+_banks = {}
+_banks_lock = threading.Lock()
+
+
+def _to_gray(img):
+    import cv2
+
+    if img.ndim == 3 and img.shape[2] == 3:
+        return cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    if img.ndim == 3 and img.shape[2] == 4:
+        return cv2.cvtColor(img, cv2.COLOR_RGBA2GRAY)
+    return img
+
+
+def build_pyramid(gray, scales=PYRAMID_SCALES):
+    import cv2
+
+    levels = {}
+    h, w = gray.shape[:2]
+    for scale in scales:
+        if scale == 1.0:
+            levels[scale] = gray
+        else:
+            size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+            levels[scale] = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+    return levels
+
+
+class TemplateBank:
+    """Vendor templates as precomputed grayscale pyramids.
+
+    Matching runs every template at a coarse scale, keeps the ``top_k``
+    candidates and refines only those at full resolution in a small window
+    around the coarse hit.
+    """
+
+    def __init__(self, entries):
+        # entries: [{"vendor": str, "source": str, "mtime": float, "levels": {scale: ndarray}}]
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def vendors(self):
+        return sorted({e["vendor"] for e in self.entries})
+
+    @classmethod
+    def from_dict(cls, template_dict):
+        entries = []
+        for vendor, templates in template_dict.items():
+            for idx, template in enumerate(templates):
+                entries.append({"vendor": vendor, "source": f"{vendor}[{idx}]", "mtime": 0.0,
+                                "levels": build_pyramid(_to_gray(template))})
+        return cls(entries)
+
+    @classmethod
+    def load(cls, template_dir, cache_path=None):
+        """Load templates from ``template_dir``, reusing pyramids cached at ``cache_path``.
+
+        Cached entries are reused when the source file's mtime and size are unchanged.
+        """
+        import cv2
+
+        cached = _read_cache(cache_path) if cache_path else {}
+        entries = []
+        rebuilt = 0
+        for root, _, files in os.walk(template_dir):
+            vendor = Path(root).name.lower()
+            for file in sorted(files):
+                if not file.lower().endswith(TEMPLATE_EXTENSIONS):
+                    continue
+                full_path = os.path.join(root, file)
+                stat = os.stat(full_path)
+                entry = cached.get(full_path)
+                if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                    entries.append(entry)
+                    continue
+                img = cv2.imread(full_path, cv2.IMREAD_GRAYSCALE)
+                if img is None:
+                    logging.warning(f"Failed to load template: {full_path}")
+                    continue
+                entries.append({"vendor": vendor, "source": full_path, "mtime": stat.st_mtime,
+                                "size": stat.st_size, "levels": build_pyramid(img)})
+                rebuilt += 1
+
+        if cache_path and (rebuilt or len(entries) != len(cached)):
+            _write_cache(cache_path, entries)
+        logging.info(f"Template bank: {len(entries)} templates ({rebuilt} rebuilt), "
+                     f"{len({e['vendor'] for e in entries})} vendors")
+        return cls(entries)
+
+    def match(self, page_image, top_k=TOP_K):
+        """Return ``(vendor, score, location, template)`` of the best full-resolution match."""
+        import cv2
+
+        page_gray = _to_gray(page_image)
+        page_levels = build_pyramid(page_gray)
+        ph, pw = page_gray.shape[:2]
+
+        candidates = []
+        for entry in self.entries:
+            full = entry["levels"][1.0]
+            th, tw = full.shape[:2]
+            if th > ph or tw > pw:
+                logging.warning(f"Skipped oversized template for vendor '{entry['vendor']}'")
+                continue
+            scale = next(
+                (s for s in PYRAMID_SCALES if min(th, tw) * s >= MIN_COARSE_SIDE), 1.0
+            )
+            coarse_t = entry["levels"][scale]
+            coarse_p = page_levels[scale]
+            if coarse_t.shape[0] > coarse_p.shape[0] or coarse_t.shape[1] > coarse_p.shape[1]:
+                continue
+            result = cv2.matchTemplate(coarse_p, coarse_t, cv2.TM_CCOEFF_NORMED)
+            _, score, _, loc = cv2.minMaxLoc(result)
+            candidates.append((score, scale, loc, entry))
+
+        best = ("Unknown", -1.0, None, None)
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        for coarse_score, scale, loc, entry in candidates[:top_k]:
+            template = entry["levels"][1.0]
+            th, tw = template.shape[:2]
+            if scale == 1.0:
+                score, location = coarse_score, loc
+            else:
+                margin = int(np.ceil(1 / scale)) + REFINE_MARGIN
+                x0 = max(0, int(loc[0] / scale) - margin)
+                y0 = max(0, int(loc[1] / scale) - margin)
+                x1 = min(pw, int(loc[0] / scale) + tw + margin)
+                y1 = min(ph, int(loc[1] / scale) + th + margin)
+                window = page_gray[y0:y1, x0:x1]
+                result = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+                _, score, _, (wx, wy) = cv2.minMaxLoc(result)
+                location = (x0 + wx, y0 + wy)
+            logging.debug(f"Vendor: {entry['vendor']} | Score: {score:.3f}")
+            if score > best[1]:
+                best = (entry["vendor"], score, location, template)
+        return best
+
+
+def _read_cache(cache_path):
+    cache_path = Path(cache_path)
+    if not cache_path.exists():
+        return {}
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != BANK_VERSION:
+                return {}
+            entries = {}
+            for i, item in enumerate(meta["entries"]):
+                levels = {float(s): data[f"t{i}_{s}"] for s in item["scales"]}
+                entries[item["source"]] = {"vendor": item["vendor"], "source": item["source"],
+                                           "mtime": item["mtime"], "size": item["size"], "levels": levels}
+            return entries
+    except Exception as e:
+        logging.warning(f"⚠️ Ignoring unreadable template cache {cache_path}: {e}")
+        return {}
+
+
+def _write_cache(cache_path, entries):
+    cache_path = Path(cache_path)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {}
+        meta = {"version": BANK_VERSION, "entries": []}
+        for i, entry in enumerate(entries):
+            meta["entries"].append({"vendor": entry["vendor"], "source": entry["source"], "mtime": entry["mtime"],
+                                    "size": entry["size"], "scales": list(entry["levels"])})
+            for scale, level in entry["levels"].items():
+                arrays[f"t{i}_{scale}"] = level
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logging.warning(f"⚠️ Failed to write template cache {cache_path}: {e}")
+
+
+def load_template_bank(template_dir, cache_path=None, rescan=True):
+    """Return this process's template bank, reloading only when a template file changes.
+
+    Without ``rescan`` an already loaded bank is returned without walking
+    ``template_dir`` again (callers rescan once per input file).
+    """
+    from utils.loader import _resolve_path
+
+    template_dir = _resolve_path(template_dir)
+    cache_path = _resolve_path(cache_path) if cache_path else None
+    if not rescan:
+        with _banks_lock:
+            if template_dir in _banks:
+                return _banks[template_dir][1]
+    signature = _dir_signature(template_dir)
+    with _banks_lock:
+        cached = _banks.get(template_dir)
+        if cached is None or cached[0] != signature:
+            cached = (signature, TemplateBank.load(template_dir, cache_path))
+            _banks[template_dir] = cached
+        return cached[1]
+
+
+def _dir_signature(template_dir):
+    signature = []
+    for root, _, files in os.walk(template_dir):
+        for file in files:
+            if file.lower().endswith(TEMPLATE_EXTENSIONS):
+                stat = os.stat(os.path.join(root, file))
+                signature.append((root, file, stat.st_mtime, stat.st_size))
+    return tuple(sorted(signature))
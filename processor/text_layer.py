@@ -0,0 +1,54 @@
+import logging
+import re
+from dataclasses import dataclass
+
+from processor.page_ocr import PageOCR
+
+TEXT_LAYER_ENGINE = "text_layer"
+# Share of the non-space characters that must be letters or digits; broken font encodings extract as symbols
+MIN_ALNUM_SHARE = 0.5
+
+
+@dataclass(frozen=True)
+class TextPage:
+    """A PDF page classified from its embedded text instead of pixels.
+
+    Stands in for the page image in the page stream; it is never rasterized
+    unless the output needs pixels.
+    """
+
+    page_ocr: PageOCR
+
+    @property
+    def size(self):
+        return self.page_ocr.size
+
+
+def usable_text(text, min_chars):
+    """True if ``text`` has at least ``min_chars`` letters/digits and is not mostly symbols."""
+    if not min_chars:
+        return False
+    alnum = len(re.findall(r"[A-Za-z0-9]", text))
+    printed = len(re.sub(r"\s", "", text))
+    return alnum >= min_chars and alnum >= MIN_ALNUM_SHARE * printed
+
+
+def read_text_layer(pdf_page, dpi, min_chars):
+    """The page's embedded text as a :class:`PageOCR` if it is usable, else None.
+
+    Text-layer results have no line boxes (PyPDF2's positions are not reliable
+    enough), so vendor matching sees the whole page. ``size`` is the page in
+    pixels at ``dpi``, as if it had been rasterized.
+    """
+    try:
+        text = pdf_page.extract_text() or ""
+    except Exception as e:
+        logging.warning(f"⚠️ Could not read the text layer: {e}")
+        return None
+    if not usable_text(text, min_chars):
+        return None
+    width, height = float(pdf_page.mediabox.width), float(pdf_page.mediabox.height)
+    if (pdf_page.get("/Rotate") or 0) % 180:
+        width, height = height, width
+    size = (round(width * dpi / 72), round(height * dpi / 72))
+    return PageOCR(text=text.strip(), engine=TEXT_LAYER_ENGINE, confidence=1.0, size=size)
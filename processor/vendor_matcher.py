@@ -0,0 +1,106 @@
+import re
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+VENDOR_GROUPS = ("trucking", "materials")
+
+_index_cache = {}
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "", text.lower())
+
+
+class KeywordIndex:
+    """Vendor keywords compiled once per keyword sheet.
+
+    Keywords are normalized up front and tagged with their vendor group, so
+    matching a page is one exact-substring prefilter plus (when needed) a
+    single ``rapidfuzz.process.cdist`` call that scores every keyword at once.
+    """
+
+    def __init__(self, ocr_config: Dict, exclude_keywords: Iterable[str] = ()):
+        self.source = ocr_config
+        self.exclude_keywords = tuple(exclude_keywords)
+        excluded = set(self.exclude_keywords)
+
+        self.companies = []
+        self.keywords = []
+        self.clean_keywords = []
+        groups = []
+        for company, data in ocr_config.items():
+            vendor_type = data.get("vendor_type", "").lower()
+            for kw in data.get("keywords", []):
+                kw_clean = normalize_text(kw)
+                if not kw_clean:
+                    continue
+                if kw_clean in excluded and company.lower() != kw_clean:
+                    continue
+                self.companies.append(company)
+                self.keywords.append(kw)
+                self.clean_keywords.append(kw_clean)
+                groups.append(vendor_type if vendor_type in VENDOR_GROUPS else "others")
+
+        groups = np.array(groups)
+        # Group indices in the order they are tried: trucking, materials, then everything else
+        self.groups = [
+            (name, np.flatnonzero(groups == name)) for name in VENDOR_GROUPS + ("others",)
+        ]
+
+    def __len__(self):
+        return len(self.clean_keywords)
+
+    def score_all(self, ocr_text: str) -> np.ndarray:
+        """partial_ratio of every keyword against the (normalized) page text in one call."""
+        if not self.clean_keywords or not ocr_text:
+            return np.zeros(len(self.clean_keywords), dtype=np.float32)
+        return process.cdist(self.clean_keywords, [ocr_text], scorer=fuzz.partial_ratio,
+                             dtype=np.float32)[:, 0]
+
+    def _log_top(self, log_row, idx, scores):
+        if log_row is None:
+            return
+        order = idx[np.argsort(-scores[idx], kind="stable")][:5]
+        for rank, k in enumerate(order):
+            log_row[f"match_{rank + 1}_company"] = self.companies[k]
+            log_row[f"match_{rank + 1}_score"] = float(scores[k])
+            log_row[f"match_{rank + 1}_kw"] = self.keywords[k]
+
+    def match(self, ocr_text: str, threshold: float, log_row: Optional[Dict] = None):
+        """Return ``(company, score, keyword)`` for the first group with a hit, else None.
+
+        ``ocr_text`` must already be normalized with :func:`normalize_text`.
+        """
+        exact = np.fromiter((kw in ocr_text for kw in self.clean_keywords), dtype=bool,
+                            count=len(self.clean_keywords))
+        scores = None
+        for _, idx in self.groups:
+            if not len(idx):
+                continue
+            hits = idx[exact[idx]]
+            if len(hits):
+                # A perfect substring hit cannot be beaten; skip fuzzy scoring for this page
+                k = hits[0]
+                self._log_top(log_row, hits, np.full(len(exact), 100.0))
+                return self.companies[k], 100.0, self.keywords[k]
+            if scores is None:
+                scores = self.score_all(ocr_text)
+            self._log_top(log_row, idx, scores)
+            k = idx[int(np.argmax(scores[idx]))]
+            if scores[k] >= threshold:
+                return self.companies[k], float(scores[k]), self.keywords[k]
+        return None
+
+
+def get_keyword_index(ocr_config: Dict, exclude_keywords: Iterable[str] = ()) -> KeywordIndex:
+    """Return the compiled index for a keyword sheet, building it only when the sheet changes."""
+    exclude_keywords = tuple(exclude_keywords)
+    key = id(ocr_config)
+    index = _index_cache.get(key)
+    if index is None or index.source is not ocr_config or index.exclude_keywords != exclude_keywords:
+        index = KeywordIndex(ocr_config, exclude_keywords)
+        _index_cache.clear()
+        _index_cache[key] = index
+    return index
@@ -0,0 +1,148 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+WATCH_EXTENSIONS = (".pdf", ".tif", ".tiff")
+POLL_SECONDS = 2.0
+SETTLE_SECONDS = 3.0
+
+
+class FolderWatcher:
+    """Watches scan drop folders and processes new tickets with resident OCR models.
+
+    Folders are polled (this works on network shares and OneDrive folders, where
+    change notifications are unreliable). A file is queued once its size and
+    modification time have been stable for ``settle_seconds`` and it can be
+    opened, i.e. the scanner or copy has finished writing it. The OCR worker
+    pool and templates stay loaded between files, so each ticket only pays
+    for its own pages.
+    """
+
+    def __init__(self, folders, config, process_file=None):
+        from processor.run import _run_single
+
+        self.folders = [Path(f) for f in folders]
+        self.config = config
+        self.process_file = process_file or _run_single
+        self.poll_seconds = float(config.get("watch_poll_seconds", POLL_SECONDS))
+        self.settle_seconds = float(config.get("watch_settle_seconds", SETTLE_SECONDS))
+        self._observed = {}  # path -> ((size, mtime_ns), first seen with that stat)
+        self._in_flight = set()
+        self._attempted = {}  # path -> stat signature of the last run, so failures are not retried in a loop
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def _candidates(self):
+        for folder in self.folders:
+            try:
+                entries = list(os.scandir(folder))
+            except OSError as e:
+                logging.warning(f"⚠️ Cannot scan {folder}: {e}")
+                continue
+            for entry in entries:
+                name = entry.name
+                if not entry.is_file() or name.startswith((".", "~$")):
+                    continue
+                if name.lower().endswith(WATCH_EXTENSIONS):
+                    yield Path(entry.path)
+
+    def _settled_signature(self, path, now):
+        """``(size, mtime_ns)`` once ``path`` has stopped changing, else None."""
+        try:
+            stat = path.stat()
+        except OSError:
+            self._observed.pop(path, None)
+            return None
+        signature = (stat.st_size, stat.st_mtime_ns)
+        previous = self._observed.get(path)
+        if previous is None or previous[0] != signature:
+            self._observed[path] = (signature, now)
+            return None
+        if stat.st_size == 0 or now - previous[1] < self.settle_seconds:
+            return None
+        try:
+            # Windows keeps files locked while they are being copied in
+            with open(path, "rb"):
+                pass
+        except OSError:
+            return None
+        return signature
+
+    def scan(self, now=None):
+        """Return files that finished arriving and still need processing."""
+        from processor.batch import get_manifest
+
+        now = time.monotonic() if now is None else now
+        ready = []
+        seen = set()
+        for path in self._candidates():
+            seen.add(path)
+            with self._lock:
+                if path in self._in_flight:
+                    continue
+            signature = self._settled_signature(path, now)
+            if signature is None or self._attempted.get(path) == signature:
+                continue
+            manifest = get_manifest(path.parent)
+            try:
+                if manifest.pending_reason(path, manifest.input_hash(path)) is None:
+                    continue
+            except OSError:
+                continue
+            self._attempted[path] = signature
+            ready.append(path)
+        for path in set(self._observed) - seen:
+            del self._observed[path]
+            self._attempted.pop(path, None)
+        return ready
+
+    def _process(self, path):
+        from processor.batch import run_batch
+        from utils.metrics import write_run_reports
+        from utils.run_log import export_ocr_text, export_workbooks
+
+        try:
+            start, started = time.perf_counter(), time.time()
+            results, _ = run_batch([path], self.config, self.process_file)
+            logging.info(f"📬 {path.name}: {results[0][1]} in {time.perf_counter() - start:.1f}s")
+            with self._export_lock:
+                export_workbooks(path.parent / "logs")
+                export_ocr_text(path.parent / "logs", since=started)
+                # Cumulative since the watcher started; metrics.prom is overwritten in place
+                write_run_reports(self.config.get("metrics_dir") or path.parent / "logs", name="watch_report.json")
+        except Exception as e:
+            logging.error(f"❌ Watch processing failed for {path}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(path)
+
+    def run(self, stop_event=None):
+        """Poll until ``stop_event`` is set (or Ctrl+C), processing files as they settle."""
+        from processor.ocr_pool import warm_up_ocr
+
+        stop_event = stop_event or threading.Event()
+        warm_up_ocr(self.config)
+        file_workers = max(1, int(self.config.get("file_workers", 1)))
+        if self.config.get("num_workers", 4) <= 1:
+            file_workers = 1
+        logging.info(f"👀 Watching {', '.join(str(f) for f in self.folders)} "
+                     f"(poll {self.poll_seconds:g}s, settle {self.settle_seconds:g}s)")
+
+        with ThreadPoolExecutor(max_workers=file_workers, thread_name_prefix="watch") as executor:
+            try:
+                while not stop_event.is_set():
+                    for path in self.scan():
+                        with self._lock:
+                            self._in_flight.add(path)
+                        logging.info(f"📥 Queued: {path}")
+                        executor.submit(self._process, path)
+                    stop_event.wait(self.poll_seconds)
+            except KeyboardInterrupt:
+                logging.info("🛑 Stopping watcher; finishing files in progress...")
+
+
+def watch_folders(folders, config, stop_event=None):
+    FolderWatcher(folders, config).run(stop_event)
@@ -0,0 +1,84 @@
+import json
+import threading
+
+from processor import batch
+
+
+def _make_inputs(tmp_path, names):
+    paths = []
+    for name in names:
+        path = tmp_path / name
+        path.write_bytes(name.encode() * 10)
+        paths.append(path)
+    return paths
+
+
+def test_run_batch_records_manifest_and_skips_done(tmp_path):
+    paths = _make_inputs(tmp_path, ["a.pdf", "b.pdf", "c.pdf"])
+    calls = []
+
+    def process_file(file, config):
+        calls.append(file.name)
+        return [(file.name, 1, "VendorA", "text")]
+
+    results, logs = batch.run_batch(paths, {"file_workers": 2}, process_file)
+
+    assert results == [("a.pdf", "ok"), ("b.pdf", "ok"), ("c.pdf", "ok")]
+    assert [row[0] for row in logs] == ["a.pdf", "b.pdf", "c.pdf"]
+    manifest = json.loads((tmp_path / "logs" / batch.MANIFEST_NAME).read_text())
+    entry = manifest["files"]["a.pdf"]
+    assert entry["status"] == "done" and entry["input_hash"] and entry["duration"] is not None
+
+    calls.clear()
+    results, _ = batch.run_batch(paths, {"file_workers": 2}, process_file)
+    assert calls == []
+    assert {status for _, status in results} == {"skipped"}
+
+
+def test_run_batch_resumes_failed_and_changed_files(tmp_path):
+    paths = _make_inputs(tmp_path, ["a.pdf", "b.pdf"])
+
+    def failing(file, config):
+        if file.name == "b.pdf":
+            raise RuntimeError("boom")
+        return []
+
+    results, _ = batch.run_batch(paths, {}, failing)
+    assert results == [("a.pdf", "ok"), ("b.pdf", "failed")]
+    assert batch.get_manifest(tmp_path).get(paths[1])["error"] == "boom"
+
+    paths[0].write_bytes(b"new content")
+    calls = []
+    results, _ = batch.run_batch(paths, {}, lambda file, config: calls.append(file.name) or [])
+
+    assert sorted(calls) == ["a.pdf", "b.pdf"]
+    assert batch.get_manifest(tmp_path).get(paths[1])["attempts"] == 2
+
+
+def test_run_batch_runs_files_concurrently(tmp_path):
+    paths = _make_inputs(tmp_path, ["a.pdf", "b.pdf"])
+    barrier = threading.Barrier(2, timeout=5)
+
+    def process_file(file, config):
+        barrier.wait()  # only returns once both files are in flight
+        return []
+
+    results, _ = batch.run_batch(paths, {"file_workers": 2, "num_workers": 2}, process_file)
+    assert [status for _, status in results] == ["ok", "ok"]
+
+
+def test_files_processed_before_the_manifest_are_not_redone(tmp_path):
+    paths = _make_inputs(tmp_path, ["old.pdf", "new.pdf"])
+    (tmp_path / "processed" / "old" / "Vendor").mkdir(parents=True)
+    calls = []
+
+    results, _ = batch.run_batch(paths, {}, lambda file, config: calls.append(file.name) or [])
+
+    assert calls == ["new.pdf"]
+    assert results == [("old.pdf", "skipped"), ("new.pdf", "ok")]
+    assert batch.get_manifest(tmp_path).get(paths[0])["status"] == "done"
+
+    # Once recorded, an edited input is processed again like any other
+    paths[0].write_bytes(b"rescanned")
+    batch.run_batch(paths, {}, lambda file, config: calls.append(file.name) or [])
+    assert calls == ["new.pdf", "old.pdf"]
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from benchmarks.corpus import generate_pages, write_corpus
+from benchmarks.run import StageTimer, compare_results
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "template_dir"
+
+
+def test_corpus_pages_carry_ground_truth(tmp_path):
+    ocr_config = {"Roadstar": {"vendor_type": "trucking", "keywords": ["roadstar trucking"]}}
+    corpus = generate_pages(TEMPLATE_DIR, ocr_config, pages=3, dpi=60)
+
+    roadstar = [page for page in corpus if page.vendor == "Roadstar"]
+    assert all(page.company == "Roadstar" for page in roadstar)
+    for page in corpus:
+        assert page.ticket in page.page_ocr.text
+        assert page.page_ocr.size == page.image.size
+    files = write_corpus(corpus, tmp_path, pages_per_file=2, dpi=60)
+    assert [len(f["pages"]) for f in files] == [2, 1]
+    assert all(f["pdf"].exists() and f["tif"].exists() for f in files)
+    assert (tmp_path / "truth.json").exists()
+
+
+def test_stage_timer_summary_and_compare():
+    timer = StageTimer()
+    for _ in range(4):
+        with timer.time("keyword_match"):
+            pass
+        timer.check("keyword_match", True)
+    with timer.time("export_grouped_output", pages=5):
+        pass
+    timer.skip("ocr_match_company", "not installed")
+
+    summary = timer.summary()
+    assert summary["keyword_match"]["pages"] == 4
+    assert summary["keyword_match"]["accuracy"] == 1.0
+    assert summary["export_grouped_output"]["pages"] == 5
+    assert summary["ocr_match_company"] == {"skipped": "not installed"}
+
+    base = {"stages": {"write_log": {"pages_per_sec": 100.0, "p90_ms": 10.0}}}
+    slower = {"stages": {"write_log": {"pages_per_sec": 80.0, "p90_ms": 12.0}}}
+    assert compare_results(base, slower)[0]["regression"] is True
+    assert compare_results(base, base)[0]["regression"] is False
@@ -0,0 +1,115 @@
+from PIL import Image, ImageDraw
+
+from processor import hybrid_ocr
+from processor.blank_pages import classify_back_page, ink_coverage, load_back_hashes
+from processor.page_store import as_image
+from utils.image_hash import hash_distance, perceptual_hash
+
+
+def _page(lines=0, size=(850, 1100)):
+    page = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(page)
+    for n in range(lines):
+        draw.rectangle((80, 100 + n * 40, 700, 115 + n * 40), fill='black')
+    return page
+
+
+def test_ink_coverage_ignores_scanner_edges():
+    page = _page()
+    ImageDraw.Draw(page).rectangle((0, 0, 849, 10), fill='black')
+
+    assert ink_coverage(page) == 0
+    assert ink_coverage(_page(lines=5)) > 0.01
+
+
+def test_classify_back_page(tmp_path):
+    boilerplate = _page(lines=20)
+    boilerplate.save(tmp_path / 'terms.png')
+    config = {'back_template_dir': str(tmp_path)}
+
+    assert classify_back_page(_page(), config) == 'blank'
+    assert classify_back_page(boilerplate.convert('L'), config) == 'boilerplate:terms'
+    assert classify_back_page(_page(lines=3), config) is None
+
+
+def test_load_back_hashes_refreshes_on_change(tmp_path):
+    assert load_back_hashes(str(tmp_path / 'missing')) == []
+    _page(lines=2).save(tmp_path / 'a.png')
+    assert [name for name, _ in load_back_hashes(str(tmp_path))] == ['a']
+    _page(lines=4).save(tmp_path / 'b.png')
+    assert [name for name, _ in load_back_hashes(str(tmp_path))] == ['a', 'b']
+
+
+def test_hash_distance():
+    h = perceptual_hash(_page(lines=3))
+    assert hash_distance(h, h) == 0
+    assert hash_distance(h, perceptual_hash(_page(lines=12))) > 0
+
+
+def test_duplex_backs_skip_ocr_and_follow_front(monkeypatch, tmp_path):
+    pages = [_page(lines=3), _page(), _page(lines=6), _page(lines=2)]
+    ocred = []
+
+    def fake_process_single_page(args):
+        i, page = args[0], args[1]
+        ocred.append(i)
+        return {
+            'page': i, 'page_image': page, 'page_ocr': None, 'vendor': 'VendorA' if i == 0 else 'VendorB',
+            'matched': True, 'ticket': f'T{i}', 'method': 'OCR', 'keyword': 'kw', 'rotated': False,
+            'grayscale': False, 'ocr_score': 1.0, 'expected_vendor': '', 'preview': '', 'ocr_text': 'text',
+        }, f'hash{i}'
+
+    exported = {}
+
+    def fake_export_grouped_output(pages_by_vendor, fmt, meta, fp, cfg, ocr_by_vendor=None, **kwargs):
+        exported.update({k: [as_image(p).tobytes() for p in v] for k, v in pages_by_vendor.items()})
+        return []
+
+    monkeypatch.setattr(hybrid_ocr, 'process_single_page', fake_process_single_page)
+    monkeypatch.setattr(hybrid_ocr, 'export_grouped_output', fake_export_grouped_output)
+    monkeypatch.setattr(hybrid_ocr, 'load_template_bank', lambda *_: {})
+    monkeypatch.setattr(hybrid_ocr, 'load_ocr_configs_from_excel', lambda *_: {})
+    monkeypatch.setattr(hybrid_ocr, 'parse_input_filename', lambda *_: {})
+
+    config = {
+        'template_dir': 'templates',
+        'keyword_file': 'keywords.xlsx',
+        'output_format': 'tif',
+        'num_workers': 1,
+        'ocr_back_pages': True,
+        'preprocess': {'grayscale': False, 'rotate': False},
+    }
+    ocr_log = []
+    hybrid_ocr.process_pages(pages, tmp_path / 'file.pdf', config, ocr_log=ocr_log, duplex=True)
+
+    assert ocred == [0, 2, 3]
+    assert exported['VendorA'] == [p.tobytes() for p in pages[:2]]
+    assert exported['VendorB'] == [p.tobytes() for p in pages[2:]]
+    assert [(page, vendor) for _, page, vendor, _ in ocr_log] == [
+        (1, 'VendorA'), (2, 'VendorA'), (3, 'VendorB'), (4, 'VendorB')]
+
+    ocred.clear()
+    config['ocr_back_pages'] = False
+    hybrid_ocr.process_pages(pages, tmp_path / 'file.pdf', config, duplex=True)
+    assert ocred == [0, 2]
+
+
+def test_ocred_backs_keep_their_own_match():
+    def res(i, vendor, matched):
+        return {'page': i, 'vendor': vendor, 'matched': matched, 'method': 'OCR (ROI)'}, None
+
+    results = [res(0, 'VendorA', True), res(1, 'VendorC', True), res(2, 'VendorB', True), res(3, 'Unknown', False)]
+    merged = hybrid_ocr._with_back_pages(results, {}, {})
+
+    assert [(r['vendor'], r['method']) for r, _ in merged] == [
+        ('VendorA', 'OCR (ROI)'), ('VendorC', 'OCR (ROI)'), ('VendorB', 'OCR (ROI)'), ('VendorB', 'Back page (OCR (ROI))')]
+
+
+def test_back_template_dir_is_resolved_from_the_project_root(monkeypatch, tmp_path):
+    from utils import loader
+
+    (tmp_path / 'backs').mkdir()
+    _page(lines=20).save(tmp_path / 'backs' / 'terms.png')
+    monkeypatch.setattr(loader, 'PROJECT_ROOT', tmp_path)
+
+    assert [name for name, _ in load_back_hashes('backs')] == ['terms']
@@ -0,0 +1,69 @@
+import sys
+import types
+
+from PIL import Image
+
+from processor import engine_compare
+from utils import ocr_wrapper
+
+OCR_CONFIG = {"Roadstar": {"vendor_type": "trucking", "keywords": ["roadstar"]}}
+
+
+def _register_fake_engine(monkeypatch, name, text):
+    module = types.ModuleType(f"fake_{name}")
+    module.is_available = lambda: True
+    module.load = lambda: None
+    module.read_text = lambda image, **kwargs: {"engine": name, "text": text, "confidence": 0.9, "lines": []}
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    monkeypatch.setitem(ocr_wrapper._ENGINE_MODULES, name, module.__name__)
+
+
+def test_each_engine_is_dispatched_and_scored(monkeypatch, tmp_path):
+    monkeypatch.setattr(ocr_wrapper, "_loaded", {})
+    _register_fake_engine(monkeypatch, "good", "ROADSTAR TRUCKING Ticket A123456")
+    _register_fake_engine(monkeypatch, "bad", "R0ADST4R")
+    truth_file = tmp_path / "truth.csv"
+    truth_file.write_text("Filename,Page,Vendor,Ticket Number\nSCAN,1,Roadstar,A123456\n")
+
+    pages = [(tmp_path / "scan.pdf", 1, Image.new("RGB", (20, 20), "white"))]
+    truth = engine_compare.load_ground_truth(truth_file)
+    page_rows, summary = engine_compare.compare_engines(pages, ["good", "bad"], {}, OCR_CONFIG, truth)
+
+    assert [r["Engine"] for r in page_rows] == ["good", "bad"]
+    good, bad = summary
+    assert good["Vendor accuracy"] == 1.0 and good["Ticket accuracy"] == 1.0
+    assert bad["Vendor accuracy"] == 0.0 and bad["Ticket accuracy"] == 0.0
+    assert good["Pages"] == 1 and good["Pages/sec"] > 0
+
+
+def test_comparison_mode_writes_one_report(monkeypatch, tmp_path):
+    monkeypatch.setattr(ocr_wrapper, "_loaded", {})
+    _register_fake_engine(monkeypatch, "good", "roadstar A654321")
+    monkeypatch.setattr(engine_compare, "load_ocr_configs_from_excel", lambda path: OCR_CONFIG)
+    monkeypatch.chdir(tmp_path)
+    scan = tmp_path / "scan.png"
+    Image.new("RGB", (20, 20), "white").save(scan)
+
+    out_path = engine_compare.run_comparison_mode(
+        str(scan), {"keyword_file": "unused.xlsx", "compare_engines": ["good", "missing"]})
+
+    import pandas as pd
+
+    summary = pd.read_excel(out_path, sheet_name="Summary")
+    assert list(summary["Engine"]) == ["good"]
+    assert out_path.with_suffix(".png").exists()
+
+
+def test_engines_are_compared_with_the_configured_params(monkeypatch, tmp_path):
+    monkeypatch.setattr(ocr_wrapper, "_loaded", {})
+    _register_fake_engine(monkeypatch, "good", "roadstar A654321")
+    module = sys.modules["fake_good"]
+    loads, calls = [], []
+    module.load = lambda **options: loads.append(options)
+    module.read_text = lambda image, **kwargs: calls.append(kwargs) or {"text": "roadstar", "confidence": 0.9}
+
+    pages = [(tmp_path / "scan.pdf", 1, Image.new("RGB", (20, 20), "white"))]
+    engine_compare.compare_engines(pages, ["good"], {"ocr_engine_params": {"rec_batch_num": 16}}, OCR_CONFIG)
+
+    assert loads and all(options == {"rec_batch_num": 16} for options in loads)
+    assert calls == [{"rec_batch_num": 16}]
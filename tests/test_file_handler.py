@@ -14,3 +14,81 @@ def test_archive_original(tmp_path):
     file.write_text("dummy content")
     file_handler.archive_original(str(file))
     assert (tmp_path / "Original Scans" / "test.pdf").exists()
+
+
+def test_export_grouped_output_writes_searchable_pdfs(tmp_path):
+    from PIL import Image
+    from PyPDF2 import PdfReader
+
+    from processor.page_ocr import PageOCR
+
+    def page(text):
+        img = Image.new("RGB", (600, 300), "white")
+        ocr = PageOCR(text=text, lines=[{"text": text, "box": (50, 40, 400, 80)}], size=img.size)
+        return img, ocr
+
+    (a1, o1), (a2, o2), (b1, o3) = page("Alpha ticket A100001"), page("Alpha ticket A100002"), page("Beta A200001")
+    source = tmp_path / "24-105_2025-04-18_Flexbase_ZoneE_SouthFill.pdf"
+
+    outputs = file_handler.export_grouped_output(
+        {"Alpha": [a1, a2], "Beta": [b1]},
+        "pdf",
+        {},
+        source,
+        {},
+        ocr_by_vendor={"Alpha": [o1, o2], "Beta": [o3]},
+    )
+
+    alpha = PdfReader(outputs[0])
+    assert len(alpha.pages) == 2
+    assert "A100002" in alpha.pages[1].extract_text()
+    combined = list((tmp_path / "processed").glob("*/Combined/*.pdf"))
+    assert len(combined) == 1
+    combined_reader = PdfReader(combined[0])
+    assert len(combined_reader.pages) == 3
+    assert "A200001" in combined_reader.pages[2].extract_text()
+
+
+def test_export_grouped_output_passes_pdf_pages_through(tmp_path):
+    import io
+
+    from PIL import Image
+    from PyPDF2 import PdfReader
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    from processor.page_ocr import PageOCR
+
+    source = tmp_path / "24-105_2025-04-18_Flexbase_ZoneE_SouthFill.pdf"
+    c = canvas.Canvas(str(source), pagesize=(612, 792))
+    for shade in (40, 120, 200):
+        buf = io.BytesIO()
+        Image.new("RGB", (850, 1100), (shade, shade, shade)).save(buf, format="JPEG")
+        c.drawImage(ImageReader(buf), 0, 0, width=612, height=792)
+        c.showPage()
+    c.save()
+
+    ocr = PageOCR(text="Beta A200001", lines=[{"text": "Beta A200001", "box": (50, 40, 400, 80)}], size=(1100, 850))
+    outputs = file_handler.export_grouped_output(
+        {"Alpha": ["a1", "a2"], "Beta": ["b1"]},
+        "pdf",
+        {},
+        source,
+        {"pdf_export_mode": "passthrough", "pdf_text_overlay": True},
+        ocr_by_vendor={"Alpha": [None, None], "Beta": [ocr]},
+        source_pages_by_vendor={"Alpha": [(0, 0), (2, 0)], "Beta": [(1, 90)]},
+    )
+
+    alpha, beta = PdfReader(outputs[0]), PdfReader(outputs[1])
+    assert len(alpha.pages) == 2 and len(beta.pages) == 1
+    original = PdfReader(source)
+
+    def image_data(page):
+        return [x.get_object().get_data() for x in page["/Resources"]["/XObject"].values()]
+
+    # The scanner's image streams are copied byte for byte
+    assert image_data(alpha.pages[1]) == image_data(original.pages[2])
+    assert (float(beta.pages[0].mediabox.width), float(beta.pages[0].mediabox.height)) == (792, 612)
+    assert "A200001" in beta.pages[0].extract_text()
+    combined = PdfReader(next((tmp_path / "processed").glob("*/Combined/*.pdf")))
+    assert len(combined.pages) == 3
@@ -27,13 +27,13 @@ def test_process_pages_groups_and_exports(monkeypatch, tmp_path):
 
     exported = {}
 
-    def fake_export_grouped_output(pages_by_vendor, fmt, meta, fp, cfg):
+    def fake_export_grouped_output(pages_by_vendor, fmt, meta, fp, cfg, ocr_by_vendor=None, **kwargs):
         exported['pages'] = {k: list(v) for k, v in pages_by_vendor.items()}
         return ['out_a.pdf', 'out_b.pdf']
 
     monkeypatch.setattr(hybrid_ocr, 'process_single_page', fake_process_single_page)
     monkeypatch.setattr(hybrid_ocr, 'export_grouped_output', fake_export_grouped_output)
-    monkeypatch.setattr(hybrid_ocr, 'load_templates', lambda *_: {})
+    monkeypatch.setattr(hybrid_ocr, 'load_template_bank', lambda *_: {})
     monkeypatch.setattr(hybrid_ocr, 'load_ocr_configs_from_excel', lambda *_: {})
     monkeypatch.setattr(hybrid_ocr, 'parse_input_filename', lambda *_: {
         'JOB_ID': 'JOB',
@@ -56,3 +56,402 @@ def test_process_pages_groups_and_exports(monkeypatch, tmp_path):
     assert exported['pages']['VendorA'][0] == img_a
     assert exported['pages']['VendorB'][0] == img_b
     assert out == ['out_a.pdf', 'out_b.pdf']
+
+
+def test_process_single_page_runs_ocr_once(monkeypatch):
+    from PIL import Image
+    from processor.page_ocr import PageOCR
+
+    calls = []
+
+    def fake_ocr_page(page, engine=None, **params):
+        calls.append(page.size)
+        return PageOCR(
+            text="Big City Crushed Concrete\nTicket A123456",
+            lines=[
+                {"text": "Big City Crushed Concrete", "box": (10, 10, 190, 30)},
+                {"text": "Ticket A123456", "box": (10, 150, 190, 170)},
+            ],
+            engine="fake",
+            size=page.size,
+        )
+
+    monkeypatch.setattr(hybrid_ocr, 'ocr_page', fake_ocr_page)
+    monkeypatch.setattr(hybrid_ocr, 'extract_ticket_number', lambda page, text=None: text.split()[-1])
+
+    page = Image.new('RGB', (200, 200), 'white')
+    ocr_config = {'BigCity': {'vendor_type': 'trucking', 'keywords': ['big city']}}
+    config = {
+        'use_roi': True,
+        'ocr_crop_top_percent': 25,
+        'ocr_cascade': ['full'],
+        'use_template_fallback': False,
+        'preprocess': {'grayscale': False, 'rotate': False},
+    }
+
+    res, _ = hybrid_ocr.process_single_page((0, page, 'f.pdf', config, {}, ocr_config, '', {}))
+
+    assert calls == [(200, 200)]
+    assert res['vendor'] == 'BigCity'
+    assert res['method'] == 'OCR (ROI)'
+    assert res['ticket'] == 'A123456'
+    assert res['page_ocr'].text_in((0, 0, 200, 50)) == "Big City Crushed Concrete"
+
+
+def test_process_single_page_reuses_disk_cache(monkeypatch, tmp_path):
+    from PIL import Image
+    from processor.page_ocr import PageOCR
+
+    calls = []
+
+    def fake_ocr_page(page, engine=None, **params):
+        calls.append(engine)
+        return PageOCR(text="Ticket A654321", engine="fake", size=page.size)
+
+    monkeypatch.setattr(hybrid_ocr, 'ocr_page', fake_ocr_page)
+    monkeypatch.setattr(hybrid_ocr, 'extract_ticket_number', lambda page, text=None: text.split()[-1])
+
+    page = Image.new('RGB', (50, 50), 'white')
+    config = {
+        'use_roi': False,
+        'use_template_fallback': False,
+        'cache_file': str(tmp_path / 'ocr_cache.sqlite'),
+        'preprocess': {'grayscale': False, 'rotate': False},
+    }
+
+    from utils.metrics import capture_metrics
+
+    with capture_metrics() as metrics:
+        first, _ = hybrid_ocr.process_single_page((0, page, 'f.pdf', config, {}, {}, '', {}))
+        second, _ = hybrid_ocr.process_single_page((0, page, 'f.pdf', config, {}, {}, '', {}))
+
+    assert calls == [None]
+    assert metrics.counter('ocr_cache_misses') == 1
+    assert metrics.counter('ocr_cache_hits', level='disk') == 1
+    assert metrics.counter('pages_processed') == 2
+    assert [p['page'] for p in metrics.page_breakdown()] == [1]
+    assert second['ticket'] == first['ticket'] == 'A654321'
+
+
+def _cascade_ocr(calls, confidence):
+    from processor.page_ocr import PageOCR
+
+    def fake_ocr_page(page, engine=None, **params):
+        calls.append(page.size)
+        lines = [
+            {"text": "Big City Crushed Concrete", "box": (10, 10, 190, 30), "confidence": 0.97},
+            {"text": "Ticket A123456", "box": (10, 30, 190, 45), "confidence": confidence},
+            {"text": "Net weight 12.5", "box": (10, 150, 190, 170), "confidence": 0.95},
+        ]
+        lines = [line for line in lines if line["box"][3] <= page.height]
+        return PageOCR(text="\n".join(line["text"] for line in lines), lines=lines, engine="fake",
+                       confidence=sum(line["confidence"] for line in lines) / len(lines), size=page.size)
+
+    return fake_ocr_page
+
+
+def _cascade_config(**overrides):
+    return {
+        'use_roi': True,
+        'ocr_crop_top_percent': 25,
+        'use_template_fallback': False,
+        'cascade_min_confidence': 0.8,
+        'preprocess': {'grayscale': False, 'rotate': False},
+        **overrides,
+    }
+
+
+def test_cascade_stops_after_confident_roi(monkeypatch):
+    from PIL import Image
+    from utils.metrics import capture_metrics
+
+    calls = []
+    monkeypatch.setattr(hybrid_ocr, 'ocr_page', _cascade_ocr(calls, confidence=0.93))
+    ocr_config = {'BigCity': {'vendor_type': 'trucking', 'keywords': ['big city']}}
+
+    with capture_metrics() as metrics:
+        res, _ = hybrid_ocr.process_single_page(
+            (0, Image.new('RGB', (200, 200), 'white'), 'f.pdf', _cascade_config(), {}, ocr_config, '', {}))
+
+    assert calls == [(200, 50)]
+    assert (res['vendor'], res['ticket'], res['method']) == ('BigCity', 'A123456', 'OCR (ROI)')
+    assert res['ticket_confidence'] == 0.93
+    assert res['page_ocr'].size == (200, 200)
+    assert metrics.counter('cascade_exits', stage='roi') == 1
+
+
+def test_cascade_escalates_uncertain_pages(monkeypatch):
+    from PIL import Image
+    from utils.metrics import capture_metrics
+
+    calls = []
+    monkeypatch.setattr(hybrid_ocr, 'ocr_page', _cascade_ocr(calls, confidence=0.4))
+    ocr_config = {'BigCity': {'vendor_type': 'trucking', 'keywords': ['big city']}}
+    config = _cascade_config(preprocess={'grayscale': False, 'rotate': True})
+    rotations = []
+    monkeypatch.setattr(hybrid_ocr, 'detect_rotation', lambda page: rotations.append(page.size) or 0)
+
+    with capture_metrics() as metrics:
+        res, _ = hybrid_ocr.process_single_page(
+            (0, Image.new('RGB', (200, 200), 'white'), 'f.pdf', config, {}, ocr_config, '', {}))
+
+    # ROI, then the full page, then the orientation check (upright, so no third OCR pass)
+    assert calls == [(200, 50), (200, 200)]
+    assert rotations == [(200, 200)]
+    assert res['vendor'] == 'BigCity' and res['vendor_confidence'] == 0.97
+    assert res['ticket'] == 'A123456' and res['ticket_confidence'] == 0.4
+    assert not res['rotated']
+    assert metrics.counter('cascade_exits', stage='exhausted') == 1
+    assert metrics.counter('ocr_passes', engine='default', scope='full') == 1
+
+
+def test_page_batch_shares_one_ocr_call(monkeypatch):
+    from PIL import Image
+    from processor.page_ocr import PageOCR
+
+    batches = []
+
+    def fake_ocr_pages(images, engine=None, **params):
+        batches.append([image.size for image in images])
+        return [PageOCR(text=f"Big City\nTicket A12345{n}", engine="fake", confidence=0.9, size=image.size)
+                for n, image in enumerate(images)]
+
+    monkeypatch.setattr(hybrid_ocr, 'ocr_pages', fake_ocr_pages)
+    monkeypatch.setattr(hybrid_ocr, 'ocr_page', lambda *a, **k: (_ for _ in ()).throw(AssertionError('unbatched')))
+    monkeypatch.setattr(hybrid_ocr, 'extract_ticket_number', lambda page, text=None: text.split()[-1])
+
+    ocr_config = {'BigCity': {'vendor_type': 'trucking', 'keywords': ['big city']}}
+    config = _cascade_config(use_roi=False, ocr_cascade=['full'])
+    cache = {}
+    pages = [Image.new('RGB', (100, 100 + n), 'white') for n in range(3)]
+    batch = [(i, page, 'f.pdf', config, {}, ocr_config, '', cache) for i, page in enumerate(pages)]
+
+    results = hybrid_ocr.process_page_batch(batch)
+
+    assert batches == [[(100, 100), (100, 101), (100, 102)]]
+    assert [res['ticket'] for res, _ in results] == ['A123450', 'A123451', 'A123452']
+    assert all(res['vendor'] == 'BigCity' for res, _ in results)
+
+    # Cached pages are not OCRed again
+    hybrid_ocr.process_page_batch(batch[:2])
+    assert len(batches) == 1
+
+
+def test_orientation_comes_from_the_ocr_pass(monkeypatch):
+    from PIL import Image
+    from processor.page_ocr import PageOCR
+
+    def fake_ocr_page(page, engine=None, **params):
+        lines = [{"text": t, "box": (20, 150 + 30 * n, 180, 170 + 30 * n), "confidence": 0.95, "angle": 180}
+                 for n, t in enumerate(["Big City Crushed Concrete", "Ticket A123456", "Net 12.5"])]
+        return PageOCR(text="\n".join(line["text"] for line in lines), lines=lines, engine="fake", confidence=0.95,
+                       size=page.size)
+
+    monkeypatch.setattr(hybrid_ocr, 'ocr_page', fake_ocr_page)
+    monkeypatch.setattr(hybrid_ocr, 'extract_ticket_number', lambda page, text=None: 'A123456')
+    monkeypatch.setattr(hybrid_ocr, 'detect_rotation',
+                        lambda page: (_ for _ in ()).throw(AssertionError('OSD should not run')))
+
+    page = Image.new('RGB', (200, 300), 'white')
+    page.putpixel((0, 0), (0, 0, 0))
+    ocr_config = {'BigCity': {'vendor_type': 'trucking', 'keywords': ['big city']}}
+    config = _cascade_config(use_roi=False, preprocess={'grayscale': False, 'rotate': True})
+
+    res, _ = hybrid_ocr.process_single_page((0, page, 'f.pdf', config, {}, ocr_config, '', {}))
+
+    assert res['rotated'] and res['vendor'] == 'BigCity'
+    assert res['page_image'].getpixel((199, 299)) == (0, 0, 0)
+    assert res['page_ocr'].lines[0]['box'] == (20, 130, 180, 150)
+
+
+def test_uncertain_ticket_is_read_again_at_full_dpi(monkeypatch):
+    from PIL import Image
+    from processor.page_ocr import PageOCR
+    from processor.page_store import PageRender
+    from utils.metrics import capture_metrics
+
+    calls = []
+    fake_ocr = _cascade_ocr(calls, confidence=0.4)
+
+    def fake_ocr_page(page, engine=None, **params):
+        if page.size == (200, 200):
+            return fake_ocr(page)
+        calls.append(page.size)
+        return PageOCR(text="Ticket A123456", lines=[{"text": "Ticket A123456", "box": (0, 0, 10, 10),
+                                                     "confidence": 0.96}], confidence=0.96, size=page.size)
+
+    renders = []
+    monkeypatch.setattr(hybrid_ocr, 'ocr_page', fake_ocr_page)
+    monkeypatch.setattr(PageRender, 'open', lambda self: renders.append(self) or Image.new('L', (400, 400), 'white'))
+    ocr_config = {'BigCity': {'vendor_type': 'trucking', 'keywords': ['big city']}}
+    config = _cascade_config(use_roi=False, classify_dpi=150, poppler_path='poppler')
+
+    with capture_metrics() as metrics:
+        res, _ = hybrid_ocr.process_single_page(
+            (3, Image.new('RGB', (200, 200), 'white'), 'scan.pdf', config, {}, ocr_config, '', {}))
+
+    # Only the candidate's line (plus a line height all round) is OCRed at full DPI
+    assert calls == [(200, 200), (400, 90)]
+    assert renders == [PageRender('scan.pdf', 3, 300, 0, False, 'poppler')]
+    assert res['ticket'] == 'A123456' and res['ticket_confidence'] == 0.96
+    assert res['output_image'].size == (400, 400)
+    assert metrics.counter('full_dpi_renders', reason='ticket') == 1
+    assert metrics.counter('ocr_passes', engine='default', scope='ticket_line') == 1
+
+
+
+def _layout_dir(tmp_path):
+    (tmp_path / "BigCity").mkdir()
+    (tmp_path / "BigCity" / "layout.yaml").write_text(
+        "ticket_boxes: [[0.5, 0.75, 1.0, 0.9]]\nticket_pattern: 'No\\.?\\s*(\\d{6})'\n", encoding="utf-8")
+    return str(tmp_path)
+
+
+def test_layout_ticket_replaces_the_generic_match(monkeypatch, tmp_path):
+    from PIL import Image
+    from utils.metrics import capture_metrics
+
+    calls, crops = [], []
+    monkeypatch.setattr(hybrid_ocr, 'ocr_page', _cascade_ocr(calls, confidence=0.93))
+    monkeypatch.setattr(hybrid_ocr, 'recognize_text', lambda images, engine=None, **params: [
+        crops.append(image.size) or {"text": "No. 778812", "confidence": 0.91} for image in images])
+    ocr_config = {'BigCity': {'vendor_type': 'trucking', 'keywords': ['big city']}}
+    config = _cascade_config(template_dir=_layout_dir(tmp_path))
+
+    with capture_metrics() as metrics:
+        res, _ = hybrid_ocr.process_single_page(
+            (0, Image.new('RGB', (200, 200), 'white'), 'f.pdf', config, {}, ocr_config, '', {}))
+
+    # The ROI pass does not reach the layout box, so only the box is recognized
+    assert calls == [(200, 50)]
+    assert crops == [(100, 30)]
+    assert (res['vendor'], res['ticket'], res['ticket_confidence']) == ('BigCity', '778812', 0.91)
+    assert metrics.counter('cascade_exits', stage='roi') == 1
+    assert metrics.counter('ocr_passes', engine='default', scope='layout') == 1
+
+
+def test_template_vendor_with_layout_needs_no_page_ocr(monkeypatch, tmp_path):
+    from PIL import Image
+    from utils.metrics import capture_metrics
+
+    monkeypatch.setattr(hybrid_ocr, 'ocr_page', lambda *a, **k: (_ for _ in ()).throw(AssertionError('OCR ran')))
+    monkeypatch.setattr(hybrid_ocr, 'run_template_matching', lambda *a, **k: ('bigcity', 0.95))
+    monkeypatch.setattr(hybrid_ocr, 'recognize_text', lambda images, engine=None, **params: [
+        {"text": "No 778812", "confidence": 0.9} for _ in images])
+    config = _cascade_config(template_dir=_layout_dir(tmp_path), use_template_fallback=True,
+                             ocr_cascade=['template', 'roi', 'full'])
+
+    with capture_metrics() as metrics:
+        res, _ = hybrid_ocr.process_single_page(
+            (0, Image.new('RGB', (200, 200), 'white'), 'f.pdf', config, {'bigcity': None}, {}, '', {}))
+
+    assert (res['vendor'], res['ticket'], res['method']) == ('BIGCITY', '778812', 'Template (0.95)')
+    assert metrics.counter('cascade_exits', stage='template') == 1
+
+
+
+def test_pages_without_a_ticket_candidate_are_not_rendered_for_it(monkeypatch):
+    from PIL import Image
+    from processor.page_ocr import PageOCR
+    from processor.page_store import PageRender
+    from utils.metrics import capture_metrics
+
+    calls = []
+
+    def fake_ocr_page(page, engine=None, **params):
+        calls.append(page.size)
+        return PageOCR(text="Big City Crushed Concrete", confidence=0.97, size=page.size,
+                       lines=[{"text": "Big City Crushed Concrete", "box": (10, 10, 190, 30), "confidence": 0.97}])
+
+    monkeypatch.setattr(hybrid_ocr, 'ocr_page', fake_ocr_page)
+    monkeypatch.setattr(hybrid_ocr, 'extract_ticket_number', lambda page, text=None: None)
+    monkeypatch.setattr(PageRender, 'open', lambda self: (_ for _ in ()).throw(AssertionError('rendered')))
+    ocr_config = {'BigCity': {'vendor_type': 'trucking', 'keywords': ['big city']}}
+    config = _cascade_config(use_roi=False, classify_dpi=150)
+
+    with capture_metrics() as metrics:
+        res, _ = hybrid_ocr.process_single_page(
+            (0, Image.new('RGB', (200, 200), 'white'), 'scan.pdf', config, {}, ocr_config, '', {}))
+
+    assert calls == [(200, 200)]
+    assert res['vendor'] == 'BigCity' and res['ticket'] == ''
+    assert isinstance(res['output_image'], PageRender)
+    assert metrics.counter('full_dpi_renders', reason='ticket') == 0
+
+
+def test_export_renders_are_made_a_chunk_at_a_time(monkeypatch, tmp_path):
+    from PIL import Image
+    from processor.page_store import PageRender, PageStore, as_image
+
+    chunks = []
+
+    def fake_open_renders(renders):
+        chunks.append([render.index for render in renders])
+        return [Image.new('L', (40, 40), render.index) for render in renders]
+
+    monkeypatch.setattr(hybrid_ocr, 'open_renders', fake_open_renders)
+    results = [({'page': n, 'page_image': Image.new('L', (20, 20)), 'output_image': PageRender('scan.pdf', n, 300)},
+                None) for n in range(5)]
+    with PageStore(tmp_path) as store:
+        spilled = list(hybrid_ocr._spill_all(iter(results), store, chunk_size=2))
+        assert [as_image(res['page_image']).getpixel((0, 0)) for res, _ in spilled] == [0, 1, 2, 3, 4]
+
+    assert chunks == [[0, 1], [2, 3], [4]]
+
+
+
+def test_only_attempted_template_matches_count_as_fallbacks(monkeypatch):
+    from PIL import Image
+    from processor.cascade import PageDecision
+    from utils.metrics import capture_metrics
+
+    monkeypatch.setattr(hybrid_ocr, 'run_template_matching', lambda *a, **k: None)
+    page = Image.new('L', (200, 200), 255)
+    with capture_metrics() as metrics:
+        monkeypatch.setattr(hybrid_ocr, 'is_oversized_template', lambda roi: True)
+        hybrid_ocr._match_template(PageDecision(), page, (0, 0, 200, 50), {'x': None}, {}, 0)
+        assert metrics.counter('template_fallbacks') == 0
+
+        monkeypatch.setattr(hybrid_ocr, 'is_oversized_template', lambda roi: False)
+        hybrid_ocr._match_template(PageDecision(), page, (0, 0, 200, 50), {'x': None}, {}, 0)
+        assert metrics.counter('template_fallbacks') == 1
+
+def test_low_dpi_pages_are_exported_from_full_dpi_renders(monkeypatch, tmp_path):
+    from PIL import Image
+    from processor.page_store import PageRender, PageStore, as_image
+
+    monkeypatch.setattr(PageRender, 'open', lambda self: Image.new('L', (40, 40), self.index))
+    render = PageRender('scan.pdf', 7, 300)
+    with PageStore(tmp_path) as store:
+        small = ({'page_image': Image.new('L', (20, 20)), 'output_image': render}, 'hash')
+        res, _ = hybrid_ocr._spill(small, store)
+        assert 'output_image' not in res
+        assert as_image(res['page_image']).size == (40, 40)
+        assert as_image(res['page_image']).getpixel((0, 0)) == 7
+
+        # Full-resolution pages (no output_image) are stored as they are
+        res, _ = hybrid_ocr._spill(({'page_image': Image.new('L', (20, 20))}, 'hash'), store)
+        assert as_image(res['page_image']).size == (20, 20)
+
+
+def test_text_layer_pages_skip_ocr(monkeypatch, tmp_path):
+    from processor.page_ocr import PageOCR
+    from processor.page_store import PageRender, PageStore
+    from processor.text_layer import TextPage
+
+    monkeypatch.setattr(hybrid_ocr, 'ocr_page', lambda *a, **k: (_ for _ in ()).throw(AssertionError('OCR ran')))
+    monkeypatch.setattr(hybrid_ocr, 'detect_rotation', lambda *a: (_ for _ in ()).throw(AssertionError('OSD ran')))
+    ocr_config = {'BigCity': {'vendor_type': 'trucking', 'keywords': ['big city']}}
+    page = TextPage(PageOCR(text="Big City Crushed Concrete\nTicket A123456", engine="text_layer", confidence=1.0,
+                            size=(1275, 1650)))
+    config = _cascade_config(preprocess={'grayscale': True, 'rotate': True}, poppler_path='poppler')
+
+    result = hybrid_ocr.process_single_page((2, page, 'scan.pdf', config, {}, ocr_config, '', {}))
+    res, _ = result
+
+    assert (res['vendor'], res['ticket'], res['method']) == ('BigCity', 'A123456', 'Text layer')
+    assert res['output_image'] == PageRender('scan.pdf', 2, 300, 0, True, 'poppler')
+    # Passthrough export needs no pixels, so the page is never rendered
+    with PageStore(tmp_path) as store:
+        res, _ = hybrid_ocr._spill(result, store, render=False)
+    assert res['page_image'] is None
@@ -0,0 +1,37 @@
+import numpy as np
+from PIL import Image
+
+from utils import image_hash
+
+
+def test_hash_pixels_matches_between_equal_pages_and_detects_changes():
+    page = Image.new("RGB", (300, 200), "white")
+    same = Image.new("RGB", (300, 200), "white")
+    changed = page.copy()
+    changed.putpixel((150, 199), (0, 0, 0))
+
+    assert image_hash.hash_pixels(page) == image_hash.hash_pixels(same)
+    assert image_hash.hash_pixels(page) != image_hash.hash_pixels(changed)
+    assert image_hash.hash_pixels(page) != image_hash.hash_pixels(page.convert("L"))
+
+
+def test_hash_pixels_strips_cover_whole_page(monkeypatch):
+    monkeypatch.setattr(image_hash, "STRIP_BYTES", 100)
+    page = Image.new("L", (40, 30), 255)
+    changed = page.copy()
+    changed.putpixel((39, 29), 0)
+    assert image_hash.hash_pixels(page) != image_hash.hash_pixels(changed)
+
+
+def test_hash_pixels_accepts_numpy_arrays():
+    arr = np.zeros((10, 10), dtype=np.uint8)
+    assert image_hash.hash_pixels(arr) == image_hash.hash_pixels(arr.copy())
+
+
+def test_perceptual_hash_tolerates_small_noise():
+    rng = np.random.default_rng(0)
+    base = np.tile(np.linspace(0, 255, 200, dtype=np.uint8), (200, 1))
+    noisy = np.clip(base.astype(int) + rng.integers(-3, 4, base.shape), 0, 255).astype(np.uint8)
+
+    assert image_hash.perceptual_hash(base) == image_hash.perceptual_hash(noisy)
+    assert image_hash.image_digest(base) != image_hash.image_digest(noisy)
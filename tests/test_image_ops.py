@@ -7,3 +7,98 @@ def test_extract_ticket_number():
     img = Image.new("RGB", (200, 100), "white")
     number = image_ops.extract_ticket_number(img)
     assert isinstance(number, str)
+
+
+def test_iter_images_from_file_streams_tiff_pages(tmp_path):
+    path = tmp_path / "scan.tif"
+    frames = [Image.new("L", (20, 20), shade) for shade in (0, 128, 255)]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+
+    pages = image_ops.iter_images_from_file(path, poppler_path=None)
+
+    assert not isinstance(pages, list)
+    assert [p.getpixel((0, 0)) for p in pages] == [0, 128, 255]
+
+
+def test_iter_images_from_file_rasterizes_pdf_in_chunks(monkeypatch, tmp_path):
+    import pdf2image
+
+    calls = []
+
+    def fake_convert(path, dpi, poppler_path, first_page, last_page):
+        calls.append((first_page, last_page))
+        return [Image.new("L", (5, 5), n) for n in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(pdf2image, "pdfinfo_from_path", lambda *a, **k: {"Pages": 5})
+    monkeypatch.setattr(pdf2image, "convert_from_path", fake_convert)
+
+    pages = image_ops.iter_images_from_file(tmp_path / "scan.pdf", poppler_path=None, chunk_size=2)
+
+    assert [p.getpixel((0, 0)) for p in pages] == [1, 2, 3, 4, 5]
+    assert calls == [(1, 2), (3, 4), (5, 5)]
+
+
+
+def test_iter_images_from_file_raises_when_a_chunk_fails(monkeypatch, tmp_path):
+    import pdf2image
+    import pytest
+
+    def fake_convert(path, dpi, poppler_path, first_page, last_page):
+        if first_page > 2:
+            raise RuntimeError("pdftoppm crashed")
+        return [Image.new("L", (5, 5), n) for n in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(pdf2image, "pdfinfo_from_path", lambda *a, **k: {"Pages": 5})
+    monkeypatch.setattr(pdf2image, "convert_from_path", fake_convert)
+
+    pages = image_ops.iter_images_from_file(tmp_path / "scan.pdf", poppler_path=None, chunk_size=2)
+
+    assert [next(pages).getpixel((0, 0)) for _ in range(2)] == [1, 2]
+    with pytest.raises(RuntimeError, match="pdftoppm"):
+        next(pages)
+
+def test_low_dpi_pages_and_full_dpi_renders(tmp_path):
+    path = tmp_path / "scan.tif"
+    frames = [Image.new("1", (300, 400), 1), Image.new("L", (300, 400), 128)]
+    frames[0].save(path, save_all=True, append_images=frames[1:], dpi=(300, 300))
+
+    small = list(image_ops.iter_images_from_file(path, poppler_path=None, dpi=150))
+    full = image_ops.render_page(path, 1, poppler_path=None)
+
+    assert [p.size for p in small] == [(150, 200), (150, 200)]
+    assert small[0].getpixel((0, 0)) == 255
+    assert full.size == (300, 400) and full.getpixel((0, 0)) == 128
+    assert image_ops.classify_dpi({"classify_dpi": 150}) == 150
+    assert image_ops.classify_dpi({"classify_dpi": 600}) == image_ops.classify_dpi({}) == image_ops.RASTER_DPI
+
+
+def test_pdf_pages_with_a_text_layer_are_not_rasterized(monkeypatch, tmp_path):
+    import pdf2image
+    from reportlab.pdfgen import canvas
+
+    from processor.text_layer import TextPage
+
+    path = tmp_path / "tickets.pdf"
+    c = canvas.Canvas(str(path), pagesize=(612, 792))
+    for text in ("Big City Crushed Concrete ticket A123456", None, None, "Roadstar Trucking ticket A654321"):
+        if text:
+            c.drawString(72, 720, text)
+        c.showPage()
+    c.save()
+
+    calls = []
+
+    def fake_convert(path, dpi, poppler_path, first_page, last_page):
+        calls.append((first_page, last_page))
+        return [Image.new("L", (5, 5), n) for n in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(pdf2image, "pdfinfo_from_path", lambda *a, **k: {"Pages": 4})
+    monkeypatch.setattr(pdf2image, "convert_from_path", fake_convert)
+
+    pages = list(image_ops.iter_images_from_file(path, poppler_path=None, dpi=150, text_layer_min_chars=20))
+
+    assert calls == [(2, 3)]
+    assert isinstance(pages[0], TextPage) and isinstance(pages[3], TextPage)
+    assert [p.getpixel((0, 0)) for p in pages[1:3]] == [2, 3]
+    assert "A654321" in pages[3].page_ocr.text
+    assert pages[0].size == (1275, 1650)
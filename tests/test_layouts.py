@@ -0,0 +1,53 @@
+from processor.layouts import LAYOUT_FILE, load_layouts, vendor_key
+
+
+def _write_layout(template_dir, vendor, text):
+    (template_dir / vendor).mkdir(parents=True, exist_ok=True)
+    (template_dir / vendor / LAYOUT_FILE).write_text(text, encoding="utf-8")
+
+
+def test_layouts_are_read_from_vendor_folders(tmp_path):
+    _write_layout(tmp_path, "Big City", "ticket_boxes:\n  - [0.5, 0.0, 1.0, 0.25]\nticket_pattern: 'No\\.?\\s*(\\d{6})'\n")
+    _write_layout(tmp_path, "Plain", "ticket_boxes: [[0, 0.75, 1, 1]]\n")
+
+    layouts = load_layouts(str(tmp_path))
+
+    assert set(layouts) == {"bigcity", "plain"}
+    big_city = layouts[vendor_key("BIG-CITY")]
+    assert big_city.boxes_on((200, 400)) == [(100, 0, 200, 100)]
+    assert big_city.find_ticket("Ticket no. 778812\nA123456") == "778812"
+    assert big_city.find_ticket("A123456") is None
+    # Without a pattern the generic ticket pattern applies
+    assert layouts["plain"].find_ticket("Ticket a-123456") == "a123456"
+
+
+def test_broken_layouts_are_skipped(tmp_path):
+    _write_layout(tmp_path, "Good", "ticket_boxes: [[0, 0, 0.5, 0.5]]\n")
+    _write_layout(tmp_path, "NoBoxes", "ticket_pattern: '\\d+'\n")
+    _write_layout(tmp_path, "Pixels", "ticket_boxes: [[10, 20, 300, 80]]\n")
+
+    assert list(load_layouts(str(tmp_path))) == ["good"]
+    assert load_layouts(str(tmp_path / "missing")) == {}
+    assert load_layouts(None) == {}
+
+
+def test_layouts_reload_when_a_file_changes(tmp_path):
+    import os
+
+    _write_layout(tmp_path, "Alpha", "ticket_boxes: [[0, 0, 0.5, 0.5]]\n")
+    assert load_layouts(str(tmp_path))["alpha"].ticket_boxes == ((0, 0, 0.5, 0.5),)
+
+    _write_layout(tmp_path, "Alpha", "ticket_boxes: [[0.5, 0.5, 1, 1]]\n")
+    layout_file = tmp_path / "Alpha" / LAYOUT_FILE
+    os.utime(layout_file, (layout_file.stat().st_atime, layout_file.stat().st_mtime + 10))
+    assert load_layouts(str(tmp_path))["alpha"].ticket_boxes == ((0.5, 0.5, 1, 1),)
+
+
+def test_cached_layouts_are_reused_without_rescanning(tmp_path, monkeypatch):
+    from pathlib import Path
+
+    _write_layout(tmp_path, "Alpha", "ticket_boxes: [[0, 0, 0.5, 0.5]]\n")
+    layouts = load_layouts(str(tmp_path))
+    monkeypatch.setattr(Path, "glob", lambda *a: (_ for _ in ()).throw(AssertionError("rescanned")))
+
+    assert load_layouts(str(tmp_path), rescan=False) is layouts
@@ -0,0 +1,65 @@
+import json
+import threading
+
+from utils import metrics
+
+
+def test_observations_carry_file_and_page_context():
+    with metrics.capture_metrics() as registry:
+        with metrics.metrics_context(file="a.pdf"):
+            with metrics.metrics_context(page=2):
+                metrics.observe("ocr", 0.5)
+                metrics.observe("ticket", 0.01)
+            metrics.observe("export", 1.0)
+
+    pages = registry.page_breakdown()
+    assert pages == [{"file": "a.pdf", "page": 2, "stages": {"ocr": 0.5, "ticket": 0.01}, "total_s": 0.51}]
+    assert registry.stage_summary()["export"]["count"] == 1
+
+
+def test_worker_snapshot_merges_into_parent():
+    parent = metrics.MetricsRegistry()
+    with metrics.capture_metrics() as worker:
+        metrics.observe("ocr", 0.2)
+        metrics.increment("ocr_cache_hits", level="disk")
+    parent.merge(json.loads(json.dumps(worker.snapshot())))  # must survive pickling/serialization
+    parent.merge(worker.snapshot())
+
+    assert parent.counter("ocr_cache_hits", level="disk") == 2
+    assert parent.stage_summary()["ocr"]["count"] == 2
+
+
+def test_concurrent_observations_are_not_lost():
+    registry = metrics.MetricsRegistry()
+
+    def work():
+        for _ in range(1000):
+            registry.observe("hash", 0.001)
+            registry.increment("pages_processed")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert registry.stage_summary()["hash"]["count"] == 8000
+    assert registry.counter("pages_processed") == 8000
+
+
+def test_prometheus_and_json_reports(tmp_path):
+    registry = metrics.MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe("ocr", 0.05)
+    registry.observe("ocr", 0.5)
+    registry.increment("ocr_cache_misses")
+
+    text = registry.prometheus_text()
+    assert 'ticket_sorter_stage_seconds_bucket{stage="ocr",le="0.1"} 1' in text
+    assert 'ticket_sorter_stage_seconds_bucket{stage="ocr",le="1"} 2' in text
+    assert 'ticket_sorter_stage_seconds_bucket{stage="ocr",le="+Inf"} 2' in text
+    assert "ticket_sorter_ocr_cache_misses_total 1" in text
+
+    json_path, prom_path = metrics.write_run_reports(tmp_path, registry, name="report.json")
+    report = json.loads(json_path.read_text())
+    assert report["stages"]["ocr"]["count"] == 2
+    assert prom_path.read_text() == text
@@ -0,0 +1,28 @@
+from utils.ocr_cache import OCRCache
+
+
+def test_cache_round_trip_across_connections(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    key = OCRCache.make_key("abc", "paddleocr", {"rotate": True})
+    OCRCache(path).put(key, {"rotation": 0, "ocr": {"text": "hello"}})
+
+    assert OCRCache(path).get(key) == {"rotation": 0, "ocr": {"text": "hello"}}
+
+
+def test_key_depends_on_engine_and_params():
+    base = OCRCache.make_key("abc", "paddleocr", {"rotate": True})
+    assert base != OCRCache.make_key("abc", "tesseract", {"rotate": True})
+    assert base != OCRCache.make_key("abc", "paddleocr", {"rotate": False})
+    assert base == OCRCache.make_key("abc", "paddleocr", {"rotate": True})
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = OCRCache(tmp_path / "cache.sqlite", max_bytes=250)
+    for name in ("a", "b", "c"):
+        cache.put(name, {"text": "x" * 90})
+    cache.get("a")
+    cache.evict()
+
+    assert cache.total_bytes() <= 250
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
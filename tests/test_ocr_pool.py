@@ -0,0 +1,72 @@
+from processor import ocr_pool
+
+
+def test_lru_cache_evicts_oldest():
+    cache = ocr_pool._LRUCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+    cache["c"] = 3
+    assert "a" in cache
+    assert "b" not in cache
+
+
+def test_worker_pool_streams_in_order():
+    pool = ocr_pool.OCRWorkerPool(2)
+    try:
+        items = (-i for i in range(6))
+        assert list(pool.imap(abs, items, max_in_flight=2)) == [0, 1, 2, 3, 4, 5]
+    finally:
+        pool.shutdown()
+
+
+def _dies_in_worker(n):
+    import multiprocessing
+    import os
+
+    if n == 2 and multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return n * 10
+
+
+def test_broken_pool_falls_back_to_this_process(monkeypatch):
+    pool = ocr_pool.OCRWorkerPool(2)
+    monkeypatch.setattr(ocr_pool, "_pool", pool)
+    try:
+        assert list(pool.imap(_dies_in_worker, iter(range(6)), max_in_flight=2)) == [0, 10, 20, 30, 40, 50]
+        assert pool.broken
+        # Only the pool that broke is dropped; the next caller gets a new one
+        assert ocr_pool._pool is None
+    finally:
+        pool.shutdown()
+
+
+def test_replaced_pool_waits_for_its_last_user(monkeypatch):
+    pool = ocr_pool.OCRWorkerPool(1)
+    shutdowns = []
+    real_shutdown = pool.shutdown
+    monkeypatch.setattr(pool, "shutdown", lambda wait=True: shutdowns.append(wait) or real_shutdown(wait))
+
+    results = pool.imap(abs, iter([-1, -2, -3]), max_in_flight=1)
+    assert next(results) == 1
+    pool.retire()
+    assert shutdowns == []
+    assert list(results) == [2, 3]
+    assert shutdowns == [False]
+
+
+def test_workers_check_templates_once_per_file(monkeypatch):
+    from processor import layouts, template_bank
+
+    scans = []
+    monkeypatch.setattr(ocr_pool, "_worker_file", None)
+    monkeypatch.setattr(layouts, "load_layouts", lambda template_dir, rescan=True: scans.append(("layouts", rescan)))
+    monkeypatch.setattr(template_bank, "load_template_bank",
+                        lambda template_dir, cache_path=None, rescan=True: scans.append(("templates", rescan)))
+    config = {"template_dir": "templates", "use_template_fallback": True}
+
+    for filepath in ("a.pdf", "a.pdf", "b.pdf"):
+        ocr_pool._templates_for(config, filepath)
+
+    assert [rescan for kind, rescan in scans if kind == "templates"] == [True, False, True]
+    assert [rescan for kind, rescan in scans if kind == "layouts"] == [True, False, True]
@@ -0,0 +1,82 @@
+import sys
+import threading
+import types
+
+from utils import ocr_tesseract
+
+
+class _FakeAPI:
+    created = []
+
+    def __init__(self, lang, psm):
+        self.lang, self.psm = lang, psm
+        _FakeAPI.created.append(self)
+
+    def SetImage(self, img):
+        self.image = img
+
+    def Clear(self):
+        pass
+
+    def GetUTF8Text(self):
+        return f"text:{self.image}"
+
+    def DetectOrientationScript(self):
+        return {"orient_deg": 90}
+
+    def End(self):
+        pass
+
+
+def _install_fake(monkeypatch):
+    fake = types.SimpleNamespace(
+        PyTessBaseAPI=_FakeAPI,
+        PSM=types.SimpleNamespace(AUTO=3, SINGLE_LINE=7, OSD_ONLY=0),
+    )
+    monkeypatch.setitem(sys.modules, "tesserocr", fake)
+    monkeypatch.setattr(ocr_tesseract, "has_tesserocr", lambda: True)
+    monkeypatch.setattr(ocr_tesseract, "_local", threading.local())
+    _FakeAPI.created = []
+
+
+def test_api_handles_are_reused_per_thread(monkeypatch):
+    _install_fake(monkeypatch)
+
+    assert ocr_tesseract.image_to_string("page1") == "text:page1"
+    assert ocr_tesseract.image_to_string("page2") == "text:page2"
+    assert len(_FakeAPI.created) == 1
+
+    worker = threading.Thread(target=ocr_tesseract.image_to_string, args=("page3",))
+    worker.start()
+    worker.join()
+    assert len(_FakeAPI.created) == 2
+
+
+def test_detect_rotation_uses_osd_handle(monkeypatch):
+    _install_fake(monkeypatch)
+
+    assert ocr_tesseract.detect_rotation("page") == 270
+    assert _FakeAPI.created[0].lang == "osd"
+
+
+def test_tesserocr_import_failure_off_the_main_thread_falls_back(monkeypatch):
+    class _RaisingFinder:
+        def find_spec(self, name, path=None, target=None):
+            if name == "tesserocr":
+                raise ValueError("signal only works in main thread")
+            return None
+
+    monkeypatch.delitem(sys.modules, "tesserocr", raising=False)
+    monkeypatch.setattr(sys, "meta_path", [_RaisingFinder()] + sys.meta_path)
+    monkeypatch.setattr(ocr_tesseract, "has_tesserocr", lambda: not ocr_tesseract._tesserocr_broken)
+    monkeypatch.setattr(ocr_tesseract, "_tesserocr_broken", False)
+    monkeypatch.setattr(ocr_tesseract, "_local", threading.local())
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(ocr_tesseract._get_api("osd")))
+    worker.start()
+    worker.join()
+
+    assert results == [None]
+    assert ocr_tesseract._tesserocr_broken
+    assert ocr_tesseract._get_api("text") is None
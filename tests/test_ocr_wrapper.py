@@ -0,0 +1,138 @@
+import sys
+import types
+
+from utils import ocr_wrapper
+
+
+def _fake_engine_module(calls):
+    module = types.ModuleType("fake_ocr_engine")
+    module.is_available = lambda: True
+    module.load = lambda: calls.append("load")
+    module.read_text = lambda image, **kwargs: {"engine": "fake", "text": image, "confidence": 1.0, "lines": []}
+    return module
+
+
+def test_engine_is_loaded_once_on_first_use(monkeypatch):
+    calls = []
+    monkeypatch.setitem(sys.modules, "fake_ocr_engine", _fake_engine_module(calls))
+    monkeypatch.setitem(ocr_wrapper._ENGINE_MODULES, "fake", "fake_ocr_engine")
+    monkeypatch.setattr(ocr_wrapper, "_loaded", {})
+
+    assert calls == []
+    assert ocr_wrapper.read_text("hello", engine="fake")["text"] == "hello"
+    ocr_wrapper.read_text("again", engine="FAKE")
+    assert calls == ["load"]
+
+
+def test_unknown_engine_raises():
+    try:
+        ocr_wrapper.read_text("x", engine="nope")
+    except ValueError as e:
+        assert "nope" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_engine_aliases_resolve():
+    assert "paddleocr" in ocr_wrapper.registered_engines()
+    assert ocr_wrapper.resolve_engine_name("Paddle") == "paddleocr"
+    assert ocr_wrapper.resolve_engine_name(None) == ocr_wrapper.DEFAULT_ENGINE
+
+
+def test_paddle_reports_line_confidences(monkeypatch):
+    from PIL import Image
+    from utils import ocr_paddle
+
+    class FakePaddle:
+        def ocr(self, image, cls=True):
+            return [[
+                [[[0, 0], [50, 0], [50, 10], [0, 10]], ("BIG CITY", 0.9)],
+                [[[0, 20], [40, 20], [40, 30], [0, 30]], ("A123456", 0.5)],
+            ]]
+
+    monkeypatch.setattr(ocr_paddle, "load", lambda: FakePaddle())
+    result = ocr_paddle.read_text_paddle(Image.new("RGB", (60, 40), "white"))
+
+    assert [line["confidence"] for line in result["lines"]] == [0.9, 0.5]
+    assert result["confidence"] == 0.7
+
+
+def test_paddle_batch_recognizes_all_pages_together(monkeypatch):
+    import numpy as np
+    from PIL import Image
+    from utils import ocr_paddle
+
+    recognizer_calls = []
+
+    class FakePaddle:
+        use_angle_cls = False
+        drop_score = 0.5
+
+        def text_detector(self, image):
+            h = image.shape[0]
+            return np.array([[[0, h - 10], [20, h - 10], [20, h], [0, h]],
+                             [[0, 0], [30, 0], [30, 10], [0, 10]]], dtype=np.float32), 0.0
+
+        def text_recognizer(self, crops):
+            recognizer_calls.append(len(crops))
+            return [(f"line{n}", 0.9 if n != 3 else 0.1) for n in range(len(crops))], 0.0
+
+    monkeypatch.setattr(ocr_paddle, "load", lambda **options: FakePaddle())
+    images = [Image.new("RGB", (40, 40), "white"), Image.new("RGB", (40, 60), "white")]
+    results = ocr_paddle.read_text_batch(images)
+
+    assert recognizer_calls == [4]
+    assert [line["text"] for line in results[0]["lines"]] == ["line0", "line1"]
+    assert results[0]["lines"][0]["box"] == (0, 0, 30, 10)
+    assert [line["text"] for line in results[1]["lines"]] == ["line2"]
+
+
+def test_read_text_batch_falls_back_to_single_calls(monkeypatch):
+    calls = []
+    monkeypatch.setitem(sys.modules, "fake_ocr_engine", _fake_engine_module(calls))
+    monkeypatch.setitem(ocr_wrapper._ENGINE_MODULES, "fake", "fake_ocr_engine")
+    monkeypatch.setattr(ocr_wrapper, "_loaded", {})
+
+    assert [r["text"] for r in ocr_wrapper.read_text_batch(["a", "b"], engine="fake")] == ["a", "b"]
+
+
+def test_recognize_text_falls_back_to_read_text(monkeypatch):
+    calls = []
+    monkeypatch.setitem(sys.modules, "fake_ocr_engine", _fake_engine_module(calls))
+    monkeypatch.setitem(ocr_wrapper._ENGINE_MODULES, "fake", "fake_ocr_engine")
+    monkeypatch.setattr(ocr_wrapper, "_loaded", {})
+
+    assert ocr_wrapper.recognize_text(["No. 778812"], engine="fake") == [{"text": "No. 778812", "confidence": 1.0}]
+
+
+def test_paddle_recognize_skips_detection(monkeypatch):
+    from PIL import Image
+    from utils import ocr_paddle
+
+    class FakePaddle:
+        def text_detector(self, image):
+            raise AssertionError("detection ran")
+
+        def text_recognizer(self, crops):
+            return [("No. 778812", 0.93) for _ in crops], 0.0
+
+    monkeypatch.setattr(ocr_paddle, "load", lambda **options: FakePaddle())
+    results = ocr_paddle.recognize([Image.new("RGB", (80, 20), "white")] * 2)
+
+    assert results == [{"text": "No. 778812", "confidence": 0.93}] * 2
+
+
+def test_engine_options_reach_the_model_for_every_call(monkeypatch):
+    loads = []
+    module = _fake_engine_module([])
+    module.load = lambda **options: loads.append(options)
+    monkeypatch.setitem(sys.modules, "fake_ocr_engine", module)
+    monkeypatch.setitem(ocr_wrapper._ENGINE_MODULES, "fake", "fake_ocr_engine")
+    monkeypatch.setattr(ocr_wrapper, "_loaded", {})
+
+    ocr_wrapper.read_text("a", engine="fake", rec_batch_num=16)
+    ocr_wrapper.read_text_batch(["b"], engine="fake", rec_batch_num=16)
+    ocr_wrapper.recognize_text(["c"], engine="fake", rec_batch_num=16)
+
+    # No model is ever built without the configured options
+    assert loads and all(options == {"rec_batch_num": 16} for options in loads)
@@ -0,0 +1,44 @@
+from PIL import Image, ImageDraw
+
+from processor import image_ops
+from processor.image_ops import apply_rotation
+from processor.page_ocr import PageOCR
+
+
+def _lines(box, angle, count=4):
+    return [{"text": f"line {n}", "box": box, "confidence": 0.9, "angle": angle} for n in range(count)]
+
+
+def test_orientation_from_line_angles_and_shape():
+    assert PageOCR(lines=_lines((10, 10, 200, 30), 0), size=(300, 400)).orientation() == 0
+    assert PageOCR(lines=_lines((10, 10, 200, 30), 180), size=(300, 400)).orientation() == 180
+    assert PageOCR(lines=_lines((10, 10, 30, 200), 0), size=(300, 400)).orientation() == 270
+    assert PageOCR(lines=_lines((10, 10, 30, 200), 180), size=(300, 400)).orientation() == 90
+    # No angle information (other engines) or too few lines: cannot tell
+    assert PageOCR(lines=[{"text": "x", "box": (10, 10, 200, 30)}] * 5, size=(300, 400)).orientation() is None
+    assert PageOCR(lines=_lines((10, 10, 200, 30), 180, count=2), size=(300, 400)).orientation() is None
+
+
+def test_rotated_boxes_follow_the_pixels():
+    page = Image.new("L", (300, 400), 255)
+    ImageDraw.Draw(page).rectangle((20, 50, 119, 69), fill=0)
+    ocr = PageOCR(lines=[{"text": "ink", "box": (20, 50, 119, 69), "angle": 180}], size=page.size)
+
+    for rotation in (90, 180, 270):
+        turned = apply_rotation(page, rotation)
+        moved = ocr.rotated(rotation)
+        x0, y0, x1, y1 = moved.lines[0]["box"]
+        assert moved.size == turned.size
+        assert moved.lines[0]["angle"] == 0
+        ink = Image.eval(turned, lambda v: 255 - v).getbbox()
+        assert all(abs(a - b) <= 1 for a, b in zip(ink, (x0, y0, x1 + 1, y1 + 1))), (rotation, ink, (x0, y0, x1, y1))
+
+
+def test_detect_rotation_runs_on_a_thumbnail(monkeypatch):
+    from utils import ocr_tesseract
+
+    seen = []
+    monkeypatch.setattr(ocr_tesseract, "detect_rotation", lambda img: seen.append(img.size) or 90)
+
+    assert image_ops.detect_rotation(Image.new("L", (2550, 3300), 255)) == 90
+    assert seen == [(1275, 1650)]
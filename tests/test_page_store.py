@@ -0,0 +1,69 @@
+import pickle
+
+from PIL import Image
+
+from processor import file_handler
+from processor.page_store import PageHandle, PageStore, as_image
+
+
+def test_page_store_round_trips_and_cleans_up(tmp_path):
+    rgb = Image.new('RGB', (40, 30), (10, 20, 30))
+    gray = Image.new('L', (20, 10), 128)
+    palette = rgb.convert('P')
+
+    with PageStore(tmp_path / 'store') as store:
+        handles = [store.put(img) for img in (rgb, gray, palette)]
+        assert all(isinstance(h, PageHandle) for h in handles)
+        assert handles[0].size == (40, 30) and handles[1].mode == 'L'
+        assert store.put(handles[0]) is handles[0]
+
+        restored = [as_image(pickle.loads(pickle.dumps(h))) for h in handles]
+        assert restored[0].tobytes() == rgb.tobytes()
+        assert restored[1].mode == 'L' and restored[1].tobytes() == gray.tobytes()
+        assert restored[2].mode == 'P' and restored[2].size == palette.size
+        directory = store.directory
+
+    assert not directory.exists()
+
+
+def test_png_store(tmp_path):
+    img = Image.new('RGB', (8, 8), 'red')
+    with PageStore(tmp_path, fmt='png') as store:
+        handle = store.put(img)
+        assert handle.path.endswith('.png')
+        assert as_image(handle).tobytes() == img.tobytes()
+
+
+def test_export_tif_streams_page_handles(tmp_path):
+    source = tmp_path / "24-105_2025-04-18_Flexbase_ZoneE_SouthFill.pdf"
+    pages = [Image.new('L', (60, 80), shade) for shade in (0, 128, 255)]
+
+    with PageStore(tmp_path / 'store') as store:
+        outputs = file_handler.export_grouped_output(
+            {"Alpha": [store.put(p) for p in pages]}, "tif", {}, source, {})
+
+    with Image.open(outputs[0]) as tif:
+        assert tif.n_frames == 3
+        tif.seek(1)
+        assert tif.getpixel((0, 0)) == 128
+
+
+def test_renders_of_consecutive_pages_share_a_poppler_call(monkeypatch):
+    import pdf2image
+    from processor.page_store import PageRender, open_renders
+
+    calls = []
+
+    def fake_convert(path, dpi, poppler_path, first_page, last_page):
+        calls.append((first_page, last_page))
+        return [Image.new("L", (30, 20), n) for n in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(pdf2image, "convert_from_path", fake_convert)
+    renders = [PageRender("scan.pdf", 2, 300), PageRender("scan.pdf", 3, 300, rotation=90),
+               PageRender("scan.pdf", 6, 300)]
+
+    images = open_renders(renders)
+
+    assert calls == [(3, 4), (7, 7)]
+    assert [img.getpixel((0, 0)) for img in images] == [3, 4, 7]
+    assert images[1].size == (20, 30)
@@ -0,0 +1,88 @@
+import pandas as pd
+
+from utils.run_log import RunLogStore, export_ocr_text, export_workbooks
+
+ROW = {"Filename": "a.pdf", "Page": 1, "Vendor": "acme", "Ticket Number": "123", "Rotated": True, "Grayscale": False}
+
+
+def test_append_and_export_workbook(tmp_path):
+    store = RunLogStore(tmp_path)
+    store.append_trucking_rows("24-105", "250101", [ROW])
+    store.append_trucking_rows("24-105", "250101", [dict(ROW, Page=2)])
+
+    assert store.pending_exports() == [("24-105", "250101")]
+    path = store.export_workbook("24-105", "250101")
+    df = pd.read_excel(path)
+    assert list(df["Page"]) == [1, 2]
+    assert bool(df["Rotated"][0]) is True
+    assert store.pending_exports() == []
+
+
+def test_export_workbooks_only_rebuilds_changed_jobs(tmp_path):
+    store = RunLogStore(tmp_path)
+    store.append_trucking_rows("job", "d1", [ROW])
+    store.append_trucking_rows("job", "d2", [ROW])
+    store.export_pending()
+
+    store.append_trucking_rows("job", "d2", [dict(ROW, Page=3)])
+    assert store.pending_exports() == [("job", "d2")]
+    assert export_workbooks(tmp_path, force=True)
+    assert store.pending_exports() == []
+
+
+def test_legacy_workbook_rows_are_imported_once(tmp_path):
+    store = RunLogStore(tmp_path)
+    pd.DataFrame([dict(ROW, Page=9)]).to_excel(store.workbook_path("job", "d1"), index=False)
+
+    store.append_trucking_rows("job", "d1", [ROW])
+    store.append_trucking_rows("job", "d1", [dict(ROW, Page=2)])
+
+    assert [row["Page"] for row in store.trucking_rows("job", "d1")] == [9, 1, 2]
+
+
+def test_export_workbooks_without_journal(tmp_path):
+    assert export_workbooks(tmp_path) == []
+
+
+def test_forget_file_drops_rows_without_reimporting_workbook(tmp_path):
+    store = RunLogStore(tmp_path)
+    pd.DataFrame([ROW]).to_excel(store.workbook_path("job", "d1"), index=False)
+    store.append_trucking_rows("job", "d1", [dict(ROW, Page=2)])
+
+    store.forget_file("a.pdf")
+    store.append_trucking_rows("job", "d1", [dict(ROW, Page=3)])
+
+    assert [row["Page"] for row in store.trucking_rows("job", "d1")] == [3]
+
+
+def test_export_ocr_text_writes_the_batch_csv(tmp_path):
+    import time
+
+    log_dir = tmp_path / "logs"
+    assert export_ocr_text(log_dir) is None
+
+    store = RunLogStore(log_dir)
+    store.append_ocr_text([{"Filename": "OLD", "Page": 1, "Vendor": "acme", "OCR Text": "old"}])
+    started = time.time()
+    store.append_ocr_text([{"Filename": "NEW", "Page": 1, "Vendor": "acme", "OCR Text": "new"}])
+
+    path = export_ocr_text(log_dir, since=started)
+
+    assert path.parent == tmp_path and path.name.startswith("ocr_text_log_")
+    assert list(pd.read_csv(path)["Filename"]) == ["NEW"]
+    assert export_ocr_text(log_dir, since=time.time() + 1) is None
+
+
+def test_failed_forget_file_rolls_back(tmp_path):
+    import pytest
+
+    store = RunLogStore(tmp_path)
+    store.append_trucking_rows("job", "d1", [ROW])
+    store._conn.execute("DROP TABLE ocr_text")
+
+    with pytest.raises(Exception):
+        store.forget_file("a.pdf")
+
+    # The trucking-log delete was rolled back and the connection takes new writes
+    store.append_trucking_rows("job", "d1", [dict(ROW, Page=2)])
+    assert [row["Page"] for row in store.trucking_rows("job", "d1")] == [1, 2]
@@ -8,13 +8,13 @@ def test_run_single_processes_pages(monkeypatch, tmp_path):
 
     processed = {}
 
-    def fake_process_pages(pages, filepath, config, suffix=""):
+    def fake_process_pages(pages, filepath, config, suffix="", ocr_log=None, duplex=False):
         processed['pages'] = list(pages)
         processed['filepath'] = filepath
+        ocr_log.append((tmp_file.name, 1, 'VendorA', 'dummy'))
         return ['out.pdf']
 
     monkeypatch.setattr(run, 'process_pages', fake_process_pages)
-    monkeypatch.setattr(run, 'read_text', lambda image=None: {'text': 'dummy', 'confidence': 1.0})
 
     config = {
         'poppler_path': '',
@@ -25,4 +25,4 @@ def test_run_single_processes_pages(monkeypatch, tmp_path):
     logs = run._run_single(tmp_file, config)
 
     assert processed['pages'], 'process_pages should receive pages'
-    assert logs == [(tmp_file.name, 1, config.get('ocr_engine', 'tesseract'), 'dummy')]
+    assert logs == [(tmp_file.name, 1, 'VendorA', 'dummy')]
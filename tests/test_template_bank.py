@@ -0,0 +1,62 @@
+import os
+
+import cv2
+import numpy as np
+
+from processor.image_ops import run_template_matching
+from processor.template_bank import TemplateBank
+
+
+def _logo(seed, shape=(60, 120)):
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (shape[0] // 6, shape[1] // 6), dtype=np.uint8)
+    return cv2.resize(small, (shape[1], shape[0]), interpolation=cv2.INTER_NEAREST)
+
+
+def _write_templates(root):
+    for vendor, seed in (("Alpha", 1), ("Beta", 2)):
+        (root / vendor).mkdir()
+        cv2.imwrite(str(root / vendor / f"{vendor}.png"), _logo(seed))
+
+
+def test_coarse_to_fine_finds_template_location(tmp_path):
+    _write_templates(tmp_path)
+    bank = TemplateBank.load(tmp_path)
+    page = np.full((400, 600), 255, np.uint8)
+    page[123:183, 251:371] = _logo(2)
+
+    vendor, score, location, _ = bank.match(page)
+
+    assert vendor == "beta"
+    assert score > 0.99
+    assert location == (251, 123)
+    assert run_template_matching(page, bank, threshold=0.85, preview=False) == ("beta", 1.0)
+
+
+def test_pyramid_cache_is_reused_and_invalidated(tmp_path):
+    template_dir = tmp_path / "templates"
+    template_dir.mkdir()
+    _write_templates(template_dir)
+    cache = tmp_path / "bank.npz"
+
+    TemplateBank.load(template_dir, cache)
+    assert cache.exists()
+    reloaded = TemplateBank.load(template_dir, cache)
+    assert sorted(reloaded.vendors()) == ["alpha", "beta"]
+
+    changed = template_dir / "Alpha" / "Alpha.png"
+    cv2.imwrite(str(changed), _logo(3))
+    os.utime(changed, (1, 1))
+    bank = TemplateBank.load(template_dir, cache)
+    alpha = next(e for e in bank.entries if e["vendor"] == "alpha")
+    assert np.array_equal(alpha["levels"][1.0], _logo(3))
+
+
+def test_preview_skips_filesystem_when_disabled(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    page = np.full((200, 300), 255, np.uint8)
+    page[10:70, 10:130] = _logo(1)
+
+    run_template_matching(page, {"alpha": [_logo(1)]}, preview=False)
+
+    assert not (tmp_path / "match_previews").exists()
@@ -0,0 +1,40 @@
+from rapidfuzz.fuzz import partial_ratio
+
+from processor.vendor_matcher import KeywordIndex, get_keyword_index, normalize_text
+
+OCR_CONFIG = {
+    "BigCity": {"vendor_type": "trucking", "keywords": ["Big City", "bigcitycrushed"]},
+    "Lindamood": {"vendor_type": "trucking", "keywords": ["lindamood"]},
+    "Vulcan": {"vendor_type": "materials", "keywords": ["vulcan materials"]},
+    "Misc": {"vendor_type": "other", "keywords": ["scale house"]},
+}
+
+
+def test_exact_substring_hit_short_circuits(monkeypatch):
+    index = KeywordIndex(OCR_CONFIG)
+    monkeypatch.setattr(index, "score_all", lambda text: (_ for _ in ()).throw(AssertionError("fuzzy scored")))
+
+    assert index.match(normalize_text("BIG CITY Crushed Concrete"), 80) == ("BigCity", 100.0, "Big City")
+
+
+def test_fuzzy_scores_match_partial_ratio():
+    index = KeywordIndex(OCR_CONFIG)
+    text = normalize_text("vulcan materia1s co")
+    scores = index.score_all(text)
+
+    expected = [partial_ratio(kw, text) for kw in index.clean_keywords]
+    assert [round(float(s), 3) for s in scores] == [round(e, 3) for e in expected]
+    assert index.match(text, 80)[0] == "Vulcan"
+
+
+def test_groups_are_tried_in_order_and_exclusions_apply():
+    index = KeywordIndex(OCR_CONFIG, exclude_keywords=["scalehouse"])
+    assert index.match(normalize_text("scale house"), 80) is None
+    log_row = {}
+    assert index.match(normalize_text("lindamood vulcan materials"), 80, log_row)[0] == "Lindamood"
+    assert log_row["match_1_company"] == "Lindamood"
+
+
+def test_index_is_built_once_per_sheet():
+    assert get_keyword_index(OCR_CONFIG) is get_keyword_index(OCR_CONFIG)
+    assert get_keyword_index(OCR_CONFIG) is not get_keyword_index(dict(OCR_CONFIG))
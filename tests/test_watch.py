@@ -0,0 +1,48 @@
+import threading
+
+from processor import watch
+
+
+def test_scan_waits_for_file_to_settle(tmp_path):
+    watcher = watch.FolderWatcher([tmp_path], {"watch_settle_seconds": 5}, process_file=lambda f, c: [])
+    scan = tmp_path / "ticket.pdf"
+    scan.write_bytes(b"partial")
+
+    assert watcher.scan(now=0) == []
+    scan.write_bytes(b"partial, now complete")
+    assert watcher.scan(now=1) == []
+    assert watcher.scan(now=3) == []
+    assert watcher.scan(now=7) == [scan]
+    # Queued once; not offered again while its content is unchanged
+    assert watcher.scan(now=8) == []
+
+
+def test_scan_ignores_other_files(tmp_path):
+    watcher = watch.FolderWatcher([tmp_path], {"watch_settle_seconds": 0}, process_file=lambda f, c: [])
+    (tmp_path / "notes.txt").write_text("x")
+    (tmp_path / "~$ticket.pdf").write_bytes(b"lock")
+    (tmp_path / "empty.tif").write_bytes(b"")
+    (tmp_path / "processed").mkdir()
+
+    watcher.scan(now=0)
+    assert watcher.scan(now=1) == []
+
+
+def test_run_processes_dropped_files(tmp_path):
+    stop = threading.Event()
+    processed = []
+
+    def process_file(file, config):
+        processed.append(file.name)
+        stop.set()
+        return []
+
+    (tmp_path / "ticket.pdf").write_bytes(b"%PDF-1.4 ticket")
+    config = {"watch_poll_seconds": 0.01, "watch_settle_seconds": 0, "num_workers": 1}
+    watcher = watch.FolderWatcher([tmp_path], config, process_file=process_file)
+    thread = threading.Thread(target=watcher.run, args=(stop,))
+    thread.start()
+    thread.join(timeout=10)
+
+    assert processed == ["ticket.pdf"]
+    assert watcher.scan() == []
@@ -0,0 +1,79 @@
+import hashlib
+
+import numpy as np
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+STRIP_BYTES = 4 * 1024 * 1024
+PERCEPTUAL_HASH_SIZE = 16
+
+
+def _new_hasher():
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    # blake2b is the fastest hash in the standard library when xxhash is not installed
+    return hashlib.blake2b(digest_size=16)
+
+
+def hash_pixels(img) -> str:
+    """Hash the raw pixel buffer of a PIL image or numpy array plus its size/mode header.
+
+    numpy arrays are hashed in place through a memoryview. PIL images are hashed
+    in horizontal strips so the full page buffer is never duplicated.
+    """
+    hasher = _new_hasher()
+    if isinstance(img, np.ndarray):
+        arr = np.ascontiguousarray(img)
+        hasher.update(f"ndarray:{arr.dtype.str}:{arr.shape}".encode())
+        hasher.update(memoryview(arr).cast("B"))
+        return hasher.hexdigest()
+
+    w, h = img.size
+    hasher.update(f"{img.mode}:{w}x{h}".encode())
+    row_bytes = max(1, len(img.getbands()) * w)
+    rows = max(1, STRIP_BYTES // row_bytes)
+    for top in range(0, h, rows):
+        hasher.update(img.crop((0, top, w, min(top + rows, h))).tobytes())
+    return hasher.hexdigest()
+
+
+def hash_file(path, chunk_size=STRIP_BYTES) -> str:
+    """Hash a file's contents in chunks (used to detect changed batch inputs)."""
+    hasher = _new_hasher()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def perceptual_hash(img, hash_size=PERCEPTUAL_HASH_SIZE) -> str:
+    """Difference hash (dHash) that stays stable across near-identical rescans.
+
+    The page is reduced to a ``(hash_size + 1) x hash_size`` grayscale thumbnail
+    and each bit records whether a pixel is brighter than its right neighbour.
+    """
+    from PIL import Image
+
+    if isinstance(img, np.ndarray):
+        img = Image.fromarray(img)
+    thumb = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = np.asarray(thumb, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return "p" + np.packbits(bits).tobytes().hex()
+
+
+def hash_distance(a: str, b: str) -> int:
+    """Number of differing bits between two :func:`perceptual_hash` values."""
+    return bin(int(a.lstrip("p"), 16) ^ int(b.lstrip("p"), 16)).count("1")
+
+
+def image_digest(img) -> str:
+    """Page hash used for OCR cache keys: the exact raw-pixel hash.
+
+    Never a perceptual hash: two tickets printed on the same vendor's form
+    share a dHash, and a hit would hand one page another's ticket number.
+    """
+    return hash_pixels(img)
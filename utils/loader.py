@@ -3,7 +3,6 @@ import os
 import logging
 from pathlib import Path
 
-import pandas as pd
 import yaml
 from schema import Schema, And, Use, SchemaError
 
@@ -46,10 +45,12 @@ def load_configs(path: str = "configs.yaml"):
 def load_ocr_configs_from_excel(path: str):
     path = _resolve_path(path)
     mtime = os.path.getmtime(path)
-    cached = _ocr_configs_cache.get(path)
+    cached = _ocr_configs_cache.get(str(path))
     if cached and cached.get("mtime") == mtime:
         return cached["configs"]
 
+    import pandas as pd
+
     configs = {}
     try:
         df = pd.read_excel(path, engine="openpyxl")
@@ -92,6 +93,8 @@ def load_ocr_keywords(filepath: str):
         with open(path, "r") as f:
             return json.load(f)
     else:
+        import pandas as pd
+
         keyword_dict = {}
         df = pd.read_excel(path, engine="openpyxl")
         for _, row in df.iterrows():
@@ -0,0 +1,262 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+METRIC_PREFIX = "ticket_sorter"
+# Seconds; roughly log-spaced from cache hits to slow full-page OCR
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MAX_SAMPLES = 10000
+MAX_RECORDS = 50000
+
+_local = threading.local()
+
+
+class MetricsRegistry:
+    """Thread-safe store of stage latencies and counters.
+
+    Every observation carries the current file/page context (see
+    :func:`metrics_context`). Latencies feed a cumulative histogram per stage
+    plus a bounded window of recent samples for percentiles; per-page records
+    keep the breakdown of where each page's time went.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self._histograms = {}
+            self._samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+            self._counters = defaultdict(float)
+            self._records = deque(maxlen=MAX_RECORDS)
+
+    def _histogram(self, stage):
+        hist = self._histograms.get(stage)
+        if hist is None:
+            hist = self._histograms[stage] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        return hist
+
+    def observe(self, stage, seconds, file=None, page=None):
+        with self._lock:
+            hist = self._histogram(stage)
+            for idx, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    hist["buckets"][idx] += 1
+            hist["sum"] += seconds
+            hist["count"] += 1
+            self._samples[stage].append(seconds)
+            self._records.append({"stage": stage, "seconds": seconds, "file": file, "page": page})
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def snapshot(self):
+        """Plain-data copy of everything recorded, for sending across processes or merging."""
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "histograms": {k: {"buckets": list(v["buckets"]), "sum": v["sum"], "count": v["count"]}
+                               for k, v in self._histograms.items()},
+                "samples": {k: list(v) for k, v in self._samples.items()},
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                "records": list(self._records),
+            }
+
+    def merge(self, snapshot):
+        """Add a :meth:`snapshot` (e.g. from a worker process) into this registry."""
+        if not snapshot:
+            return
+        if tuple(snapshot["buckets"]) != self.buckets:
+            raise ValueError("Cannot merge metrics recorded with different histogram buckets")
+        with self._lock:
+            for stage, other in snapshot["histograms"].items():
+                hist = self._histogram(stage)
+                hist["buckets"] = [a + b for a, b in zip(hist["buckets"], other["buckets"])]
+                hist["sum"] += other["sum"]
+                hist["count"] += other["count"]
+            for stage, samples in snapshot["samples"].items():
+                self._samples[stage].extend(samples)
+            for name, labels, value in snapshot["counters"]:
+                self._counters[(name, tuple(tuple(label) for label in labels))] += value
+            self._records.extend(snapshot["records"])
+
+    def stage_summary(self):
+        """Per-stage count, total and p50/p90/p99 (seconds) over the recent sample window."""
+        with self._lock:
+            histograms = {k: dict(v) for k, v in self._histograms.items()}
+            samples = {k: np.array(v) for k, v in self._samples.items()}
+        summary = {}
+        for stage, hist in sorted(histograms.items()):
+            values = samples.get(stage)
+            if values is None or not len(values):
+                continue
+            summary[stage] = {
+                "count": hist["count"],
+                "total_s": round(hist["sum"], 4),
+                "mean_s": round(hist["sum"] / hist["count"], 4),
+                "p50_s": round(float(np.percentile(values, 50)), 4),
+                "p90_s": round(float(np.percentile(values, 90)), 4),
+                "p99_s": round(float(np.percentile(values, 99)), 4),
+                "max_s": round(float(values.max()), 4),
+            }
+        return summary
+
+    def page_breakdown(self):
+        """``[{"file", "page", "stages": {stage: seconds}, "total_s"}]`` for every page with records."""
+        with self._lock:
+            records = list(self._records)
+        pages = {}
+        for record in records:
+            if record["page"] is None:
+                continue
+            key = (record["file"], record["page"])
+            entry = pages.setdefault(key, {"file": record["file"], "page": record["page"], "stages": {}})
+            entry["stages"][record["stage"]] = round(entry["stages"].get(record["stage"], 0.0)
+                                                     + record["seconds"], 4)
+        for entry in pages.values():
+            entry["total_s"] = entry["stages"].get("page", round(sum(entry["stages"].values()), 4))
+        return sorted(pages.values(), key=lambda e: (str(e["file"]), e["page"]))
+
+    def counters(self):
+        with self._lock:
+            items = list(self._counters.items())
+        return [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in sorted(items)]
+
+    def report(self):
+        return {
+            "started_at": self.started_at,
+            "finished_at": time.time(),
+            "stages": self.stage_summary(),
+            "counters": self.counters(),
+            "pages": self.page_breakdown(),
+        }
+
+    def write_json_report(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2, default=str), encoding="utf-8")
+        return path
+
+    def prometheus_text(self):
+        lines = []
+        name = f"{METRIC_PREFIX}_stage_seconds"
+        with self._lock:
+            histograms = {k: dict(v) for k, v in self._histograms.items()}
+            counters = sorted(self._counters.items())
+        lines.append(f"# HELP {name} Time spent in each processing stage.")
+        lines.append(f"# TYPE {name} histogram")
+        for stage, hist in sorted(histograms.items()):
+            for bound, count in zip(self.buckets, hist["buckets"]):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {hist["count"]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {hist["sum"]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {hist["count"]}')
+
+        declared = set()
+        for (counter, labels), value in counters:
+            metric = f"{METRIC_PREFIX}_{counter}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            lines.append(f"{metric}{{{label_text}}} {value:g}" if label_text else f"{metric} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write the Prometheus text format (e.g. for the node_exporter textfile collector)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(self.prometheus_text(), encoding="utf-8")
+        tmp_path.replace(path)
+        return path
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics():
+    """The registry observations go to: the innermost :func:`capture_metrics` buffer, else the process one."""
+    stack = getattr(_local, "captures", None)
+    return stack[-1] if stack else _registry
+
+
+def _context():
+    return getattr(_local, "context", {})
+
+
+@contextmanager
+def metrics_context(**context):
+    """Attach ``file``/``page`` context to everything recorded by this thread inside the block."""
+    previous = _context()
+    _local.context = {**previous, **context}
+    try:
+        yield
+    finally:
+        _local.context = previous
+
+
+@contextmanager
+def capture_metrics():
+    """Record this thread's observations into a fresh registry (e.g. to return from a worker)."""
+    registry = MetricsRegistry(_registry.buckets)
+    stack = getattr(_local, "captures", None)
+    if stack is None:
+        stack = _local.captures = []
+    stack.append(registry)
+    try:
+        yield registry
+    finally:
+        stack.pop()
+
+
+def observe(stage, seconds):
+    context = _context()
+    get_metrics().observe(stage, seconds, file=context.get("file"), page=context.get("page"))
+
+
+def increment(name, value=1, **labels):
+    get_metrics().increment(name, value, **labels)
+
+
+@contextmanager
+def stage_timer(stage):
+    """Time a block as ``stage`` in the metrics registry (no log line, unlike ``track_time``)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def write_run_reports(report_dir, registry=None, name=None):
+    """Write ``run_report_<ts>.json`` and ``metrics.prom`` into ``report_dir``; return their paths."""
+    registry = registry or _registry
+    name = name or time.strftime("run_report_%Y%m%d_%H%M%S.json")
+    try:
+        json_path = registry.write_json_report(Path(report_dir) / name)
+        prom_path = registry.write_prometheus(Path(report_dir) / "metrics.prom")
+    except Exception as e:
+        logging.warning(f"⚠️ Failed to write metrics reports to {report_dir}: {e}")
+        return None
+    logging.info(f"📈 Metrics report saved: {json_path}")
+    return json_path, prom_path
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_MAX_MB = 512
+EVICT_EVERY = 50
+CACHE_VERSION = 1
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+class OCRCache:
+    """On-disk, content-addressed OCR cache shared across runs and worker processes.
+
+    Entries live in a SQLite database (WAL mode, so several workers can read and
+    write concurrently) and are evicted least-recently-used once the stored
+    values exceed ``max_bytes``.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_cache_access ON ocr_cache (last_access)")
+
+    @staticmethod
+    def make_key(image_hash, engine, params=None):
+        """Build the cache key from the page hash, the OCR engine and its parameters."""
+        payload = json.dumps(
+            {"v": CACHE_VERSION, "image": image_hash, "engine": engine or "", "params": params or {}},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE ocr_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        data = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            self._puts += 1
+            if self._puts % EVICT_EVERY == 0:
+                self._evict()
+
+    def total_bytes(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_access"):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany("DELETE FROM ocr_cache WHERE key = ?", stale)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        logging.info(f"🧹 Evicted {len(stale)} OCR cache entries")
+
+    def evict(self):
+        with self._lock:
+            self._evict()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_ocr_cache(config):
+    """Return this process's cache for the ``cache_file`` config key, or None if caching is off."""
+    cache_file = config.get("cache_file")
+    if not cache_file:
+        return None
+    from utils.loader import _resolve_path
+
+    path = _resolve_path(cache_file)
+    with _caches_lock:
+        if path not in _caches:
+            try:
+                max_mb = config.get("cache_max_mb", DEFAULT_MAX_MB)
+                _caches[path] = OCRCache(path, max_bytes=int(max_mb * 1024 * 1024))
+            except Exception as e:
+                logging.warning(f"⚠️ OCR cache disabled, could not open {path}: {e}")
+                _caches[path] = None
+        return _caches[path]
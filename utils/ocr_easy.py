@@ -1,19 +1,38 @@
+import importlib.util
 import logging
-from numpy.typing import NDArray
+import threading
 
-try:
-    import easyocr
+from utils.ocr_wrapper import quad_to_box
 
-    _easy_ocr = easyocr.Reader(['en'], gpu=False)
-    logging.info("✅ EasyOCR initialized successfully.")
-except ImportError:
-    _easy_ocr = None
-    logging.warning("⚠️ EasyOCR not installed or failed to initialize.")
+_easy_ocr = None
+_load_lock = threading.Lock()
+
+
+def is_available():
+    """Check whether EasyOCR is installed (does not build the model)."""
+    return importlib.util.find_spec("easyocr") is not None
+
+
+def load(**options):
+    """Build the EasyOCR reader on first use; later calls return the same instance.
+
+    ``options`` are the per-call ``ocr_engine_params``; the reader itself takes none.
+    """
+    global _easy_ocr
+    if _easy_ocr is None:
+        with _load_lock:
+            if _easy_ocr is None:
+                import easyocr
+
+                _easy_ocr = easyocr.Reader(['en'], gpu=False)
+                logging.info("✅ EasyOCR initialized successfully.")
+    return _easy_ocr
 
 
 def is_easy_available():
-    """Check if EasyOCR was successfully initialized."""
-    return _easy_ocr is not None
+    """Check if EasyOCR can be used."""
+    return is_available()
+
 
 
 def read_text_easy(image, **kwargs):
@@ -21,31 +40,55 @@ def read_text_easy(image, **kwargs):
     Perform OCR on a given image using EasyOCR.
 
     Args:
-        image (NDArray or path): Image input.
+        image (NDArray, PIL.Image or path): Image input.
         kwargs: Unused (for compatibility with other backends).
 
     Returns:
-        dict: {'engine': 'easyocr', 'text': ..., 'confidence': ...}
+        dict: {'engine': 'easyocr', 'text': ..., 'confidence': ..., 'lines': [...]}
     """
+    import numpy as np
+
     if not is_easy_available():
         raise RuntimeError("EasyOCR is not available or failed to load.")
 
     try:
-        results = _easy_ocr.readtext(image)
+        if hasattr(image, "convert"):
+            image = np.array(image.convert("RGB"))
+        results = load().readtext(image)
         all_text = []
         confidences = []
+        lines = []
 
-        for (_, text, conf) in results:
+        for (quad, text, conf) in results:
             all_text.append(text)
             confidences.append(conf)
+            lines.append({"text": text, "box": quad_to_box(quad), "confidence": float(conf)})
 
         avg_conf = sum(confidences) / len(confidences) if confidences else 0.0
 
         return {
             "engine": "easyocr",
             "text": "\n".join(all_text),
-            "confidence": avg_conf
+            "confidence": avg_conf,
+            "lines": lines,
         }
     except Exception as e:
         logging.exception("❌ EasyOCR exception:")
         raise RuntimeError(f"EasyOCR failed: {e}")
+
+
+def recognize(images, **kwargs):
+    """Recognition only, each image read as one text region: ``[{"text", "confidence"}]``."""
+    import numpy as np
+
+    if not is_easy_available():
+        raise RuntimeError("EasyOCR is not available or failed to load.")
+    results = []
+    for image in images:
+        found = load().recognize(np.array(image.convert("L")))
+        results.append({"text": " ".join(text for _, text, _ in found),
+                        "confidence": float(np.mean([conf for _, _, conf in found])) if found else 0.0})
+    return results
+
+
+read_text = read_text_easy
@@ -1,50 +1,183 @@
 # PATCHED: utils/ocr_paddle.py
 
+import importlib.util
 import logging
+import threading
 
-import cv2
 import numpy as np
 
-try:
-    from paddleocr import PaddleOCR
-    _paddle_ocr = PaddleOCR(use_angle_cls=True, lang='en')
-    logging.info("✅ PaddleOCR initialized successfully.")
-except ImportError:
-    PaddleOCR = None  # <--- add this to silence inspection warnings
-    _paddle_ocr = None
-    logging.warning("⚠️ PaddleOCR not installed or failed to initialize.")
+from utils.ocr_wrapper import quad_to_box
 
+# One model per set of constructor options (``ocr_engine_params``), e.g.
+# ``{"rec_batch_num": 16, "det_limit_side_len": 1280}``
+_models = {}
+_load_lock = threading.Lock()
+SAME_LINE_PIXELS = 10
 
 
-def read_text_paddle(pil_img, **kwargs):
-    if _paddle_ocr is None:
-        raise RuntimeError("PaddleOCR is not available.")
+def is_available():
+    """Check whether PaddleOCR is installed (does not build the model)."""
+    return importlib.util.find_spec("paddleocr") is not None
+
+
+def load(**options):
+    """Build the PaddleOCR model for ``options`` on first use; later calls return the same instance."""
+    key = tuple(sorted(options.items()))
+    model = _models.get(key)
+    if model is None:
+        with _load_lock:
+            model = _models.get(key)
+            if model is None:
+                from paddleocr import PaddleOCR
+
+                model = _models[key] = PaddleOCR(**{"use_angle_cls": True, "lang": "en", **options})
+                logging.info(f"✅ PaddleOCR initialized successfully{f' with {options}' if options else ''}.")
+    return model
 
-    try:
-        if pil_img.mode != "RGB":
-            pil_img = pil_img.convert("RGB")
 
-        image_np = np.array(pil_img)
-        image_cv = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
+def _to_bgr(pil_img):
+    import cv2
 
-        result = _paddle_ocr.ocr(image_cv, cls=True)
+    if pil_img.mode != "RGB":
+        pil_img = pil_img.convert("RGB")
+    return cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+
+
+def _result(lines):
+    return {
+        "engine": "paddleocr",
+        "text": "\n".join(line["text"] for line in lines),
+        "lines": lines,
+        "confidence": sum(line["confidence"] for line in lines) / len(lines) if lines else 0.0,
+    }
+
+
+def read_text_paddle(pil_img, **kwargs):
+    try:
+        paddle_ocr = load(**kwargs)
+    except ImportError:
+        raise RuntimeError("PaddleOCR is not available.")
+    if _has_stages(paddle_ocr):
+        # Same pipeline as ocr(), but keeps the angle classifier's verdict for every line
+        return read_text_batch([pil_img], **kwargs)[0]
 
-        if not result:
-            return {"engine": "paddleocr", "text": "", "confidence": 0.0}
+    try:
+        result = paddle_ocr.ocr(_to_bgr(pil_img), cls=True)
 
-        all_text = []
+        lines = []
         for block in result or []:
             for line in block or []:
                 if line and len(line) > 1:
-                    text = line[1][0]
-                    all_text.append(text)
-
-        return {
-            "engine": "paddleocr",
-            "text": "\n".join(all_text),
-            "confidence": 1.0  # PaddleOCR doesn't return confidence at line-level in this mode
-        }
+                    text, confidence = line[1][0], float(line[1][1])
+                    lines.append({"text": text, "box": quad_to_box(line[0]), "confidence": confidence})
+        return _result(lines)
 
     except Exception as e:
         logging.exception("❌ PaddleOCR exception occurred")
         raise RuntimeError(f"PaddleOCR failed: {e}")
+
+
+def _sort_boxes(boxes):
+    """Reading order: top to bottom, left to right for boxes on the same line."""
+    boxes = sorted(boxes, key=lambda b: (b[0][1], b[0][0]))
+    for i in range(1, len(boxes)):
+        j = i
+        while j > 0 and abs(boxes[j][0][1] - boxes[j - 1][0][1]) < SAME_LINE_PIXELS \
+                and boxes[j][0][0] < boxes[j - 1][0][0]:
+            boxes[j], boxes[j - 1] = boxes[j - 1], boxes[j]
+            j -= 1
+    return boxes
+
+
+def _crop_box(image, points):
+    """Perspective-correct crop of one detected text box (vertical text is turned upright)."""
+    import cv2
+
+    points = np.asarray(points, dtype=np.float32)
+    width = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+    height = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+    target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    matrix = cv2.getPerspectiveTransform(points, target)
+    crop = cv2.warpPerspective(image, matrix, (max(width, 1), max(height, 1)), borderMode=cv2.BORDER_REPLICATE,
+                               flags=cv2.INTER_CUBIC)
+    if crop.shape[0] >= crop.shape[1] * 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+
+def _has_stages(paddle_ocr):
+    return getattr(paddle_ocr, "text_detector", None) is not None \
+        and getattr(paddle_ocr, "text_recognizer", None) is not None
+
+
+def read_text_batch(pil_images, **kwargs):
+    """OCR several images at once; returns one :func:`read_text_paddle` result per image.
+
+    Text boxes are detected image by image (detection runs on the whole
+    image), then the boxes from every image go through the angle classifier
+    and the recognizer together, which batch them ``cls_batch_num`` /
+    ``rec_batch_num`` at a time instead of a few boxes per call.
+    """
+    try:
+        paddle_ocr = load(**kwargs)
+    except ImportError:
+        raise RuntimeError("PaddleOCR is not available.")
+
+    if not _has_stages(paddle_ocr):
+        # Not the PaddleOCR 2.x pipeline; no access to the separate stages
+        return [read_text_paddle(img, **kwargs) for img in pil_images]
+    detector, recognizer = paddle_ocr.text_detector, paddle_ocr.text_recognizer
+
+    try:
+        crops, owners, boxes = [], [], []
+        for n, pil_img in enumerate(pil_images):
+            image = _to_bgr(pil_img)
+            dt_boxes, _ = detector(image)
+            if dt_boxes is None:
+                continue
+            for box in _sort_boxes(list(dt_boxes)):
+                crops.append(_crop_box(image, box))
+                owners.append(n)
+                boxes.append(box)
+
+        angles = [None] * len(crops)
+        if crops and getattr(paddle_ocr, "use_angle_cls", False):
+            crops, cls_res, _ = paddle_ocr.text_classifier(crops)
+            # "180" means the crop was upside down (and has been flipped for recognition)
+            angles = [int(label) for label, _ in cls_res]
+        rec_res, _ = recognizer(crops) if crops else ([], 0)
+
+        drop_score = getattr(paddle_ocr, "drop_score", 0.5)
+        lines = [[] for _ in pil_images]
+        for owner, box, angle, (text, confidence) in zip(owners, boxes, angles, rec_res):
+            if confidence >= drop_score:
+                line = {"text": text, "box": quad_to_box(box), "confidence": float(confidence)}
+                if angle is not None:
+                    line["angle"] = angle
+                lines[owner].append(line)
+        return [_result(page_lines) for page_lines in lines]
+
+    except Exception as e:
+        logging.exception("❌ PaddleOCR batch exception occurred")
+        raise RuntimeError(f"PaddleOCR failed: {e}")
+
+
+def recognize(pil_images, **kwargs):
+    """Text recognition only (no detection): one ``{"text", "confidence"}`` per image of a single text line."""
+    try:
+        paddle_ocr = load(**kwargs)
+    except ImportError:
+        raise RuntimeError("PaddleOCR is not available.")
+    try:
+        images = [_to_bgr(img) for img in pil_images]
+        if _has_stages(paddle_ocr):
+            rec_res, _ = paddle_ocr.text_recognizer(images) if images else ([], 0)
+        else:
+            rec_res = [(paddle_ocr.ocr(image, det=False, cls=False) or [[("", 0.0)]])[0][0] for image in images]
+        return [{"text": text, "confidence": float(confidence)} for text, confidence in rec_res]
+    except Exception as e:
+        logging.exception("❌ PaddleOCR recognition exception occurred")
+        raise RuntimeError(f"PaddleOCR failed: {e}")
+
+
+read_text = read_text_paddle
@@ -0,0 +1,230 @@
+import importlib.util
+import logging
+import re
+import shutil
+import threading
+
+# Each thread (one per pool worker) keeps its own initialized Tesseract API handles.
+# Handles are not thread-safe, so they are never shared.
+_local = threading.local()
+_tesserocr_broken = False
+
+
+def has_tesserocr():
+    """True if the in-process tesserocr bindings are installed and have not failed to initialize."""
+    return not _tesserocr_broken and importlib.util.find_spec("tesserocr") is not None
+
+
+def _has_tesseract_binary():
+    try:
+        import pytesseract
+    except ImportError:
+        return False
+    return shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+
+
+def is_available():
+    """Check whether Tesseract can be used, in-process (tesserocr) or via pytesseract."""
+    return has_tesserocr() or _has_tesseract_binary()
+
+
+def _get_api(kind="text"):
+    """Return this thread's tesserocr handle for ``kind`` ("text", "line" or "osd"), or None."""
+    global _tesserocr_broken
+    if not has_tesserocr():
+        return None
+    apis = getattr(_local, "apis", None)
+    if apis is None:
+        apis = _local.apis = {}
+    if kind not in apis:
+        try:
+            # cysignals raises ValueError when tesserocr is first imported off the main thread
+            import tesserocr
+
+            psm = {
+                "text": tesserocr.PSM.AUTO,
+                "line": tesserocr.PSM.SINGLE_LINE,
+                "osd": tesserocr.PSM.OSD_ONLY,
+            }[kind]
+            apis[kind] = tesserocr.PyTessBaseAPI(lang="osd" if kind == "osd" else "eng", psm=psm)
+        except Exception as e:
+            _tesserocr_broken = True
+            logging.warning(f"⚠️ tesserocr could not initialize ({e}); falling back to pytesseract.")
+            return None
+    return apis[kind]
+
+
+def load(**options):
+    """Initialize this thread's in-process API handle, or verify the tesseract binary.
+
+    ``options`` are the per-call ``ocr_engine_params`` (e.g. ``config``); loading ignores them.
+    """
+    if _get_api("text") is not None:
+        return True
+    import pytesseract
+
+    return pytesseract.get_tesseract_version()
+
+
+def close():
+    """Release this thread's API handles."""
+    for api in getattr(_local, "apis", {}).values():
+        api.End()
+    _local.apis = {}
+
+
+def detect_rotation(pil_img):
+    """Return the clockwise rotation (0/90/180/270) needed to make the page upright."""
+    api = _get_api("osd")
+    if api is not None:
+        api.SetImage(pil_img)
+        osd = api.DetectOrientationScript()
+        api.Clear()
+        if not osd:
+            return 0
+        # orient_deg is the page's current orientation; Tesseract's "Rotate" is its complement
+        return (360 - int(osd["orient_deg"])) % 360
+
+    import pytesseract
+
+    osd = pytesseract.image_to_osd(pil_img)
+    rotation_match = re.search(r"Rotate: (\d+)", osd)
+    return int(rotation_match.group(1)) % 360 if rotation_match else 0
+
+
+def image_to_string(pil_img, single_line=False):
+    api = _get_api("line" if single_line else "text")
+    if api is not None:
+        api.SetImage(pil_img)
+        text = api.GetUTF8Text()
+        api.Clear()
+        return text
+
+    import pytesseract
+
+    return pytesseract.image_to_string(pil_img, config="--psm 7" if single_line else "")
+
+
+def image_to_hocr(pil_img):
+    api = _get_api("text")
+    if api is not None:
+        api.SetImage(pil_img)
+        hocr = api.GetHOCRText(0)
+        api.Clear()
+        return hocr
+
+    import pytesseract
+
+    return pytesseract.image_to_pdf_or_hocr(pil_img, extension="hocr").decode("utf-8")
+
+
+def image_to_pdf(pil_img):
+    """Single-page searchable PDF bytes.
+
+    tesserocr has no in-memory PDF renderer, so this always goes through pytesseract.
+    """
+    import pytesseract
+
+    return pytesseract.image_to_pdf_or_hocr(pil_img, extension="pdf")
+
+
+def _lines_from_api(api):
+    import tesserocr
+
+    lines = []
+    confidences = []
+    iterator = api.GetIterator()
+    level = tesserocr.RIL.TEXTLINE
+    if iterator is None:
+        return lines, confidences
+    while True:
+        text = (iterator.GetUTF8Text(level) or "").strip()
+        box = iterator.BoundingBox(level)
+        if text and box:
+            confidence = iterator.Confidence(level) / 100
+            lines.append({"text": text, "box": tuple(box), "confidence": confidence})
+            confidences.append(confidence)
+        if not iterator.Next(level):
+            break
+    return lines, confidences
+
+
+def _lines_from_pytesseract(pil_img, config=""):
+    import pytesseract
+
+    data = pytesseract.image_to_data(pil_img, config=config, output_type=pytesseract.Output.DICT)
+    grouped = {}
+    confidences = []
+    for idx, word in enumerate(data["text"]):
+        word = word.strip()
+        conf = float(data["conf"][idx])
+        if not word or conf < 0:
+            continue
+        key = (data["block_num"][idx], data["par_num"][idx], data["line_num"][idx])
+        x0, y0 = data["left"][idx], data["top"][idx]
+        x1, y1 = x0 + data["width"][idx], y0 + data["height"][idx]
+        line = grouped.setdefault(key, {"words": [], "confidences": [], "box": [x0, y0, x1, y1]})
+        line["words"].append(word)
+        line["confidences"].append(conf / 100)
+        box = line["box"]
+        box[0], box[1] = min(box[0], x0), min(box[1], y0)
+        box[2], box[3] = max(box[2], x1), max(box[3], y1)
+        confidences.append(conf / 100)
+
+    lines = [
+        {"text": " ".join(line["words"]), "box": tuple(line["box"]),
+         "confidence": sum(line["confidences"]) / len(line["confidences"])}
+        for line in grouped.values()
+    ]
+    return lines, confidences
+
+
+def read_text_tesseract(pil_img, **kwargs):
+    """
+    Perform OCR on a PIL image using Tesseract.
+
+    Uses this thread's in-process tesserocr handle when available, otherwise
+    pytesseract (which spawns the tesseract executable per call).
+
+    Returns:
+        dict: {'engine': 'tesseract', 'text': ..., 'confidence': ..., 'lines': [...]}
+    """
+    try:
+        api = _get_api("text")
+        if api is not None:
+            api.SetImage(pil_img)
+            api.Recognize()
+            lines, confidences = _lines_from_api(api)
+            api.Clear()
+        else:
+            lines, confidences = _lines_from_pytesseract(pil_img, config=kwargs.get("config", ""))
+    except Exception as e:
+        logging.exception("❌ Tesseract exception occurred")
+        raise RuntimeError(f"Tesseract failed: {e}")
+
+    return {
+        "engine": "tesseract",
+        "text": "\n".join(line["text"] for line in lines),
+        "confidence": sum(confidences) / len(confidences) if confidences else 0.0,
+        "lines": lines,
+    }
+
+
+def recognize(pil_images, **kwargs):
+    """Read each image as a single text line (no page layout analysis): ``[{"text", "confidence"}]``."""
+    results = []
+    for pil_img in pil_images:
+        api = _get_api("line")
+        if api is not None:
+            api.SetImage(pil_img)
+            text, confidence = api.GetUTF8Text().strip(), api.MeanTextConf() / 100
+            api.Clear()
+        else:
+            lines, confidences = _lines_from_pytesseract(pil_img, config="--psm 7")
+            text = " ".join(line["text"] for line in lines)
+            confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        results.append({"text": text, "confidence": confidence})
+    return results
+
+
+read_text = read_text_tesseract
@@ -1,28 +1,158 @@
 ### UPDATED FILE: utils/ocr_wrapper.py
 
+import importlib
 import logging
+import threading
 
-from utils.ocr_paddle import read_text_paddle, _paddle_ocr
+DEFAULT_ENGINE = "paddleocr"
 
-is_paddle_available = _paddle_ocr is not None
+# Engine name -> module implementing is_available(), load(**options) and read_text(image, **kwargs),
+# optionally read_text_batch(images, **kwargs) and recognize(images, **kwargs).
+# Modules are only imported (and models only built) the first time an engine is used.
+_ENGINE_MODULES = {
+    "paddleocr": "utils.ocr_paddle",
+    "easyocr": "utils.ocr_easy",
+    "tesseract": "utils.ocr_tesseract",
+}
+_ALIASES = {
+    "paddle": "paddleocr",
+    "easy": "easyocr",
+}
 
+_loaded = {}
+_lock = threading.Lock()
 
-def read_text(image, **kwargs):
+
+def register_engine(name, module_path):
+    """Register an OCR engine module under ``name`` (e.g. from a plugin)."""
+    _ENGINE_MODULES[name.lower()] = module_path
+
+
+def resolve_engine_name(name=None):
+    name = (name or DEFAULT_ENGINE).lower()
+    return _ALIASES.get(name, name)
+
+
+def registered_engines():
+    return list(_ENGINE_MODULES)
+
+
+def _engine_module(name):
+    name = resolve_engine_name(name)
+    if name not in _ENGINE_MODULES:
+        raise ValueError(f"Unknown OCR engine '{name}'. Available: {', '.join(_ENGINE_MODULES)}")
+    return importlib.import_module(_ENGINE_MODULES[name])
+
+
+def is_engine_available(name=None):
+    """Return True if the engine's library is installed, without loading its model."""
+    try:
+        return _engine_module(name).is_available()
+    except Exception:
+        return False
+
+
+def available_engines():
+    return [name for name in _ENGINE_MODULES if is_engine_available(name)]
+
+
+def get_engine(name=None, **options):
+    """Return the engine module, building its model (for ``options``, e.g. ``ocr_engine_params``) on first use."""
+    name = resolve_engine_name(name)
+    module = _engine_module(name)
+    if name not in _loaded:
+        with _lock:
+            if name not in _loaded:
+                if not module.is_available():
+                    raise RuntimeError(f"OCR engine '{name}' is not available.")
+                module.load(**options)
+                _loaded[name] = module
+                logging.info(f"✅ OCR engine '{name}' loaded.")
+                return module
+    if options:
+        module.load(**options)
+    return _loaded[name]
+
+
+def quad_to_box(quad):
+    """Convert a 4-point text polygon into an ``(x0, y0, x1, y1)`` box."""
+    xs = [p[0] for p in quad]
+    ys = [p[1] for p in quad]
+    return int(min(xs)), int(min(ys)), int(max(xs)), int(max(ys))
+
+
+def warm_up(name=None, background=True, **options):
+    """Load an engine ahead of time, optionally on a daemon thread."""
+
+    def _load():
+        try:
+            get_engine(name, **options)
+        except Exception as e:
+            logging.warning(f"⚠️ OCR warm-up failed for '{resolve_engine_name(name)}': {e}")
+
+    if not background:
+        _load()
+        return None
+    thread = threading.Thread(target=_load, name="ocr-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def read_text(image, engine=None, **kwargs):
     """
-    Unified OCR interface using only PaddleOCR.
+    Unified OCR interface dispatching to the selected engine (``ocr_engine`` config key).
 
     Args:
         image (PIL.Image): The image to OCR.
-        kwargs: Optional arguments for PaddleOCR.
+        engine (str): Engine name; defaults to PaddleOCR.
+        kwargs: Optional engine-specific arguments.
 
     Returns:
-        dict: {"engine": "paddleocr", "text": str, "confidence": float}
+        dict: {"engine": str, "text": str, "confidence": float,
+               "lines": [{"text": str, "box": (x0, y0, x1, y1), "confidence": float}, ...]}
+
+        Confidences are 0-1; the page confidence is the mean of the line confidences.
+    """
+    name = resolve_engine_name(engine)
+    try:
+        return get_engine(name, **kwargs).read_text(image, **kwargs)
+    except Exception as e:
+        logging.error(f"❌ {name} processing failed: {e}")
+        raise
+
+
+def read_text_batch(images, engine=None, **kwargs):
+    """OCR several images in one call; returns one :func:`read_text` result per image.
+
+    Engines with a ``read_text_batch`` (PaddleOCR) share their model calls
+    across the images; others are called once per image.
     """
-    if not is_paddle_available:
-        raise RuntimeError("PaddleOCR is not available.")
+    name = resolve_engine_name(engine)
+    try:
+        module = get_engine(name, **kwargs)
+        batch = getattr(module, "read_text_batch", None)
+        if batch is None:
+            return [module.read_text(image, **kwargs) for image in images]
+        return batch(list(images), **kwargs)
+    except Exception as e:
+        logging.error(f"❌ {name} batch processing failed: {e}")
+        raise
+
 
+def recognize_text(images, engine=None, **kwargs):
+    """Read small crops that each hold one line of text, skipping text detection.
+
+    Returns one ``{"text", "confidence"}`` per image. Engines without a
+    ``recognize`` run their full :func:`read_text` on each crop.
+    """
+    name = resolve_engine_name(engine)
     try:
-        return read_text_paddle(image, **kwargs)
+        module = get_engine(name, **kwargs)
+        recognize = getattr(module, "recognize", None)
+        if recognize is not None:
+            return recognize(list(images), **kwargs)
+        results = [module.read_text(image, **kwargs) for image in images]
+        return [{"text": r.get("text", ""), "confidence": r.get("confidence", 0.0)} for r in results]
     except Exception as e:
-        logging.error(f"❌ PaddleOCR processing failed: {e}")
+        logging.error(f"❌ {name} recognition failed: {e}")
         raise
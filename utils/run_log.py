@@ -0,0 +1,261 @@
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+RUN_LOG_NAME = "run_log.sqlite"
+
+TRUCKING_COLUMNS = [
+    "Filename",
+    "Page",
+    "Vendor",
+    "Ticket Number",
+    "material",
+    "source",
+    "destination",
+    "Matched Keyword",
+    "Method",
+    "Rotated",
+    "Grayscale",
+]
+BOOL_COLUMNS = ("Rotated", "Grayscale")
+OCR_TEXT_COLUMNS = ["Filename", "Page", "Vendor", "OCR Text"]
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def _quoted(columns):
+    return ", ".join(f'"{c}"' for c in columns)
+
+
+class RunLogStore:
+    """Append-only journal of trucking-log and OCR-text rows in SQLite.
+
+    Each processed file appends its rows in one constant-cost insert. Excel
+    workbooks are produced from the journal on demand (normally at the end of
+    a batch) instead of being re-read and rewritten after every file.
+    """
+
+    def __init__(self, log_dir):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.log_dir / RUN_LOG_NAME
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS trucking_log (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " job_id TEXT, job_date TEXT, logged_at REAL, "
+            + ", ".join(f'"{c}"' for c in TRUCKING_COLUMNS) + ")"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_trucking_job ON trucking_log (job_id, job_date)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_text (id INTEGER PRIMARY KEY AUTOINCREMENT, logged_at REAL, "
+            + ", ".join(f'"{c}"' for c in OCR_TEXT_COLUMNS) + ")"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS exports (job_id TEXT, job_date TEXT, last_id INTEGER,"
+            " PRIMARY KEY (job_id, job_date))"
+        )
+
+    def workbook_path(self, job_id, job_date):
+        return self.log_dir / f"{job_id}_{job_date}_TruckingLog.xlsx"
+
+    def _insert(self, table, columns, rows, extra=None):
+        extra = extra or {}
+        names = list(extra) + ["logged_at"] + columns
+        placeholders = ", ".join("?" for _ in names)
+        now = time.time()
+        values = [
+            tuple(extra.values()) + (now,) + tuple(_sql_value(row.get(c, "")) for c in columns)
+            for row in rows
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    f"INSERT INTO {table} ({_quoted(names)}) VALUES ({placeholders})", values
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def append_trucking_rows(self, job_id, job_date, rows):
+        self._import_legacy_workbook(job_id, job_date)
+        self._insert("trucking_log", TRUCKING_COLUMNS, rows, {"job_id": job_id, "job_date": job_date})
+
+    def append_ocr_text(self, rows):
+        self._insert("ocr_text", OCR_TEXT_COLUMNS, rows)
+
+    def forget_file(self, filename):
+        """Remove every journaled row for ``filename`` (before it is processed again)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute('DELETE FROM trucking_log WHERE "Filename" = ?', (filename,))
+                self._conn.execute('DELETE FROM ocr_text WHERE "Filename" = ?', (filename,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _import_legacy_workbook(self, job_id, job_date):
+        """Journal rows from a workbook written before the journal existed, once."""
+        with self._lock:
+            known = self._conn.execute(
+                "SELECT 1 FROM trucking_log WHERE job_id = ? AND job_date = ?"
+                " UNION ALL SELECT 1 FROM exports WHERE job_id = ? AND job_date = ? LIMIT 1",
+                (job_id, job_date, job_id, job_date),
+            ).fetchone()
+        workbook = self.workbook_path(job_id, job_date)
+        if known or not workbook.exists():
+            return
+        try:
+            import pandas as pd
+
+            existing = pd.read_excel(workbook).fillna("").to_dict("records")
+        except Exception as e:
+            logging.error(f"❌ Failed to import existing log file {workbook}: {e}")
+            return
+        self._insert("trucking_log", TRUCKING_COLUMNS, existing, {"job_id": job_id, "job_date": job_date})
+        with self._lock:
+            # Remember the import so rows later forgotten for a re-run are not imported again
+            self._conn.execute(
+                "INSERT OR IGNORE INTO exports (job_id, job_date, last_id) VALUES (?, ?, 0)", (job_id, job_date)
+            )
+        logging.info(f"📥 Imported {len(existing)} rows from {workbook} into the run log")
+
+    def trucking_rows(self, job_id, job_date):
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT {_quoted(TRUCKING_COLUMNS)} FROM trucking_log"
+                " WHERE job_id = ? AND job_date = ? ORDER BY id",
+                (job_id, job_date),
+            )
+            rows = [dict(zip(TRUCKING_COLUMNS, row)) for row in cursor.fetchall()]
+        for row in rows:
+            for column in BOOL_COLUMNS:
+                if isinstance(row[column], int):
+                    row[column] = bool(row[column])
+        return rows
+
+    def ocr_text_rows(self, since=0.0):
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT {_quoted(OCR_TEXT_COLUMNS)} FROM ocr_text WHERE logged_at >= ? ORDER BY id", (since,)
+            )
+            return [dict(zip(OCR_TEXT_COLUMNS, row)) for row in cursor.fetchall()]
+
+    def pending_exports(self):
+        """(job_id, job_date) pairs with rows newer than their last exported workbook."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT t.job_id, t.job_date FROM trucking_log t"
+                " LEFT JOIN exports e ON e.job_id = t.job_id AND e.job_date = t.job_date"
+                " GROUP BY t.job_id, t.job_date HAVING MAX(t.id) > COALESCE(MAX(e.last_id), 0)"
+            ).fetchall()
+
+    def export_workbook(self, job_id, job_date):
+        """Write ``{job_id}_{job_date}_TruckingLog.xlsx`` from the journal and return its path."""
+        import pandas as pd
+
+        with self._lock:
+            last_id = self._conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM trucking_log WHERE job_id = ? AND job_date = ?",
+                (job_id, job_date),
+            ).fetchone()[0]
+        df = pd.DataFrame(self.trucking_rows(job_id, job_date), columns=TRUCKING_COLUMNS)
+        log_file = self.workbook_path(job_id, job_date)
+
+        try:
+            df.to_excel(log_file, index=False)
+            logging.info(f"📝 Log saved to: {log_file}")
+        except PermissionError:
+            logging.warning(f"🔒 Log file locked: {log_file}, saving backup copy...")
+            seq = 1
+            while True:
+                fallback_log_file = log_file.with_name(log_file.stem + f"_{seq}" + log_file.suffix)
+                if not fallback_log_file.exists():
+                    df.to_excel(fallback_log_file, index=False)
+                    logging.info(f"📝 Backup log saved to: {fallback_log_file}")
+                    log_file = fallback_log_file
+                    break
+                seq += 1
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO exports (job_id, job_date, last_id) VALUES (?, ?, ?)",
+                (job_id, job_date, last_id),
+            )
+        return log_file
+
+    def job_keys(self):
+        with self._lock:
+            return self._conn.execute("SELECT DISTINCT job_id, job_date FROM trucking_log").fetchall()
+
+    def export_pending(self, keys=None):
+        """Export workbooks for ``keys`` (default: every job/date with unexported rows)."""
+        paths = []
+        for job_id, job_date in (self.pending_exports() if keys is None else keys):
+            try:
+                paths.append(self.export_workbook(job_id, job_date))
+            except Exception as e:
+                logging.error(f"❌ Failed to write Excel log for {job_id} {job_date}: {e}")
+        return paths
+
+    def export_ocr_text_csv(self, path, since=0.0):
+        import pandas as pd
+
+        pd.DataFrame(self.ocr_text_rows(since), columns=OCR_TEXT_COLUMNS).to_csv(path, index=False)
+        return path
+
+
+def _sql_value(value):
+    if hasattr(value, "item"):  # numpy scalars from pandas
+        value = value.item()
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+def export_workbooks(log_dir, force=False):
+    """Build the trucking-log workbooks for ``log_dir`` from its journal, if it has one."""
+    if not (Path(log_dir) / RUN_LOG_NAME).exists():
+        return []
+    store = get_run_log(log_dir)
+    return store.export_pending(store.job_keys() if force else None)
+
+
+def export_ocr_text(log_dir, since=0.0):
+    """Write the OCR text journaled in ``log_dir`` since ``since`` to ``ocr_text_log_<timestamp>.csv``.
+
+    The CSV goes next to the ``logs`` folder, where the per-file logs used to be written. Returns its path, or
+    None if there is nothing to write.
+    """
+    from datetime import datetime
+
+    if not (Path(log_dir) / RUN_LOG_NAME).exists():
+        return None
+    store = get_run_log(log_dir)
+    if not store.ocr_text_rows(since):
+        return None
+    path = Path(log_dir).parent / f"ocr_text_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    try:
+        store.export_ocr_text_csv(path, since)
+    except Exception as e:
+        logging.warning(f"⚠️ Failed to save OCR text log: {e}")
+        return None
+    logging.info(f"📤 OCR text log saved: {path}")
+    return path
+
+
+def get_run_log(log_dir):
+    """Return the shared journal for ``log_dir`` (one connection per process)."""
+    log_dir = Path(log_dir).resolve()
+    with _stores_lock:
+        if log_dir not in _stores:
+            _stores[log_dir] = RunLogStore(log_dir)
+        return _stores[log_dir]
@@ -1,8 +1,19 @@
 import logging
+import threading
 import time
 from contextlib import contextmanager
 
-_timings = []
+from utils.metrics import observe
+
+# Timings are kept per thread so files processed concurrently each get their own summary
+_local = threading.local()
+
+
+def _timings():
+    if not hasattr(_local, "timings"):
+        _local.timings = []
+    return _local.timings
+
 
 @contextmanager
 def track_time(label: str):
@@ -11,20 +22,29 @@ def track_time(label: str):
         yield
     finally:
         duration = time.perf_counter() - start
-        _timings.append((label, duration))
+        _timings().append((label, duration))
+        observe(label, duration)
         logging.info(f"\u23F1 {label} took {duration:.2f}s")
 
 def reset_timings():
-    _timings.clear()
+    _timings().clear()
+
+def timing_totals():
+    """Total seconds per label recorded by this thread since the last reset."""
+    totals = {}
+    for label, dur in _timings():
+        totals[label] = totals.get(label, 0.0) + dur
+    return totals
 
 def report_timings():
-    if not _timings:
+    timings = _timings()
+    if not timings:
         logging.info("No timing data recorded")
         return
     logging.info("=== Timing Summary ===")
     totals = {}
     counts = {}
-    for label, dur in _timings:
+    for label, dur in timings:
         totals[label] = totals.get(label, 0.0) + dur
         counts[label] = counts.get(label, 0) + 1
     for label, total in totals.items():